@@ -0,0 +1,44 @@
+from typing import Any
+from argparse import ArgumentParser as CommandParser
+from django.core.management.base import BaseCommand
+from utils.schedule_benchmark import WORKLOADS, BENCHMARK_LIMIT, run_workload
+
+
+class Command(BaseCommand):
+    """Comando para medir o desempenho do gerador de grades horárias."""
+
+    help = "Mede o tempo, a memória e a quantidade de turmas examinadas pelo gerador de grades horárias em cenários sintéticos."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Adiciona os argumentos do comando."""
+        parser.add_argument('-w', '--workload', action='append', dest='workloads', choices=list(WORKLOADS),
+                            help="Cenário a ser medido. Pode ser repetido. Caso não seja informado, todos são medidos.")
+
+        parser.add_argument('-r', '--repeat', action='store', type=int, default=5,
+                            help="Quantidade de execuções usadas para medir o tempo de cada cenário.")
+
+        parser.add_argument('-s', '--seeds', action='store', type=int, default=3,
+                            help="Quantidade de conjuntos de turmas sorteados para cada cenário.")
+
+        parser.add_argument('-l', '--limit', action='store', type=int, default=BENCHMARK_LIMIT,
+                            help="Quantidade de grades retornadas pelo gerador. Use 0 para retornar todas.")
+
+        parser.add_argument('-c', '--conflict-density', action='store', type=float, default=None, dest='conflict_density',
+                            help="Proporção (entre 0 e 1) de turmas com horários sorteados, que conflitam com frequência. "
+                            "As demais não conflitam com as outras disciplinas. Substitui a densidade de cada cenário.")
+
+    def handle(self, *args: Any, **options: Any):
+        workloads = options["workloads"] or list(WORKLOADS)
+        limit = options["limit"] or None
+
+        print(f"{'cenário':<14}{'semente':>8}{'turmas':>8}{'melhor (ms)':>13}{'média (ms)':>12}"
+              f"{'memória (KiB)':>15}{'nós':>10}{'turmas exam.':>14}{'grades':>10}")
+
+        for name in workloads:
+            for seed in range(options["seeds"]):
+                result = run_workload(
+                    name, seed=seed, repeat=options["repeat"], limit=limit, conflict_density=options["conflict_density"])
+
+                print(f"{result.workload:<14}{seed:>8}{result.classes:>8}{result.best_time * 1000:>13.2f}"
+                      f"{result.mean_time * 1000:>12.2f}{result.peak_memory / 1024:>15.1f}{result.nodes:>10}"
+                      f"{result.candidates:>14}{result.schedules:>10}")
@@ -4,6 +4,9 @@ from django.core.management.base import BaseCommand
 from django.db import transaction
 from utils import sessions
 from utils import db_handler as dbh
+from utils.catalog import bump_catalog_version
+from utils.conflict_index import build_conflict_index, delete_conflict_index
+from utils.shared_catalog import publish_shared_catalog, bump_period_version, delete_shared_catalog
 from utils.web_scraping import DisciplineWebScraper, get_list_of_departments
 from django.core.cache import cache
 from time import time, sleep
@@ -75,14 +78,22 @@ class Command(BaseCommand):
 
         print("Atualizando o banco de dados...")
 
+        # Períodos atualizados com sucesso: (ano, período) -> quantidade de departamentos reescritos
+        updated_periods = dict()
+
         def start_update_year_period(year: str, period: str):
             try:
                 start_time = time()
                 print(f"Começando atualização de {year}/{period}")
                 with transaction.atomic():
-                    self.update_departments(
+                    updated_departments = self.update_departments(
                         departments_ids, year, period, options)
 
+                # Reconstrói o índice de conflitos antes de mudar a versão do catálogo, para que
+                # nenhum processo guarde o índice antigo associado à nova versão
+                build_conflict_index(year, period)
+                updated_periods[(year, period)] = updated_departments
+
                 self.display_success_update_message(
                     operation=f"{year}/{period}", start_time=start_time)
             except Exception as exception:
@@ -103,10 +114,30 @@ class Command(BaseCommand):
             thread.join()
         threads.clear()
 
+        # Reconstrói o catálogo compartilhado de cada período atualizado. Cada período tem a sua
+        # própria versão, então os catálogos dos outros períodos continuam válidos
+        for (year, period), updated_departments in updated_periods.items():
+            try:
+                publish_shared_catalog(year, period, updated_departments > 0)
+            except Exception as exception:
+                print(f"Houve um erro na construção do catálogo compartilhado de {year}/{period}.")
+                print(f"Error: {exception}")
+
+                # Sem o catálogo, os geradores carregam as turmas pelo ORM, e o arquivo antigo não pode mais ser usado
+                if updated_departments:
+                    bump_period_version(year, period)
+
+        # Caso alguma turma tenha mudado, invalida uma única vez os horários compilados pelos geradores de grade horária
+        if any(updated_periods.values()):
+            bump_catalog_version()
+
         print(f"\nTempo total de execução: {(time() - start_tot_time):.1f}s")
 
-    def update_departments(self, departments_ids: list, year: str, period: str, options: Any) -> None:
-        """Atualiza os departamentos do banco de dados e suas respectivas disciplinas."""
+    def update_departments(self, departments_ids: list, year: str, period: str, options: Any) -> int:
+        """Atualiza os departamentos do banco de dados e suas respectivas disciplinas.
+        Retorna a quantidade de departamentos reescritos."""
+        updated_departments = []
+
         def execute_update(department_id):
             scraper = DisciplineWebScraper(department_id, year, period)
             fingerprint = scraper.create_page_fingerprint()
@@ -146,6 +177,7 @@ class Command(BaseCommand):
                                      days=class_info["days"], _class=class_info["class_code"], discipline=discipline, special_dates=class_info["special_dates"])
 
             cache.set(cache_key, fingerprint, timeout=THIRTY_DAYS_IN_SECS)
+            updated_departments.append(department_id)
             
             if options['descriptive']:
                 print(f'Operação de atualização finalizada para o departamento ({department_id})')
@@ -165,12 +197,17 @@ class Command(BaseCommand):
             thread.join()
         threads.clear()
 
+        return len(updated_departments)
+
     def delete_period(self, year: str, period: str) -> None:
         """Deleta um período do banco de dados."""
         start_time = time()
         with transaction.atomic():
             dbh.delete_all_departments_using_year_and_period(
                 year=year, period=period)
+        delete_conflict_index(year, period)
+        delete_shared_catalog(year, period)
+        bump_catalog_version()
         self.display_success_delete_message(
             operation=f"{year}/{period}", start_time=start_time)
 
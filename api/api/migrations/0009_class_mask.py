@@ -0,0 +1,45 @@
+from django.db import migrations, models
+from utils.schedule_code import compile_schedule_code, split_schedule_mask
+
+BATCH_SIZE = 1000
+
+
+def fill_class_masks(apps, schema_editor):
+    Class = apps.get_model('api', 'Class')
+    classes = []
+
+    for _class in Class.objects.only('id', 'schedule').iterator(chunk_size=BATCH_SIZE):
+        try:
+            _class.mask_low, _class.mask_high = split_schedule_mask(
+                compile_schedule_code(_class.schedule))
+        except ValueError:
+            continue
+
+        classes.append(_class)
+
+        if len(classes) == BATCH_SIZE:
+            Class.objects.bulk_update(classes, ['mask_low', 'mask_high'])
+            classes = []
+
+    Class.objects.bulk_update(classes, ['mask_low', 'mask_high'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_schedule_created_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='class',
+            name='mask_low',
+            field=models.PositiveBigIntegerField(default=None, null=True),
+        ),
+        migrations.AddField(
+            model_name='class',
+            name='mask_high',
+            field=models.PositiveBigIntegerField(default=None, null=True),
+        ),
+        migrations.RunPython(fill_class_masks, migrations.RunPython.noop),
+    ]
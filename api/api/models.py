@@ -4,6 +4,7 @@ from django.contrib.postgres.fields import ArrayField
 from users.models import User
 from django.utils import timezone
 from django.core.cache import cache
+from utils.schedule_code import compile_schedule_code, split_schedule_mask
 
 cache_error_msg = "Cache isn't working properly, so database isn't allowed to be modified!"
 
@@ -88,6 +89,8 @@ class Class(CustomModel):
     days:list -> Dias da semana da turma
     _class:str -> Turma da disciplina
     discipline:Discipline -> Disciplina da turma
+    mask_low:int -> Bits menos significativos da máscara de aulas do horário (None caso o horário seja inválido)
+    mask_high:int -> Bits mais significativos da máscara de aulas do horário (None caso o horário seja inválido)
     """
     teachers = ArrayField(models.CharField(max_length=256))
     classroom = models.CharField(max_length=64)
@@ -104,10 +107,24 @@ class Class(CustomModel):
         ),
         default=list
     )
+    mask_low = models.PositiveBigIntegerField(null=True, default=None)
+    mask_high = models.PositiveBigIntegerField(null=True, default=None)
 
     def __str__(self):
         return self._class
 
+    def update_mask(self) -> None:
+        """Compila o horário da turma nas colunas da máscara de aulas."""
+        try:
+            self.mask_low, self.mask_high = split_schedule_mask(
+                compile_schedule_code(self.schedule))
+        except ValueError:
+            self.mask_low, self.mask_high = None, None
+
+    def save(self, *args, **kwargs):
+        self.update_mask()
+        super(Class, self).save(*args, **kwargs)
+
     def get_cache_key(self):
         code = self.discipline.department.code
         year = self.discipline.department.year
@@ -13,7 +13,8 @@ class DepartmentSerializer(ModelSerializer):
 class ClassSerializer(ModelSerializer):
     class Meta:
         model = Class
-        fields = '__all__'
+        # As máscaras de aulas são um índice interno do banco de dados
+        exclude = ['mask_low', 'mask_high']
 
 
 class DisciplineSerializerSchedule(ModelSerializer):
@@ -49,4 +50,19 @@ class ScheduleSerializer(ModelSerializer):
 
 class GenerateSchedulesSerializer(serializers.Serializer):
     message = serializers.CharField(max_length=200)
-    schedules = ClassSerializerSchedule(many=True)
\ No newline at end of file
+    schedules = ClassSerializerSchedule(many=True)
+    cursor = serializers.CharField(allow_null=True)
+    generation = serializers.CharField()
+    partial = serializers.BooleanField()
+
+
+class CountSchedulesSerializer(serializers.Serializer):
+    count = serializers.IntegerField()
+
+
+class ClassAlternativeSerializer(ClassSerializerSchedule):
+    priority = serializers.IntegerField()
+
+
+class ClassAlternativesSerializer(serializers.Serializer):
+    alternatives = ClassAlternativeSerializer(many=True)
\ No newline at end of file
@@ -0,0 +1,103 @@
+from rest_framework.test import APITestCase
+from utils.db_handler import get_or_create_department, get_or_create_discipline, create_class
+from utils.conflict_index import build_conflict_index
+from django.core.cache import cache
+import json
+
+
+class TestClassAlternativesAPI(APITestCase):
+    def setUp(self):
+        for key in cache.keys("*"):
+            cache.delete(key)
+
+        self.content_type = 'application/json'
+        self.api_url = '/courses/schedules/alternatives/'
+        self.department = get_or_create_department(
+            code='518', year='2023', period='2')
+        self.discipline = get_or_create_discipline(
+            name='CÁLCULO 1', code='MAT518', department=self.department)
+        self.class_1 = create_class(teachers=['RICARDO FRAGELLI'], classroom='S9', schedule='46M34', days=[
+                                    'Quarta-Feira 10:00 às 11:50', 'Sexta-Feira 10:00 às 11:50'], _class="1", special_dates=[], discipline=self.discipline)
+        self.discipline_2 = get_or_create_discipline(
+            name='CÁLCULO 2', code='MAT519', department=self.department)
+        self.class_2 = create_class(teachers=['LUIZA YOKO'], classroom='S1', schedule='46M23', days=[
+                                    'Quarta-Feira 08:55 às 10:45', 'Sexta-Feira 08:55 às 10:45'], _class="1", special_dates=[], discipline=self.discipline_2)
+        self.class_3 = create_class(teachers=['Tatiana'], classroom='S1', schedule='7M1234', days=[
+                                    'Sábado 08:00 às 11:50'], _class="2", special_dates=[], discipline=self.discipline_2)
+        self.class_4 = create_class(teachers=['LUIZA YOKO'], classroom='S1', schedule='35T12', days=[
+                                    'Terça-Feira 14:00 às 15:50', 'Quinta-Feira 14:00 às 15:50'], _class="3", special_dates=[], discipline=self.discipline_2)
+        self.class_5 = create_class(teachers=['Tatiana'], classroom='S1', schedule='24N12', days=[
+                                    'Segunda-Feira 19:00 às 20:50', 'Quarta-Feira 19:00 às 20:50'], _class="4", special_dates=[], discipline=self.discipline_2)
+
+    def test_class_alternatives(self):
+        """
+        Testa as turmas alternativas de uma disciplina, ordenadas pela preferência de turno
+        """
+        body = json.dumps({
+            'classes': [self.class_1.id, self.class_2.id],
+            'discipline': self.discipline_2.id,
+            'preference': [3, 2, 1]
+        })
+
+        for build_index in [False, True]:
+            if build_index:
+                build_conflict_index('2023', '2')
+
+            response = self.client.post(self.api_url, body, content_type=self.content_type)
+
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual([_class["id"] for _class in response.data["alternatives"]],
+                             [self.class_3.id, self.class_4.id, self.class_5.id])
+            self.assertEqual([_class["priority"] for _class in response.data["alternatives"]], [33, 18, 9])
+
+    def test_class_alternatives_without_preference(self):
+        """
+        Testa as turmas alternativas sem preferência, ordenadas pelo id
+        """
+        body = json.dumps({
+            'classes': [],
+            'discipline': self.discipline_2.id
+        })
+
+        response = self.client.post(self.api_url, body, content_type=self.content_type)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([_class["id"] for _class in response.data["alternatives"]],
+                         [self.class_2.id, self.class_3.id, self.class_4.id, self.class_5.id])
+
+    def test_class_alternatives_with_special_dates(self):
+        """
+        Testa que turmas com as mesmas aulas em datas diferentes do semestre não são conflitantes
+        """
+        first_half = create_class(teachers=['RICARDO FRAGELLI'], classroom='S9', schedule='7M1234', days=['Sábado 08:00 às 11:50'],
+                                  _class="2", special_dates=[['04/03/2024 - 20/04/2024', '1', '1']], discipline=self.discipline)
+        second_half = create_class(teachers=['Tatiana'], classroom='S1', schedule='7M1234', days=['Sábado 08:00 às 11:50'],
+                                   _class="5", special_dates=[['22/04/2024 - 06/07/2024', '1', '1']], discipline=self.discipline_2)
+        body = json.dumps({
+            'classes': [first_half.id],
+            'discipline': self.discipline_2.id
+        })
+
+        for build_index in [False, True]:
+            if build_index:
+                build_conflict_index('2023', '2')
+
+            response = self.client.post(self.api_url, body, content_type=self.content_type)
+
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual([_class["id"] for _class in response.data["alternatives"]],
+                             [self.class_2.id, self.class_4.id, self.class_5.id, second_half.id])
+
+    def test_with_invalid_parameters(self):
+        """
+        Testa as turmas alternativas com parâmetros inválidos
+        """
+        for data in [{'discipline': self.discipline_2.id},
+                     {'classes': [self.class_1.id]},
+                     {'classes': [self.class_1.id], 'discipline': str(self.discipline_2.id)},
+                     {'classes': [self.class_1.id], 'discipline': self.discipline_2.id, 'preference': [4, 2, 1]},
+                     {'classes': [-1], 'discipline': self.discipline_2.id},
+                     {'classes': [self.class_1.id], 'discipline': -1}]:
+            response = self.client.post(self.api_url, json.dumps(data), content_type=self.content_type)
+
+            self.assertEqual(response.status_code, 400)
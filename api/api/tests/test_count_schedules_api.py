@@ -0,0 +1,64 @@
+from rest_framework.test import APITestCase
+from utils.db_handler import get_or_create_department, get_or_create_discipline, create_class
+from django.core.cache import cache
+import json
+
+
+class TestCountSchedulesAPI(APITestCase):
+    def setUp(self):
+        for key in cache.keys("*"):
+            cache.delete(key)
+
+        self.content_type = 'application/json'
+        self.api_url = '/courses/schedules/count/'
+        self.department = get_or_create_department(
+            code='518', year='2023', period='2')
+        self.discipline = get_or_create_discipline(
+            name='CÁLCULO 1', code='MAT518', department=self.department)
+        self.class_1 = create_class(teachers=['RICARDO FRAGELLI'], classroom='S9', schedule='46M34', days=[
+                                    'Quarta-Feira 10:00 às 11:50', 'Sexta-Feira 10:00 às 11:50'], _class="1", special_dates=[], discipline=self.discipline)
+        self.class_2 = create_class(teachers=['VINICIUS RISPOLI'], classroom='S1', schedule='24M34', days=[
+                                    'Segunda-Feira 10:00 às 11:50', 'Quarta-Feira 10:00 às 11:50'], _class="2", special_dates=[], discipline=self.discipline)
+        self.discipline_2 = get_or_create_discipline(
+            name='CÁLCULO 2', code='MAT519', department=self.department)
+        self.class_3 = create_class(teachers=['LUIZA YOKO'], classroom='S1', schedule='56M23', days=[
+                                    'Quinta-Feira 08:55 às 10:45', 'Sexta-Feira 08:55 às 10:45'], _class="1", special_dates=[], discipline=self.discipline_2)
+        self.class_4 = create_class(teachers=['Tatiana'], classroom='S1', schedule='7M1234', days=[
+                                    'Sábado 08:00 às 11:50'], _class="2", special_dates=[], discipline=self.discipline_2)
+
+    def test_count_schedules(self):
+        """
+        Testa a contagem de grades horárias
+        """
+        body = json.dumps({
+            'classes': [self.class_1.id, self.class_2.id, self.class_3.id, self.class_4.id]
+        })
+
+        response = self.client.post(self.api_url, body, content_type=self.content_type)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["count"], 3)
+
+    def test_count_schedules_with_constraints(self):
+        """
+        Testa a contagem de grades horárias com dias livres
+        """
+        body = json.dumps({
+            'classes': [self.class_1.id, self.class_2.id, self.class_3.id, self.class_4.id],
+            'free_days': [7]
+        })
+
+        response = self.client.post(self.api_url, body, content_type=self.content_type)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["count"], 1)
+
+    def test_with_invalid_parameters(self):
+        """
+        Testa a contagem de grades horárias com parâmetros inválidos
+        """
+        for data in [{}, {'classes': []}, {'classes': [self.class_1.id], 'free_days': 7},
+                     {'classes': [self.class_1.id], 'blocked': ['1M1']}, {'classes': [-1]}]:
+            response = self.client.post(self.api_url, json.dumps(data), content_type=self.content_type)
+
+            self.assertEqual(response.status_code, 400)
@@ -0,0 +1,130 @@
+from rest_framework.test import APITestCase
+from utils.db_handler import get_or_create_department, get_or_create_discipline, create_class
+from api.views.views import MAXIMUM_RETURNED_DISCIPLINES
+from django.core.cache import cache
+import json
+
+
+class TestFittingDisciplinesAPI(APITestCase):
+    def setUp(self):
+        for key in cache.keys("*"):
+            cache.delete(key)
+
+        self.content_type = 'application/json'
+        self.api_url = '/courses/fits/'
+        self.department = get_or_create_department(
+            code='518', year='2023', period='2')
+        self.discipline = get_or_create_discipline(
+            name='CÁLCULO 1', code='MAT518', department=self.department)
+        self.class_1 = create_class(teachers=['RICARDO FRAGELLI'], classroom='S9', schedule='46M34', days=[
+                                    'Quarta-Feira 10:00 às 11:50', 'Sexta-Feira 10:00 às 11:50'], _class="1", special_dates=[], discipline=self.discipline)
+        self.discipline_2 = get_or_create_discipline(
+            name='CÁLCULO 2', code='MAT519', department=self.department)
+        self.class_2 = create_class(teachers=['LUIZA YOKO'], classroom='S1', schedule='46M23', days=[
+                                    'Quarta-Feira 08:55 às 10:45', 'Sexta-Feira 08:55 às 10:45'], _class="1", special_dates=[], discipline=self.discipline_2)
+        self.class_3 = create_class(teachers=['Tatiana'], classroom='S1', schedule='7N1234', days=[
+                                    'Sábado 19:00 às 22:30'], _class="2", special_dates=[], discipline=self.discipline_2)
+        self.discipline_3 = get_or_create_discipline(
+            name='CÁLCULO 3', code='MAT520', department=self.department)
+        self.class_4 = create_class(teachers=['Tatiana'], classroom='S1', schedule='46M12', days=[
+                                    'Quarta-Feira 08:00 às 09:50', 'Sexta-Feira 08:00 às 09:50'], _class="1", special_dates=[], discipline=self.discipline_3)
+        self.other_department = get_or_create_department(
+            code='518', year='2024', period='1')
+        self.other_discipline = get_or_create_discipline(
+            name='CÁLCULO 1', code='MAT518', department=self.other_department)
+        create_class(teachers=['Tatiana'], classroom='S1', schedule='2M12', days=[
+                     'Segunda-Feira 08:00 às 09:50'], _class="1", special_dates=[], discipline=self.other_discipline)
+
+    def test_fitting_disciplines_from_classes(self):
+        """
+        Testa a busca das disciplinas que cabem na grade a partir das aulas escolhidas
+        """
+        body = json.dumps({
+            'year': '2023',
+            'period': '2',
+            'classes': [self.class_1.id]
+        })
+
+        response = self.client.post(self.api_url, body, content_type=self.content_type)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([discipline["id"] for discipline in response.data],
+                         [self.discipline_2.id, self.discipline_3.id])
+        self.assertEqual([_class["id"] for _class in response.data[0]["classes"]], [self.class_3.id])
+
+    def test_fitting_disciplines_from_occupied_slots(self):
+        """
+        Testa a busca das disciplinas que cabem na grade a partir dos horários ocupados
+        """
+        body = json.dumps({
+            'year': '2023',
+            'period': '2',
+            'classes': [self.class_1.id],
+            'occupied': ['7N1', '4M1']
+        })
+
+        response = self.client.post(self.api_url, body, content_type=self.content_type)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, [])
+
+    def test_fitting_disciplines_with_special_dates(self):
+        """
+        Testa que turmas que ocupam as mesmas aulas apenas em outras datas cabem na grade
+        """
+        discipline_4 = get_or_create_discipline(
+            name='CÁLCULO 4', code='MAT521', department=self.department)
+        class_5 = create_class(teachers=['Tatiana'], classroom='S1', schedule='2M12', days=['Segunda-Feira 08:00 às 09:50'],
+                               _class="1", special_dates=[["04/03/2024 - 20/04/2024", "1", "1"]], discipline=discipline_4)
+        discipline_5 = get_or_create_discipline(
+            name='CÁLCULO 5', code='MAT522', department=self.department)
+        class_6 = create_class(teachers=['Tatiana'], classroom='S1', schedule='2M12', days=['Segunda-Feira 08:00 às 09:50'],
+                               _class="1", special_dates=[["21/04/2024 - 30/06/2024", "1", "1"]], discipline=discipline_5)
+        create_class(teachers=['Tatiana'], classroom='S1', schedule='2M12', days=['Segunda-Feira 08:00 às 09:50'],
+                     _class="2", special_dates=[], discipline=discipline_5)
+
+        body = json.dumps({
+            'year': '2023',
+            'period': '2',
+            'classes': [self.class_1.id, class_5.id]
+        })
+
+        response = self.client.post(self.api_url, body, content_type=self.content_type)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([discipline["id"] for discipline in response.data],
+                         [self.discipline_2.id, self.discipline_3.id, discipline_5.id])
+        self.assertEqual([_class["id"] for _class in response.data[2]["classes"]], [class_6.id])
+
+    def test_fitting_disciplines_limit(self):
+        """
+        Testa que a quantidade de disciplinas retornadas é limitada
+        """
+        for index in range(MAXIMUM_RETURNED_DISCIPLINES):
+            discipline = get_or_create_discipline(
+                name=f'TÓPICOS {index}', code=f'MAT6{index:02}', department=self.department)
+            create_class(teachers=['Tatiana'], classroom='S1', schedule='2M12', days=['Segunda-Feira 08:00 às 09:50'],
+                         _class="1", special_dates=[], discipline=discipline)
+
+        body = json.dumps({
+            'year': '2023',
+            'period': '2'
+        })
+
+        response = self.client.post(self.api_url, body, content_type=self.content_type)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), MAXIMUM_RETURNED_DISCIPLINES)
+        self.assertEqual(response.data[0]["id"], self.discipline.id)
+
+    def test_with_invalid_parameters(self):
+        """
+        Testa a busca das disciplinas que cabem na grade com parâmetros inválidos
+        """
+        for data in [{'classes': [self.class_1.id]},
+                     {'year': '2023', 'period': '2', 'classes': [-1]},
+                     {'year': '2023', 'period': '2', 'classes': 'all'},
+                     {'year': '2023', 'period': '2', 'occupied': ['8M1']}]:
+            response = self.client.post(self.api_url, json.dumps(data), content_type=self.content_type)
+
+            self.assertEqual(response.status_code, 400)
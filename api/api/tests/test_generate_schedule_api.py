@@ -1,10 +1,19 @@
 from rest_framework.test import APITestCase, APIRequestFactory
 from utils.db_handler import get_or_create_department, get_or_create_discipline, create_class
+from utils.schedule_cache import make_generation_key
+from utils.catalog import get_catalog_version
+from api.views.views import MAXIMUM_RETURNED_SCHEDULES
+from django.core.cache import cache
+from django.test import override_settings
 from random import randint
 import json
 
 class TestGenerateScheduleAPI(APITestCase):
     def setUp(self):
+        # Clean cache
+        for key in cache.keys("*"):
+            cache.delete(key)
+
         self.factory = APIRequestFactory()
         self.content_type = 'application/json'
         self.api_url = '/courses/schedules/generate/'
@@ -37,6 +46,7 @@ class TestGenerateScheduleAPI(APITestCase):
         
         self.assertEqual(response.status_code, 200)
         self.assertTrue(len(response.data["schedules"]) > 0)
+        self.assertFalse({'mask_low', 'mask_high'} & set(response.data["schedules"][0][0]))
     
     def test_with_conflicting_classes(self):
         """
@@ -121,4 +131,317 @@ class TestGenerateScheduleAPI(APITestCase):
         response = self.client.post(self.api_url, body, content_type=self.content_type)
         
         self.assertEqual(response.status_code, 200)
-        self.assertTrue(len(response.data["schedules"]) > 0)
\ No newline at end of file
+        self.assertTrue(len(response.data["schedules"]) > 0)
+
+    def test_generated_schedules_are_cached(self):
+        """
+        Testa se as grades horárias geradas são guardadas no cache
+        """
+        classes_id = [self.class_1.id, self.class_2.id, self.class_3.id, self.class_4.id]
+        body = json.dumps({
+            'preference': [3, 2, 1],
+            'classes': classes_id
+        })
+
+        response = self.client.post(self.api_url, body, content_type=self.content_type)
+
+        generation_key = make_generation_key(
+            classes_id[::-1], [3, 2, 1], get_catalog_version(), limit=MAXIMUM_RETURNED_SCHEDULES)
+        cached_data = cache.get(generation_key)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(cached_data['schedules'], response.data['schedules'])
+
+        cached_data['message'] = 'cached'
+        cache.set(generation_key, cached_data)
+
+        response = self.client.post(self.api_url, body, content_type=self.content_type)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['message'], 'cached')
+
+    def test_schedules_pagination(self):
+        """
+        Testa a paginação das grades horárias geradas com o cursor
+        """
+        discipline_3 = get_or_create_discipline(
+            name='CÁLCULO 3', code='MAT520', department=self.department)
+        class_5 = create_class(teachers=['LUIZA YOKO'], classroom='S1', schedule='35T23', days=[
+                               'Terça-Feira 14:00 às 15:50', 'Quinta-Feira 14:00 às 15:50'], _class="1", special_dates=[], discipline=discipline_3)
+        class_6 = create_class(teachers=['LUIZA YOKO'], classroom='S1', schedule='35N12', days=[
+                               'Terça-Feira 19:00 às 20:40', 'Quinta-Feira 19:00 às 20:40'], _class="2", special_dates=[], discipline=discipline_3)
+        classes_id = [self.class_1.id, self.class_2.id, self.class_3.id,
+                      self.class_4.id, class_5.id, class_6.id]
+
+        body = json.dumps({
+            'preference': [3, 2, 1],
+            'classes': classes_id
+        })
+        response = self.client.post(self.api_url, body, content_type=self.content_type)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["schedules"]), MAXIMUM_RETURNED_SCHEDULES)
+        self.assertIsNotNone(response.data["cursor"])
+
+        body = json.dumps({
+            'preference': [3, 2, 1],
+            'classes': classes_id,
+            'cursor': response.data["cursor"]
+        })
+        next_response = self.client.post(self.api_url, body, content_type=self.content_type)
+
+        self.assertEqual(next_response.status_code, 200)
+        self.assertEqual(len(next_response.data["schedules"]), 1)
+        self.assertIsNone(next_response.data["cursor"])
+        self.assertNotIn(next_response.data["schedules"][0], response.data["schedules"])
+
+    def test_with_previous_generation(self):
+        """
+        Testa a geração de horários reaproveitando uma geração anterior com uma turma a menos
+        """
+        classes_id = [self.class_1.id, self.class_2.id, self.class_3.id]
+        body = json.dumps({
+            'preference': [3, 2, 1],
+            'classes': classes_id
+        })
+        response = self.client.post(self.api_url, body, content_type=self.content_type)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNotNone(response.data["generation"])
+
+        body = json.dumps({
+            'preference': [3, 2, 1],
+            'classes': classes_id + [self.class_4.id],
+            'previous': response.data["generation"]
+        })
+        incremental_response = self.client.post(self.api_url, body, content_type=self.content_type)
+
+        for key in cache.keys("*"):
+            cache.delete(key)
+
+        body = json.dumps({
+            'preference': [3, 2, 1],
+            'classes': classes_id + [self.class_4.id]
+        })
+        full_response = self.client.post(self.api_url, body, content_type=self.content_type)
+
+        self.assertEqual(incremental_response.status_code, 200)
+        self.assertEqual(incremental_response.data["schedules"], full_response.data["schedules"])
+
+    def test_with_previous_generation_and_discarded_class(self):
+        """
+        Testa a geração de horários reaproveitando uma geração anterior quando a turma adicionada
+        é descartada pelas restrições (dia livre, horário bloqueado ou turma fixada da mesma disciplina)
+        """
+        for classes_id, added_class, constraints in [
+                ([self.class_1.id, self.class_2.id, self.class_3.id], self.class_4.id, {'free_days': [7]}),
+                ([self.class_1.id, self.class_2.id, self.class_3.id], self.class_4.id, {'blocked': ['7M12']}),
+                ([self.class_2.id, self.class_3.id, self.class_4.id], self.class_1.id, {'pinned': [self.class_2.id]})]:
+            for key in cache.keys("*"):
+                cache.delete(key)
+
+            body = json.dumps({
+                'preference': [3, 2, 1],
+                'classes': classes_id,
+                **constraints
+            })
+            response = self.client.post(self.api_url, body, content_type=self.content_type)
+
+            self.assertEqual(response.status_code, 200)
+
+            body = json.dumps({
+                'preference': [3, 2, 1],
+                'classes': classes_id + [added_class],
+                'previous': response.data["generation"],
+                **constraints
+            })
+            incremental_response = self.client.post(self.api_url, body, content_type=self.content_type)
+
+            for key in cache.keys("*"):
+                cache.delete(key)
+
+            body = json.dumps({
+                'preference': [3, 2, 1],
+                'classes': classes_id + [added_class],
+                **constraints
+            })
+            full_response = self.client.post(self.api_url, body, content_type=self.content_type)
+
+            self.assertEqual(incremental_response.status_code, 200)
+            self.assertEqual(incremental_response.data["schedules"], full_response.data["schedules"])
+
+    def test_with_invalid_previous_generation(self):
+        """
+        Testa a geração de horários com um identificador de geração anterior inválido
+        """
+        body = json.dumps({
+            'preference': [3, 2, 1],
+            'classes': [self.class_1.id, self.class_2.id],
+            'previous': 1
+        })
+
+        response = self.client.post(self.api_url, body, content_type=self.content_type)
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_with_invalid_cursor(self):
+        """
+        Testa a geração de horários com um cursor inválido
+        """
+        body = json.dumps({
+            'preference': [3, 2, 1],
+            'classes': [self.class_1.id, self.class_2.id],
+            'cursor': 'invalid'
+        })
+
+        response = self.client.post(self.api_url, body, content_type=self.content_type)
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_with_constraints(self):
+        """
+        Testa a geração de horários com horários bloqueados e turmas fixadas
+        """
+        body = json.dumps({
+            'preference': [3, 2, 1],
+            'classes': [self.class_1.id, self.class_2.id, self.class_3.id, self.class_4.id],
+            'blocked': ['7M12'],
+            'pinned': [self.class_2.id]
+        })
+
+        response = self.client.post(self.api_url, body, content_type=self.content_type)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["schedules"]), 1)
+        self.assertEqual([_class["id"] for _class in response.data["schedules"][0]],
+                         [self.class_2.id, self.class_3.id])
+
+    def test_with_invalid_constraints(self):
+        """
+        Testa a geração de horários com restrições inválidas
+        """
+        for constraints in [{'blocked': '7M12'}, {'blocked': ['9M12']}, {'free_days': [1]},
+                            {'free_days': ['2']}, {'pinned': [self.class_3.id]}]:
+            body = json.dumps({
+                'preference': [3, 2, 1],
+                'classes': [self.class_1.id, self.class_2.id],
+                **constraints
+            })
+
+            response = self.client.post(self.api_url, body, content_type=self.content_type)
+
+            self.assertEqual(response.status_code, 400)
+
+    def test_with_compactness(self):
+        """
+        Testa a geração de horários ordenada pela compacidade
+        """
+        body = json.dumps({
+            'preference': [3, 2, 1],
+            'classes': [self.class_1.id, self.class_2.id, self.class_3.id, self.class_4.id],
+            'compactness': {'gaps': 2, 'days': 5}
+        })
+
+        response = self.client.post(self.api_url, body, content_type=self.content_type)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([_class["id"] for _class in response.data["schedules"][0]],
+                         [self.class_1.id, self.class_4.id])
+
+        for compactness in [[1, 2], {'gaps': 11}, {'window': 1}]:
+            body = json.dumps({
+                'preference': [3, 2, 1],
+                'classes': [self.class_1.id, self.class_2.id],
+                'compactness': compactness
+            })
+
+            response = self.client.post(self.api_url, body, content_type=self.content_type)
+
+            self.assertEqual(response.status_code, 400)
+
+    def test_with_disciplines(self):
+        """
+        Testa a geração de horários a partir das disciplinas, com todas as suas turmas
+        """
+        body = json.dumps({
+            'preference': [3, 2, 1],
+            'classes': [self.class_1.id, self.class_2.id, self.class_3.id, self.class_4.id]
+        })
+        classes_response = self.client.post(self.api_url, body, content_type=self.content_type)
+
+        body = json.dumps({
+            'preference': [3, 2, 1],
+            'disciplines': [self.discipline.id, self.discipline_2.id],
+            'year': '2023',
+            'period': '2'
+        })
+        response = self.client.post(self.api_url, body, content_type=self.content_type)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["schedules"], classes_response.data["schedules"])
+
+    def test_with_invalid_disciplines(self):
+        """
+        Testa a geração de horários com disciplinas inválidas
+        """
+        for data in [{'disciplines': [self.discipline.id]},
+                     {'disciplines': [], 'year': '2023', 'period': '2'},
+                     {'disciplines': [self.discipline.id], 'classes': [self.class_1.id], 'year': '2023', 'period': '2'},
+                     {'disciplines': [self.discipline.id], 'year': '2023', 'period': '1'}]:
+            response = self.client.post(self.api_url, json.dumps(data), content_type=self.content_type)
+
+            self.assertEqual(response.status_code, 400)
+
+    @override_settings(SCHEDULE_GENERATION_METRICS=True)
+    def test_with_debug_metrics(self):
+        """
+        Testa os contadores e os tempos da geração expostos com a flag de depuração
+        """
+        body = json.dumps({
+            'preference': [3, 2, 1],
+            'classes': [self.class_1.id, self.class_2.id, self.class_3.id, self.class_4.id],
+            'debug': True
+        })
+
+        response = self.client.post(self.api_url, body, content_type=self.content_type)
+        metrics = response.data['metrics']
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(metrics['classes'], 4)
+        self.assertTrue(metrics['nodes'] > 0)
+        self.assertTrue(metrics['schedules'] > 0)
+        self.assertTrue({'load', 'parse', 'search', 'serialize'} <= set(metrics['timings']))
+        self.assertIn('search;dur=', response['Server-Timing'])
+
+        response = self.client.post(self.api_url, body, content_type=self.content_type)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.data['metrics'])
+        self.assertEqual(response['Server-Timing'], 'cache;dur=0.000')
+
+        body = json.dumps({
+            'preference': [3, 2, 1],
+            'classes': [self.class_1.id, self.class_2.id],
+            'debug': 'yes'
+        })
+
+        response = self.client.post(self.api_url, body, content_type=self.content_type)
+
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(SCHEDULE_GENERATION_METRICS=False)
+    def test_without_metrics(self):
+        """
+        Testa que as medições da geração não são expostas quando estão desativadas
+        """
+        body = json.dumps({
+            'preference': [3, 2, 1],
+            'classes': [self.class_1.id, self.class_2.id],
+            'debug': True
+        })
+
+        response = self.client.post(self.api_url, body, content_type=self.content_type)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('metrics', response.data)
+        self.assertFalse(response.has_header('Server-Timing'))
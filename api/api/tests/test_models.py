@@ -1,6 +1,7 @@
 from django.test import TestCase
 from django.core.cache import cache
 from api.models import Department, Discipline, Class
+from utils.schedule_code import compile_schedule_code, join_schedule_mask
 
 
 class ModelsTest(TestCase):
@@ -28,6 +29,8 @@ class ModelsTest(TestCase):
         cache.set("INF/2023.2", "hash_value")
 
     def setUp(self):
+        # Outras partes da aplicação (ex.: a versão do catálogo) também guardam chaves no cache
+        cache.clear()
         self.create_data()
 
     def test_create_discipline(self):
@@ -45,6 +48,17 @@ class ModelsTest(TestCase):
         self.assertEqual(self._class._class, "1")
         self.assertEqual(self._class.discipline, self.discipline)
 
+    def test_class_mask_columns(self):
+        self._class.refresh_from_db()
+        self.assertEqual(join_schedule_mask(self._class.mask_low, self._class.mask_high),
+                         compile_schedule_code('46M34'))
+
+        self._class.schedule = 'invalid'
+        self._class.save()
+        self._class.refresh_from_db()
+        self.assertIsNone(self._class.mask_low)
+        self.assertIsNone(self._class.mask_high)
+
     def test_create_department(self):
         self.assertEqual(self.department.code, 'INF')
         self.assertEqual(self.department.year, '2023')
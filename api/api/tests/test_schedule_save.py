@@ -255,6 +255,26 @@ class TestScheduleSaveAPI(APITestCase, ErrorRequestBodyScheduleSave):
         self.assertEqual(response.data.get('errors'), error_msg)
         self.assertEqual(response.status_code, 400)
 
+    def test_save_incorrect_schedule_returns_conflicts(self):
+        """
+        Testa se o salvamento de uma grade horária com turmas incompatíveis informa os pares em conflito.
+
+        Tests:
+        - Pares de turmas em conflito
+        - Status code (400 BAD REQUEST)
+        """
+        schedule = self.generate_schedule_structure([
+            self.classes['class_3_2024_1'],
+            self.classes['class_6_2024_1']
+        ])
+
+        response = self.make_post_request(schedule=schedule)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data.get('conflicts'), [
+            [{'code': 'MAT0025', 'class': '25'}, {'code': 'FGA0003', 'class': '1'}]
+        ])
+
     def test_save_correct_schedule_without_auth(self):
         """
         Testa o salvamento de uma grade horária sem um usuário autenticado.
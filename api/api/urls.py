@@ -9,4 +9,7 @@ urlpatterns = [
     path('schedules/', schedules.Schedules.as_view(), name="schedules"),
     path('schedules/<int:id>/', delete_schedule.DeleteSchedule.as_view(), name="delete-schedule"),
     path('schedules/generate/', views.GenerateSchedule.as_view(), name="generate-schedules"),
+    path('schedules/count/', views.CountSchedules.as_view(), name="count-schedules"),
+    path('schedules/alternatives/', views.ClassAlternatives.as_view(), name="class-alternatives"),
+    path('fits/', views.FittingDisciplines.as_view(), name="fitting-disciplines"),
 ]
@@ -1,4 +1,4 @@
-from utils.schedule_generator import ScheduleGenerator
+from utils.schedule_validator import validate_classes, IncompatibleClassesError
 from utils.db_handler import get_class_by_params, save_schedule
 
 from drf_yasg.utils import swagger_auto_schema
@@ -52,6 +52,8 @@ class SaveSchedule():
 
         try:
             valid_schedule = validate_received_schedule(current_db_classes_ids)
+        except IncompatibleClassesError as error:
+            return handle_incompatible_classes_error(error)
         except:
             error_msg = SCHEDULES_INVALID_SCHEDULES_MSG
             return handle_400_error(error_msg)
@@ -206,14 +208,21 @@ def retrieve_important_params_from_class(_class: dict) -> dict:
 
 
 def validate_received_schedule(classes_id: list[int]) -> list[Class]:
-    schedule_generator = ScheduleGenerator(classes_id)
-    generated_data = schedule_generator.generate()
-    schedules = generated_data.get('schedules', None)
+    return validate_classes(classes_id)
 
-    if schedules is None or len(schedules) != 1:
-        raise ValueError("the classes are not compatible")
 
-    return schedules[0]
+def handle_incompatible_classes_error(error: IncompatibleClassesError) -> response.Response:
+    """Retorna o erro de grade inválida junto com os pares de turmas em conflito."""
+    conflicts = [
+        [{'code': _class.discipline.code, 'class': _class._class} for _class in collision]
+        for collision in error.collisions
+    ]
+
+    return response.Response(
+        {
+            "errors": SCHEDULES_INVALID_SCHEDULES_MSG,
+            "conflicts": conflicts
+        }, status.HTTP_400_BAD_REQUEST)
 
 
 def check_permission_to_save(user) -> bool:
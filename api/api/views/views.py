@@ -9,8 +9,19 @@ from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
 from utils.sessions import get_current_year_and_period, get_next_period
-from utils.schedule_generator import ScheduleGenerator
+from utils.schedule_generator import ScheduleGenerator, MINIMUM_PREFERENCE_RANGE, MAXIMUM_PREFERENCE_RANGE, PREFERENCE_RANGE_ERROR
+from utils.schedule_cache import make_generation_key, get_or_generate, get_generation_id
+from utils.schedule_cache import get_generation_state, save_generation_state
+from utils.schedule_cursor import make_selection_digest, encode_cursor, decode_cursor
+from utils.schedule_constraints import ScheduleConstraints, make_constraints, get_constraint_params, INVALID_FREE_DAY_ERROR
+from utils.schedule_compactness import CompactnessWeights, make_compactness_weights
+from utils.schedule_code import compile_schedule_code
+from utils.catalog import sync_catalog
+from utils.generation_metrics import SERIALIZE_PHASE, get_server_timing
+from utils.class_alternatives import get_class_alternatives
+from utils.shared_catalog import find_shared_catalog
 from utils.db_handler import get_best_similarities_by_name, filter_disciplines_by_teacher, filter_disciplines_by_year_and_period, filter_disciplines_by_code
+from utils.db_handler import get_classes_mask, filter_disciplines_by_free_slots, get_classes_fitting_by_special_dates
 from utils.search import SearchTool
 
 from .. import serializers
@@ -18,6 +29,8 @@ from api.swagger import Errors
 from api.models import Discipline
 from api.views.utils import handle_400_error
 
+from django.conf import settings
+
 from traceback import print_exception
 
 MAXIMUM_RETURNED_DISCIPLINES = 15
@@ -25,6 +38,7 @@ ERROR_MESSAGE = "no valid argument found for 'search', 'year' or 'period'"
 MINIMUM_SEARCH_LENGTH = 4
 ERROR_MESSAGE_SEARCH_LENGTH = f"search must have at least {MINIMUM_SEARCH_LENGTH} characters"
 MAXIMUM_RETURNED_SCHEDULES = 5
+DISCIPLINES_ERROR_MESSAGE = "disciplines must be a list of integers with at least one element, sent with year and period instead of classes"
 
 
 class Search(APIView):
@@ -158,14 +172,28 @@ class YearPeriod(APIView):
         return response.Response(data, status.HTTP_200_OK)
 
 
+def get_constraints_error(blocked: list | None, free_days: list | None, pinned: list | None) -> str | None:
+    """Verifica o formato das restrições da geração de horários. Retorna a mensagem de erro, caso haja."""
+    if blocked is not None and not (isinstance(blocked, list) and all(isinstance(x, str) for x in blocked)):
+        return "blocked must be a list of strings"
+
+    if free_days is not None and not (isinstance(free_days, list) and all(isinstance(x, int) for x in free_days)):
+        return INVALID_FREE_DAY_ERROR
+
+    if pinned is not None and not (isinstance(pinned, list) and all(isinstance(x, int) for x in pinned)):
+        return "pinned must be a list of integers"
+
+    return None
+
+
 class GenerateSchedule(APIView):
     @swagger_auto_schema(
-        operation_description="Gera possíveis horários de acordo com as aulas escolhidas com preferência de turno",
+        operation_description="Gera possíveis horários de acordo com as aulas escolhidas com preferência de turno. "
+        "Em vez das aulas, podem ser enviadas as disciplinas com o ano e o período, e o servidor escolhe entre todas as suas turmas",
         security=[],
         request_body=openapi.Schema(
             type=openapi.TYPE_OBJECT,
             title="body",
-            required=['classes'],
             properties={
                 'classes': openapi.Schema(
                     description="Lista de ids de aulas escolhidas",
@@ -175,6 +203,22 @@ class GenerateSchedule(APIView):
                         type=openapi.TYPE_INTEGER
                     )
                 ),
+                'disciplines': openapi.Schema(
+                    description="Lista de ids de disciplinas escolhidas, usada no lugar de classes",
+                    type=openapi.TYPE_ARRAY,
+                    items=openapi.Schema(
+                        description="Id da disciplina",
+                        type=openapi.TYPE_INTEGER
+                    )
+                ),
+                'year': openapi.Schema(
+                    description="Ano das turmas das disciplinas escolhidas",
+                    type=openapi.TYPE_STRING
+                ),
+                'period': openapi.Schema(
+                    description="Período das turmas das disciplinas escolhidas",
+                    type=openapi.TYPE_STRING
+                ),
                 'preference': openapi.Schema(
                     description="Lista de preferências (manhã, tarde, noite)",
                     type=openapi.TYPE_ARRAY,
@@ -183,6 +227,57 @@ class GenerateSchedule(APIView):
                         type=openapi.TYPE_INTEGER,
                         enum=[1, 2, 3]
                     )
+                ),
+                'cursor': openapi.Schema(
+                    description="Cursor retornado pela página anterior, para obter as próximas grades horárias",
+                    type=openapi.TYPE_STRING
+                ),
+                'previous': openapi.Schema(
+                    description="Identificador (generation) de uma geração anterior que difere desta em apenas uma turma",
+                    type=openapi.TYPE_STRING
+                ),
+                'blocked': openapi.Schema(
+                    description="Lista de horários bloqueados, no formato do SIGAA (ex.: 6T2345)",
+                    type=openapi.TYPE_ARRAY,
+                    items=openapi.Schema(
+                        description="Horário bloqueado",
+                        type=openapi.TYPE_STRING
+                    )
+                ),
+                'free_days': openapi.Schema(
+                    description="Lista de dias que devem ficar livres (2 = segunda-feira, ..., 7 = sábado)",
+                    type=openapi.TYPE_ARRAY,
+                    items=openapi.Schema(
+                        description="Dia livre",
+                        type=openapi.TYPE_INTEGER,
+                        enum=[2, 3, 4, 5, 6, 7]
+                    )
+                ),
+                'pinned': openapi.Schema(
+                    description="Lista de ids de turmas escolhidas que devem estar em todas as grades",
+                    type=openapi.TYPE_ARRAY,
+                    items=openapi.Schema(
+                        description="Id da turma",
+                        type=openapi.TYPE_INTEGER
+                    )
+                ),
+                'compactness': openapi.Schema(
+                    description="Caso informado, as grades também são ordenadas pela compacidade",
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        'gaps': openapi.Schema(
+                            description="Penalidade por aula vaga entre duas aulas de um mesmo dia",
+                            type=openapi.TYPE_INTEGER
+                        ),
+                        'days': openapi.Schema(
+                            description="Penalidade por dia com aula",
+                            type=openapi.TYPE_INTEGER
+                        )
+                    }
+                ),
+                'debug': openapi.Schema(
+                    description="Caso seja true, a resposta inclui os contadores e os tempos de cada etapa da geração",
+                    type=openapi.TYPE_BOOLEAN
                 )
             }
         ),
@@ -213,16 +308,87 @@ class GenerateSchedule(APIView):
                     "errors": "preference must be a list of 3 integers"
                 }, status.HTTP_400_BAD_REQUEST)
 
-        if not classes_valid:
+        disciplines_id = request.data.get('disciplines', None)
+        disciplines = None
+
+        if disciplines_id is not None:
+            year = request.data.get('year', None)
+            period = request.data.get('period', None)
+            disciplines_valid = classes_id is None and isinstance(disciplines_id, list) and all(
+                isinstance(x, int) for x in disciplines_id) and len(disciplines_id) > 0
+
+            if not disciplines_valid or not isinstance(year, str) or not isinstance(period, str):
+                """Retorna um erro caso as disciplinas não sejam enviadas no lugar das classes, com o ano e o período"""
+                return handle_400_error(DISCIPLINES_ERROR_MESSAGE)
+
+            disciplines = (disciplines_id, year, period)
+            classes_id = []
+        elif not classes_valid:
             """Retorna um erro caso a lista de ids de classes não seja enviada"""
             return response.Response(
                 {
                     "errors": "classes is required and must be a list of integers with at least one element"
                 }, status.HTTP_400_BAD_REQUEST)
 
+        blocked = request.data.get('blocked', None)
+        free_days = request.data.get('free_days', None)
+        pinned = request.data.get('pinned', None)
+
+        constraints_error = get_constraints_error(blocked, free_days, pinned)
+
+        if constraints_error is not None:
+            """Retorna um erro caso as restrições não tenham o formato esperado"""
+            return handle_400_error(constraints_error)
+
+        compactness = request.data.get('compactness', None)
+
+        if compactness is not None and not (isinstance(compactness, dict) and set(compactness) <= {'gaps', 'days'}):
+            """Retorna um erro caso os pesos de compacidade não sejam um objeto com as chaves gaps e days"""
+            return handle_400_error("compactness must be an object with the keys 'gaps' and 'days'")
+
+        generation_params = get_constraint_params(blocked, free_days, pinned)
+
+        if compactness is not None:
+            generation_params['compactness'] = compactness
+
+        if disciplines is not None:
+            generation_params.update(disciplines=sorted(set(disciplines_id)), year=year, period=period)
+
+        debug = request.data.get('debug', False)
+
+        if not isinstance(debug, bool):
+            """Retorna um erro caso a flag de depuração não seja um booleano"""
+            return handle_400_error("debug must be a boolean")
+
+        cursor = request.data.get('cursor', None)
+        selection = make_selection_digest(
+            classes_id, preference, **generation_params)
+
+        if cursor is not None and not isinstance(cursor, str):
+            """Retorna um erro caso o cursor não seja uma string"""
+            return handle_400_error("cursor must be a string")
+
+        previous = request.data.get('previous', None)
+
+        if previous is not None and not isinstance(previous, str):
+            """Retorna um erro caso o identificador da geração anterior não seja uma string"""
+            return handle_400_error("previous must be a string")
+
+        # A primeira página não tem cursor, então sua chave é a mesma de antes da paginação
+        page_params = dict() if cursor is None else dict(cursor=cursor)
+        catalog_version = sync_catalog()
+        generation_key = make_generation_key(
+            classes_id, preference, catalog_version, limit=MAXIMUM_RETURNED_SCHEDULES, **page_params, **generation_params)
+        generation = get_generation_id(generation_key)
+        self.metrics = None
+
         try:
-            schedule_generator = ScheduleGenerator(classes_id, preference)
-            generated_data = schedule_generator.generate()
+            constraints = make_constraints(blocked, free_days, pinned)
+            compactness_weights = None if compactness is None else make_compactness_weights(**compactness)
+            after = decode_cursor(cursor, selection) if cursor else None
+            data = get_or_generate(generation_key, lambda: self.generate_schedules(
+                classes_id, preference, after, selection, generation, catalog_version, previous, constraints, compactness_weights, disciplines),
+                is_partial=lambda generated: generated['partial'])
         except Exception as error:
             """Retorna um erro caso ocorra algum erro ao criar o gerador de horários"""
 
@@ -238,15 +404,329 @@ class GenerateSchedule(APIView):
                     "errors": message_error
                 }, status.HTTP_400_BAD_REQUEST)
 
+        if not settings.SCHEDULE_GENERATION_METRICS:
+            return response.Response(data, status.HTTP_200_OK)
+
+        # Uma página vinda do cache não passa pelo gerador, então não há medições dela
+        metrics = None if self.metrics is None else self.metrics.to_dict(self.stats)
+        timings = {'cache': 0} if metrics is None else metrics['timings']
+
+        if debug:
+            data = {**data, 'metrics': metrics}
+
+        return response.Response(data, status.HTTP_200_OK, headers={'Server-Timing': get_server_timing(timings)})
+
+    def generate_schedules(self, classes_id: list[int], preference: list[int] | None, after: tuple | None,
+                           selection: str, generation: str, catalog_version: int | None, previous: str | None,
+                           constraints: ScheduleConstraints | None = None,
+                           compactness: CompactnessWeights | None = None,
+                           disciplines: tuple[list[int], str, str] | None = None) -> dict:
+        """
+        Gera uma página de grades horárias e a serializa no formato da resposta.
+        Quando a página está cheia, retorna também o cursor para a próxima página.
+        Caso a geração anterior ainda esteja no cache, apenas a turma alterada é explorada.
+        Caso as disciplinas (ids, ano, período) sejam informadas, todas as suas turmas são consideradas.
+        Caso as turmas estejam no catálogo compartilhado, apenas as turmas da página são carregadas pelo ORM.
+        """
+        previous_state = None
+
+        if previous is not None and after is None:
+            previous_state = get_generation_state(previous, catalog_version)
+
+        options = dict(limit=MAXIMUM_RETURNED_SCHEDULES, after=after, previous=previous_state,
+                       constraints=constraints, compactness=compactness)
+
+        if disciplines is None:
+            schedule_generator = ScheduleGenerator(
+                classes_id, preference, catalog=find_shared_catalog(classes_id), **options)
+        else:
+            schedule_generator = ScheduleGenerator.from_disciplines(
+                *disciplines, preference=preference, **options)
+        generated_data = schedule_generator.generate()
+        ranked_schedules = schedule_generator.ranked_schedules
+        self.metrics = schedule_generator.metrics
+        self.stats = schedule_generator.stats
+
+        if after is None:
+            save_generation_state(
+                generation, catalog_version, schedule_generator.get_state())
+
         schedules = generated_data.get("schedules", [])
         message = generated_data.get("message", "")
         data = []
 
-        for schedule in schedules[:MAXIMUM_RETURNED_SCHEDULES]:
-            data.append(
-                list(map(lambda x: serializers.ClassSerializerSchedule(x).data, schedule)))
-        
-        return response.Response({
+        with self.metrics.measure(SERIALIZE_PHASE):
+            for schedule in schedules[:MAXIMUM_RETURNED_SCHEDULES]:
+                data.append(
+                    list(map(lambda x: serializers.ClassSerializerSchedule(x).data, schedule)))
+
+        partial = generated_data.get("partial", False)
+        next_cursor = None
+
+        # Uma página parcial não é necessariamente a melhor, então não há como continuar a partir dela
+        if len(ranked_schedules) == MAXIMUM_RETURNED_SCHEDULES and not partial:
+            next_cursor = encode_cursor(selection, *ranked_schedules[-1])
+
+        return {
             'message': message,
-            'schedules': data
-        }, status.HTTP_200_OK)
+            'schedules': data,
+            'cursor': next_cursor,
+            'generation': generation,
+            'partial': partial
+        }
+
+
+class CountSchedules(APIView):
+    @swagger_auto_schema(
+        operation_description="Conta as grades horárias possíveis para as aulas escolhidas, sem gerá-las",
+        security=[],
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            title="body",
+            required=['classes'],
+            properties={
+                'classes': openapi.Schema(
+                    description="Lista de ids de aulas escolhidas",
+                    type=openapi.TYPE_ARRAY,
+                    items=openapi.Schema(
+                        description="Id da aula",
+                        type=openapi.TYPE_INTEGER
+                    )
+                ),
+                'blocked': openapi.Schema(
+                    description="Lista de horários bloqueados, no formato do SIGAA (ex.: 6T2345)",
+                    type=openapi.TYPE_ARRAY,
+                    items=openapi.Schema(
+                        description="Horário bloqueado",
+                        type=openapi.TYPE_STRING
+                    )
+                ),
+                'free_days': openapi.Schema(
+                    description="Lista de dias que devem ficar livres (2 = segunda-feira, ..., 7 = sábado)",
+                    type=openapi.TYPE_ARRAY,
+                    items=openapi.Schema(
+                        description="Dia livre",
+                        type=openapi.TYPE_INTEGER,
+                        enum=[2, 3, 4, 5, 6, 7]
+                    )
+                ),
+                'pinned': openapi.Schema(
+                    description="Lista de ids de turmas escolhidas que devem estar em todas as grades",
+                    type=openapi.TYPE_ARRAY,
+                    items=openapi.Schema(
+                        description="Id da turma",
+                        type=openapi.TYPE_INTEGER
+                    )
+                )
+            }
+        ),
+        responses={
+            200: serializers.CountSchedulesSerializer(),
+            **Errors([400]).retrieve_erros()
+        }
+    )
+    def post(self, request: request.Request, *args, **kwargs) -> response.Response:
+        """
+        View para contar as grades horárias.
+        Funcionamento: Recebe uma lista de ids de classes e as restrições da geração
+        e retorna a quantidade de grades horárias válidas, sem construir nenhuma delas.
+        """
+
+        classes_id = request.data.get('classes', None)
+        classes_valid = classes_id is not None and isinstance(
+            classes_id, list) and all(isinstance(x, int) for x in classes_id) and len(classes_id) > 0
+
+        if not classes_valid:
+            """Retorna um erro caso a lista de ids de classes não seja enviada"""
+            return handle_400_error("classes is required and must be a list of integers with at least one element")
+
+        blocked = request.data.get('blocked', None)
+        free_days = request.data.get('free_days', None)
+        pinned = request.data.get('pinned', None)
+        constraints_error = get_constraints_error(blocked, free_days, pinned)
+
+        if constraints_error is not None:
+            """Retorna um erro caso as restrições não tenham o formato esperado"""
+            return handle_400_error(constraints_error)
+
+        count_key = make_generation_key(
+            classes_id, None, sync_catalog(), count=True, **get_constraint_params(blocked, free_days, pinned))
+
+        try:
+            constraints = make_constraints(blocked, free_days, pinned)
+            data = get_or_generate(count_key, lambda: {
+                'count': ScheduleGenerator(classes_id, constraints=constraints, catalog=find_shared_catalog(classes_id)).count()
+            })
+        except ValueError as error:
+            """Retorna um erro caso as turmas ou as restrições sejam inválidas"""
+            return handle_400_error(str(error))
+
+        return response.Response(data, status.HTTP_200_OK)
+
+
+class ClassAlternatives(APIView):
+    @swagger_auto_schema(
+        operation_description="Sugere as turmas de uma disciplina que não conflitam com as demais aulas escolhidas, "
+        "ordenadas pela preferência de turno",
+        security=[],
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            title="body",
+            required=['classes', 'discipline'],
+            properties={
+                'classes': openapi.Schema(
+                    description="Lista de ids de aulas escolhidas",
+                    type=openapi.TYPE_ARRAY,
+                    items=openapi.Schema(
+                        description="Id da aula",
+                        type=openapi.TYPE_INTEGER
+                    )
+                ),
+                'discipline': openapi.Schema(
+                    description="Id da disciplina cujas turmas são sugeridas",
+                    type=openapi.TYPE_INTEGER
+                ),
+                'preference': openapi.Schema(
+                    description="Lista de preferências (manhã, tarde, noite)",
+                    type=openapi.TYPE_ARRAY,
+                    items=openapi.Schema(
+                        description="Define o peso de cada turno",
+                        type=openapi.TYPE_INTEGER,
+                        enum=[1, 2, 3]
+                    )
+                )
+            }
+        ),
+        responses={
+            200: serializers.ClassAlternativesSerializer(),
+            **Errors([400]).retrieve_erros()
+        }
+    )
+    def post(self, request: request.Request, *args, **kwargs) -> response.Response:
+        """
+        View para sugerir turmas alternativas.
+        Funcionamento: Recebe uma lista de ids de classes e o id de uma disciplina e retorna
+        as outras turmas da disciplina que não conflitam com as aulas das demais disciplinas.
+        """
+
+        classes_id = request.data.get('classes', None)
+        discipline_id = request.data.get('discipline', None)
+        preference = request.data.get('preference', None)
+
+        if not isinstance(classes_id, list) or not all(isinstance(x, int) for x in classes_id):
+            """Retorna um erro caso a lista de ids de classes não seja enviada"""
+            return handle_400_error("classes is required and must be a list of integers")
+
+        if not isinstance(discipline_id, int):
+            """Retorna um erro caso o id da disciplina não seja enviado"""
+            return handle_400_error("discipline is required and must be an integer")
+
+        preference_valid = isinstance(preference, list) and len(preference) == 3 and all(
+            isinstance(x, int) and MINIMUM_PREFERENCE_RANGE <= x <= MAXIMUM_PREFERENCE_RANGE for x in preference)
+
+        if preference is not None and not preference_valid:
+            """Retorna um erro caso a preferência não seja uma lista de 3 inteiros no intervalo permitido"""
+            return handle_400_error(PREFERENCE_RANGE_ERROR)
+
+        try:
+            alternatives = get_class_alternatives(classes_id, discipline_id, preference)
+        except ValueError as error:
+            """Retorna um erro caso as turmas ou a disciplina sejam inválidas"""
+            return handle_400_error(str(error))
+
+        data = [{**serializers.ClassSerializerSchedule(_class).data, 'priority': priority}
+                for _class, priority in alternatives]
+
+        return response.Response({'alternatives': data}, status.HTTP_200_OK)
+
+
+class FittingDisciplines(APIView):
+    @swagger_auto_schema(
+        operation_description="Busca as disciplinas de um período com ao menos uma turma que não conflita "
+        "com as aulas escolhidas ou com os horários ocupados. Retorna no máximo "
+        f"{MAXIMUM_RETURNED_DISCIPLINES} disciplinas, ordenadas pelo código",
+        security=[],
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            title="body",
+            required=['year', 'period'],
+            properties={
+                'year': openapi.Schema(
+                    description="Ano das disciplinas",
+                    type=openapi.TYPE_STRING
+                ),
+                'period': openapi.Schema(
+                    description="Período das disciplinas",
+                    type=openapi.TYPE_STRING
+                ),
+                'classes': openapi.Schema(
+                    description="Lista de ids de aulas escolhidas. As suas disciplinas não são retornadas",
+                    type=openapi.TYPE_ARRAY,
+                    items=openapi.Schema(
+                        description="Id da aula",
+                        type=openapi.TYPE_INTEGER
+                    )
+                ),
+                'occupied': openapi.Schema(
+                    description="Lista de horários ocupados, no formato do SIGAA (ex.: 6T2345)",
+                    type=openapi.TYPE_ARRAY,
+                    items=openapi.Schema(
+                        description="Horário ocupado",
+                        type=openapi.TYPE_STRING
+                    )
+                )
+            }
+        ),
+        responses={
+            200: serializers.DisciplineSerializer(many=True),
+            **Errors([400]).retrieve_erros()
+        }
+    )
+    def post(self, request: request.Request, *args, **kwargs) -> response.Response:
+        """
+        View para buscar as disciplinas que cabem na grade.
+        Funcionamento: Recebe o ano, o período, os ids das aulas escolhidas e os horários ocupados
+        e retorna as disciplinas com as suas turmas que não conflitam com nenhuma dessas aulas.
+        """
+
+        year = request.data.get('year', None)
+        period = request.data.get('period', None)
+        classes_id = request.data.get('classes', [])
+        occupied = request.data.get('occupied', [])
+
+        if not isinstance(year, str) or not isinstance(period, str):
+            """Retorna um erro caso o ano e o período não sejam enviados"""
+            return handle_400_error("year and period are required and must be strings")
+
+        if not isinstance(classes_id, list) or not all(isinstance(x, int) for x in classes_id):
+            """Retorna um erro caso os ids das aulas não sejam uma lista de inteiros"""
+            return handle_400_error("classes must be a list of integers")
+
+        if not isinstance(occupied, list) or not all(isinstance(x, str) for x in occupied):
+            """Retorna um erro caso os horários ocupados não sejam uma lista de strings"""
+            return handle_400_error("occupied must be a list of strings")
+
+        mask = 0
+
+        try:
+            for schedule in occupied:
+                mask |= compile_schedule_code(schedule)
+        except ValueError as error:
+            """Retorna um erro caso algum horário ocupado seja inválido"""
+            return handle_400_error(str(error))
+
+        classes_mask, disciplines_id, missing_ids = get_classes_mask(classes_id)
+
+        if len(missing_ids):
+            """Retorna um erro caso alguma aula não exista"""
+            return handle_400_error(f"class with id {missing_ids[0]} does not exist.")
+
+        # Turmas que ocupam aulas das escolhidas apenas em outras datas também cabem na grade
+        fitting_ids = get_classes_fitting_by_special_dates(
+            year, period, mask, classes_id, disciplines_id)
+        disciplines = filter_disciplines_by_free_slots(
+            year, period, mask | classes_mask, disciplines_id, fitting_ids)
+        data = serializers.DisciplineSerializer(
+            disciplines[:MAXIMUM_RETURNED_DISCIPLINES], many=True).data
+
+        return response.Response(data, status.HTTP_200_OK)
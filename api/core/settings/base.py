@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 from pathlib import Path
 from decouple import config
 from datetime import timedelta
+import tempfile
 import os
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -68,6 +69,24 @@ CACHES = {
     }
 }
 
+# Schedule generation
+# Quantidade de processos usados na busca paralela de grades horárias (0 desativa a busca paralela)
+
+SCHEDULE_SEARCH_WORKERS = config("SCHEDULE_SEARCH_WORKERS", default=0, cast=int)
+
+# Tempo máximo, em segundos, da busca de grades horárias de uma requisição (0 não limita)
+
+SCHEDULE_GENERATION_TIME_LIMIT = config("SCHEDULE_GENERATION_TIME_LIMIT", default=10, cast=float)
+
+# Expõe os tempos de cada etapa da geração no cabeçalho Server-Timing e, com "debug", os contadores na resposta.
+# Como são detalhes internos, ficam desativados a menos que sejam habilitados pela variável de ambiente
+
+SCHEDULE_GENERATION_METRICS = config("SCHEDULE_GENERATION_METRICS", default=False, cast=bool)
+
+# Pasta dos catálogos compartilhados (mmap) de cada período, construídos pelo comando updatedb
+
+SHARED_CATALOG_DIR = config("SHARED_CATALOG_DIR", default=os.path.join(tempfile.gettempdir(), "suagradeunb-catalog"))
+
 SESSION_ENGINE = "django.contrib.sessions.backends.cache"
 SESSION_CACHE_ALIAS = "default"
 
@@ -3,6 +3,9 @@ from .base import *
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = True
 
+# Em desenvolvimento, as medições da geração de grades horárias são expostas por padrão
+SCHEDULE_GENERATION_METRICS = config("SCHEDULE_GENERATION_METRICS", default=DEBUG, cast=bool)
+
 ALLOWED_HOSTS = [
     "localhost",
     "0.0.0.0",
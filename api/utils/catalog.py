@@ -0,0 +1,45 @@
+from django.core.cache import cache
+from .schedule_code import clear_compiled_schedules
+
+"""Este módulo controla a versão do catálogo de turmas, compartilhada entre os processos pelo cache.
+
+O comando updatedb incrementa a versão sempre que reescreve algum departamento. Cada processo
+compara a versão do cache com a que conhece e descarta os dados compilados quando ela muda.
+"""
+
+CATALOG_VERSION_KEY = "catalog-version"
+
+_loaded_version = None
+
+
+def get_catalog_version() -> int:
+    """Retorna a versão atual do catálogo de turmas."""
+    return cache.get_or_set(CATALOG_VERSION_KEY, 0, timeout=None)
+
+
+def bump_catalog_version() -> int:
+    """Incrementa a versão do catálogo e limpa os dados compilados deste processo."""
+    get_catalog_version()
+    version = cache.incr(CATALOG_VERSION_KEY)
+    sync_catalog()
+
+    return version
+
+
+def sync_catalog() -> int | None:
+    """
+    Limpa os horários compilados deste processo caso o catálogo tenha mudado
+    desde a última verificação. Retorna a versão atual do catálogo.
+    """
+    global _loaded_version
+
+    try:
+        version = get_catalog_version()
+    except:  # pragma: no cover
+        return _loaded_version
+
+    if version != _loaded_version:
+        clear_compiled_schedules()
+        _loaded_version = version
+
+    return version
@@ -0,0 +1,105 @@
+from .db_handler import get_selection_and_discipline_classes
+from .conflict_index import ConflictIndex, get_conflict_index
+from .schedule_code import get_compiled_schedule, get_schedule_priority
+from .special_dates import get_selection_masks
+from api.models import Class
+
+"""Este módulo sugere turmas alternativas de uma disciplina para uma seleção de turmas.
+
+As turmas escolhidas e as da disciplina são carregadas em uma única consulta. As máscaras semanais
+vêm do índice de conflitos do período, construído pelo comando updatedb, e apenas as turmas da
+disciplina são comparadas com as aulas ocupadas pela seleção. Quando há sobreposição semanal, as
+datas especiais decidem o conflito, como na geração de grades horárias.
+"""
+
+
+def get_selection_index(year: str, period: str, classes: list[Class]) -> ConflictIndex:
+    """
+    Retorna o índice de conflitos do período. Caso ele ainda não tenha sido construído
+    (ou não conheça alguma das turmas), monta um índice apenas com as turmas carregadas.
+    """
+    index = get_conflict_index(year, period)
+
+    if index is not None and all(_class.id in index for _class in classes):
+        return index
+
+    return ConflictIndex((_class.id, _class.schedule) for _class in classes)
+
+
+def get_compatible(index: ConflictIndex, rest: list[Class], candidates: list[Class]) -> set[int]:
+    """
+    Retorna os ids das turmas candidatas que não conflitam com nenhuma das demais turmas.
+    Turmas fora do índice (com horário inválido) são ignoradas.
+    """
+    rest = [_class for _class in rest if _class.id in index]
+    candidates = [_class for _class in candidates if _class.id in index]
+    occupied = 0
+
+    for _class in rest:
+        occupied |= index.get_mask(_class.id)
+
+    compatible = {_class.id for _class in candidates if not index.get_mask(_class.id) & occupied}
+
+    if len(compatible) == len(candidates):
+        return compatible
+
+    # As sobreposições semanais só são conflitos caso as aulas aconteçam nas mesmas datas
+    masks = get_selection_masks(rest + candidates)
+
+    if masks is None:
+        return compatible
+
+    occupied = 0
+
+    for _class in rest:
+        occupied |= masks[_class.id]
+
+    return {_class.id for _class in candidates if not masks[_class.id] & occupied}
+
+
+def get_class_alternatives(classes_id: list[int], discipline_id: int,
+                           preference: list[int] = None) -> list[tuple[Class, int]]:
+    """
+    Retorna as turmas da disciplina que não estão na seleção e não conflitam com as turmas escolhidas
+    das demais disciplinas, com as prioridades, da maior para a menor prioridade (e pelo id no empate).
+
+    :param classes_id: Os ids das turmas escolhidas. Turmas escolhidas da própria disciplina são ignoradas
+    :param discipline_id: O id da disciplina cujas turmas são sugeridas
+    :param preference: O peso de cada turno (manhã, tarde, noite). Caso seja None, as turmas são ordenadas pelo id
+    """
+    classes_id = set(classes_id)
+    classes = get_selection_and_discipline_classes(classes_id, discipline_id)
+    found_ids = {_class.id for _class in classes}
+    missing_ids = sorted(classes_id - found_ids)
+
+    if len(missing_ids):
+        raise ValueError(f"class with id {missing_ids[0]} does not exist.")
+
+    candidates = [_class for _class in classes if _class.discipline_id == discipline_id]
+
+    if not len(candidates):
+        raise ValueError(f"discipline with id {discipline_id} has no classes.")
+
+    department = candidates[0].discipline.department
+
+    for _class in classes:
+        other_department = _class.discipline.department
+
+        if (other_department.year, other_department.period) != (department.year, department.period):
+            raise ValueError(f"class with id {_class.id} is not in {department.year}/{department.period}.")
+
+    index = get_selection_index(department.year, department.period, classes)
+    rest = [_class for _class in classes if _class.discipline_id != discipline_id]
+    candidates = [_class for _class in candidates if _class.id not in classes_id]
+    compatible = get_compatible(index, rest, candidates)
+    alternatives = []
+
+    for _class in candidates:
+        if _class.id not in compatible:
+            continue
+
+        priority = 0 if preference is None else get_schedule_priority(
+            get_compiled_schedule(_class.schedule), preference)
+        alternatives.append((_class, priority))
+
+    return sorted(alternatives, key=lambda alternative: (-alternative[1], alternative[0].id))
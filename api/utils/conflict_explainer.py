@@ -0,0 +1,130 @@
+from itertools import combinations, islice, product
+from time import monotonic
+from typing import Hashable
+from .schedule_search import Option, SearchStats, SearchTimeout, search_schedules
+
+"""Este módulo explica por que não há grade horária válida para um conjunto de disciplinas."""
+
+
+class ConflictExplainer:
+    """
+    Classe que monta o grafo de conflitos entre as disciplinas uma única vez e, a partir dele,
+    calcula os menores conjuntos de disciplinas cuja remoção torna possível montar uma grade horária.
+
+    Duas disciplinas são vizinhas no grafo quando alguma turma de uma conflita com alguma turma da outra.
+    Cada componente conexo do grafo pode ser resolvido de forma independente dos demais.
+    """
+
+    def __init__(self, domains: dict[Hashable, list[Option]], deadline: float = None):
+        """
+        :param domains: Um dicionário que relaciona cada disciplina às suas opções de turma
+        :param deadline: Instante (time.monotonic) a partir do qual a explicação é abandonada, marcando timed_out
+        """
+        self.disciplines = list(domains)
+        self.domains = list(domains.values())
+        self.deadline = deadline
+        # Quantidade de verificações de viabilidade feitas pelo explicador
+        self.checks = 0
+        self.timed_out = False
+        self.graph = self._make_conflict_graph()
+        self.components = self._make_components()
+
+    def _has_conflict(self, first: int, second: int) -> bool:
+        return any(option[1] & other[1] for option in self.domains[first] for other in self.domains[second])
+
+    def _make_conflict_graph(self) -> list[set[int]]:
+        graph = [set() for _ in self.domains]
+
+        for first, second in combinations(range(len(self.domains)), 2):
+            if self._has_conflict(first, second):
+                graph[first].add(second)
+                graph[second].add(first)
+
+        return graph
+
+    def _make_components(self) -> list[list[int]]:
+        visited = set()
+        components = []
+
+        for start in range(len(self.domains)):
+            if start in visited:
+                continue
+
+            visited.add(start)
+            stack = [start]
+            component = []
+
+            while stack:
+                current = stack.pop()
+                component.append(current)
+
+                for neighbor in self.graph[current] - visited:
+                    visited.add(neighbor)
+                    stack.append(neighbor)
+
+            components.append(sorted(component))
+
+        return components
+
+    def is_feasible(self, disciplines: list[int]) -> bool:
+        """
+        Verifica se existe ao menos uma grade horária válida com as disciplinas informadas.
+        Levanta SearchTimeout caso o prazo termine antes da resposta.
+        """
+        if self.deadline is not None and monotonic() > self.deadline:
+            raise SearchTimeout()
+
+        self.checks += 1
+        stats = SearchStats()
+        domains = [self.domains[index] for index in disciplines]
+        feasible = next(search_schedules(domains, stats=stats, deadline=self.deadline), None) is not None
+
+        if stats.timed_out:
+            raise SearchTimeout()
+
+        return feasible
+
+    def _get_component_removals(self, component: list[int]) -> list[tuple[int, ...]]:
+        """
+        Retorna os menores conjuntos de disciplinas do componente cuja remoção o torna viável.
+        Caso nenhuma remoção parcial baste (ex.: uma disciplina sem turmas possíveis), o componente inteiro é removido.
+        """
+        if self.is_feasible(component):
+            return []
+
+        for size in range(1, len(component)):
+            removals = [removal for removal in combinations(component, size)
+                        if self.is_feasible([index for index in component if index not in removal])]
+
+            if len(removals):
+                return removals
+
+        return [tuple(component)]
+
+    def get_minimal_removals(self, limit: int = None) -> list[tuple[Hashable, ...]]:
+        """
+        Retorna os menores conjuntos de disciplinas cuja remoção torna a grade horária viável.
+        Cada conjunto combina uma remoção mínima de cada componente inviável do grafo de conflitos.
+        Caso o prazo termine antes, nenhum conjunto é retornado e timed_out é marcado.
+
+        :param limit: Quantidade máxima de conjuntos retornados
+        """
+        components_removals = []
+
+        try:
+            for component in self.components:
+                removals = self._get_component_removals(component)
+
+                if len(removals):
+                    components_removals.append(removals)
+        except SearchTimeout:
+            self.timed_out = True
+            return []
+
+        if not len(components_removals):
+            return []
+
+        removals = islice(product(*components_removals), limit)
+
+        return [tuple(self.disciplines[index] for removal in combination for index in removal)
+                for combination in removals]
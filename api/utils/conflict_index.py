@@ -0,0 +1,83 @@
+from django.core.cache import cache
+from typing import Iterable
+from .schedule_code import compile_schedule_code
+from .db_handler import get_classes_schedules_by_year_and_period
+from .catalog import sync_catalog
+
+"""Este módulo mantém um índice com as máscaras semanais das turmas de um período.
+
+O índice é construído pelo comando updatedb e guardado no cache. Assim, os conflitos semanais entre
+turmas são respondidos com um AND entre máscaras, e nenhum horário precisa ser interpretado durante
+as requisições. As datas especiais não estão no índice e são verificadas por quem o usa.
+"""
+
+CONFLICT_INDEX_KEY = "conflict-index/{year}.{period}"
+
+# Índices já carregados do cache neste processo: (ano, período) -> (versão do catálogo, índice)
+_loaded_indexes = dict()
+
+
+class ConflictIndex:
+    """Índice com as máscaras semanais das turmas de um período."""
+
+    def __init__(self, classes: Iterable[tuple[int, str]]):
+        """
+        :param classes: Pares (id da turma, horário). Turmas com horário inválido ficam fora do índice
+        """
+        self.masks = dict()
+
+        for class_id, schedule in classes:
+            try:
+                self.masks[class_id] = compile_schedule_code(schedule)
+            except ValueError:
+                continue
+
+    def __contains__(self, class_id: int) -> bool:
+        return class_id in self.masks
+
+    def __len__(self) -> int:
+        return len(self.masks)
+
+    def get_mask(self, class_id: int) -> int:
+        return self.masks[class_id]
+
+
+def get_conflict_index_key(year: str, period: str) -> str:
+    return CONFLICT_INDEX_KEY.format(year=year, period=period)
+
+
+def build_conflict_index(year: str, period: str) -> ConflictIndex:
+    """Constrói o índice de conflitos de um período em uma única consulta e o guarda no cache."""
+    index = ConflictIndex(
+        get_classes_schedules_by_year_and_period(year=year, period=period))
+    cache.set(get_conflict_index_key(year, period), index, timeout=None)
+
+    return index
+
+
+def delete_conflict_index(year: str, period: str) -> None:
+    cache.delete(get_conflict_index_key(year, period))
+    _loaded_indexes.pop((year, period), None)
+
+
+def get_conflict_index(year: str, period: str) -> ConflictIndex | None:
+    """
+    Retorna o índice de conflitos de um período, carregando-o do cache apenas quando o
+    catálogo muda. Retorna None caso o índice ainda não tenha sido construído.
+    O comando updatedb guarda o novo índice antes de mudar a versão do catálogo.
+    """
+    version = sync_catalog()
+    loaded = _loaded_indexes.get((year, period))
+
+    if loaded is not None and loaded[0] == version:
+        return loaded[1]
+
+    try:
+        index = cache.get(get_conflict_index_key(year, period))
+    except:  # pragma: no cover
+        return None
+
+    if index is not None:
+        _loaded_indexes[(year, period)] = (version, index)
+
+    return index
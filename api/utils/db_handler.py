@@ -2,13 +2,16 @@ from api.models import Discipline, Department, Class
 from api.serializers import ClassSerializerSchedule
 from api.models import Schedule
 from api.decorators import handle_cache_before_delete
+from utils.schedule_code import split_schedule_mask, join_schedule_mask
+from utils.special_dates import get_selection_masks
 
 from users.models import User
 
 from django.db.models.query import QuerySet
 from django.contrib.postgres.search import SearchVector, SearchQuery, TrigramStrictWordSimilarity
 from django.db.models.manager import BaseManager
-from django.db.models import Q
+from typing import Iterable
+from django.db.models import Q, F, Exists, OuterRef, Prefetch
 
 import json
 
@@ -85,6 +88,133 @@ def get_class_by_id(id: int, classes: BaseManager[Class] = Class.objects) -> Cla
     return classes.get(id=id)
 
 
+def get_classes_by_ids(ids: list[int], classes: BaseManager[Class] = Class.objects) -> tuple[list[Class], list[int]]:
+    """Filtra as turmas pelos ids em uma única consulta, já com a disciplina e o departamento.
+    Retorna as turmas encontradas e os ids que não existem."""
+    found_classes = list(classes.filter(id__in=ids).select_related(
+        "discipline__department"))
+    found_ids = {_class.id for _class in found_classes}
+    missing_ids = sorted(set(ids) - found_ids)
+
+    return found_classes, missing_ids
+
+
+def get_classes_by_disciplines(disciplines_id: list[int], year: str, period: str,
+                               classes: BaseManager[Class] = Class.objects) -> tuple[list[Class], list[int]]:
+    """Filtra todas as turmas das disciplinas de um período em uma única consulta, já com a disciplina e o departamento.
+    Retorna as turmas encontradas e os ids das disciplinas sem nenhuma turma no período."""
+    found_classes = list(classes.filter(discipline_id__in=disciplines_id, discipline__department__year=year,
+                                        discipline__department__period=period).select_related("discipline__department"))
+    found_ids = {_class.discipline_id for _class in found_classes}
+    missing_ids = sorted(set(disciplines_id) - found_ids)
+
+    return found_classes, missing_ids
+
+
+def get_selection_and_discipline_classes(classes_id: list[int], discipline_id: int,
+                                         classes: BaseManager[Class] = Class.objects) -> list[Class]:
+    """Filtra, em uma única consulta, as turmas escolhidas e todas as turmas de uma disciplina,
+    já com a disciplina e o departamento."""
+    return list(classes.filter(Q(id__in=classes_id) | Q(discipline_id=discipline_id)).select_related(
+        "discipline__department"))
+
+
+def get_classes_mask(ids: list[int], classes: BaseManager[Class] = Class.objects) -> tuple[int, list[int], list[int]]:
+    """Retorna, em uma única consulta, a união das máscaras de aulas das turmas, os ids (ordenados)
+    das suas disciplinas e os ids das turmas que não existem. Turmas com horário inválido não ocupam aulas."""
+    mask = 0
+    disciplines_id = set()
+    found_ids = set()
+
+    for class_id, discipline_id, mask_low, mask_high in classes.filter(id__in=ids).values_list(
+            "id", "discipline_id", "mask_low", "mask_high"):
+        found_ids.add(class_id)
+        disciplines_id.add(discipline_id)
+
+        if mask_low is not None:
+            mask |= join_schedule_mask(mask_low, mask_high)
+
+    return mask, sorted(disciplines_id), sorted(set(ids) - found_ids)
+
+
+def filter_classes_by_free_slots(mask: int, fitting_ids: Iterable[int] = None,
+                                 classes: BaseManager[Class] = Class.objects) -> QuerySet:
+    """Filtra as turmas (com horário válido) que não ocupam nenhuma das aulas da máscara, com os operadores de bits do banco.
+    As turmas de fitting_ids são mantidas mesmo que ocupem alguma aula da máscara (ex.: apenas em outras datas)."""
+    mask_low, mask_high = split_schedule_mask(mask)
+
+    return classes.filter(mask_low__isnull=False).annotate(
+        low_conflicts=F("mask_low").bitand(mask_low),
+        high_conflicts=F("mask_high").bitand(mask_high)
+    ).filter(Q(low_conflicts=0, high_conflicts=0) | Q(id__in=fitting_ids or []))
+
+
+def get_classes_fitting_by_special_dates(year: str, period: str, mask: int, classes_id: list[int], excluded_ids: list[int] = None,
+                                         classes: BaseManager[Class] = Class.objects) -> list[int]:
+    """Retorna os ids das turmas do período que ocupam aulas das turmas escolhidas, mas apenas em outras datas.
+    Turmas sem datas especiais ocupam as suas aulas durante todo o semestre, então só as turmas com datas especiais
+    podem caber apesar da sobreposição semanal, e apenas quando alguma turma escolhida também tem datas especiais.
+
+    :param mask: A máscara dos horários ocupados durante todo o semestre, que nenhuma turma pode ocupar
+    """
+    selection = list(classes.filter(id__in=classes_id, mask_low__isnull=False).only(
+        "id", "schedule", "special_dates", "mask_low", "mask_high"))
+
+    if not any(_class.special_dates for _class in selection):
+        return []
+
+    selection_mask = 0
+
+    for _class in selection:
+        selection_mask |= join_schedule_mask(_class.mask_low, _class.mask_high)
+
+    selection_low, selection_high = split_schedule_mask(selection_mask)
+    period_classes = classes.filter(discipline__department__year=year, discipline__department__period=period).exclude(
+        special_dates=[]).exclude(discipline_id__in=excluded_ids or [])
+    candidates = list(filter_classes_by_free_slots(mask, classes=period_classes).annotate(
+        low_overlaps=F("mask_low").bitand(selection_low),
+        high_overlaps=F("mask_high").bitand(selection_high)
+    ).exclude(low_overlaps=0, high_overlaps=0))
+
+    if not len(candidates):
+        return []
+
+    masks = get_selection_masks(selection + candidates)
+    occupied = 0
+
+    for _class in selection:
+        occupied |= masks[_class.id]
+
+    return [_class.id for _class in candidates if not masks[_class.id] & occupied]
+
+
+def filter_disciplines_by_free_slots(year: str, period: str, mask: int, excluded_ids: list[int] = None, fitting_ids: list[int] = None,
+                                     disciplines: BaseManager[Discipline] = Discipline.objects) -> QuerySet:
+    """Filtra as disciplinas do período com ao menos uma turma que não ocupa nenhuma das aulas da máscara.
+    As turmas de cada disciplina são carregadas já filtradas, em uma única consulta para todas as disciplinas.
+
+    :param fitting_ids: Turmas que cabem mesmo ocupando aulas da máscara (ver get_classes_fitting_by_special_dates)
+    """
+    fitting_classes = filter_classes_by_free_slots(mask, fitting_ids)
+
+    return filter_disciplines_by_year_and_period(year, period, disciplines).exclude(id__in=excluded_ids or []).filter(
+        Exists(fitting_classes.filter(discipline=OuterRef("pk")))
+    ).select_related("department").prefetch_related(Prefetch("classes", queryset=fitting_classes)).order_by("code")
+
+
+def get_classes_schedules_by_year_and_period(year: str, period: str, classes: BaseManager[Class] = Class.objects) -> QuerySet:
+    """Retorna os pares (id, horário) de todas as turmas de um período."""
+    return classes.filter(discipline__department__year=year,
+                          discipline__department__period=period).values_list("id", "schedule")
+
+
+def get_catalog_classes_by_year_and_period(year: str, period: str, classes: BaseManager[Class] = Class.objects) -> QuerySet:
+    """Retorna, ordenados pelo id, os dados de todas as turmas de um período usados pelo catálogo compartilhado:
+    (id, id da disciplina, horário, datas especiais, código da disciplina, nome da disciplina)."""
+    return classes.filter(discipline__department__year=year, discipline__department__period=period).order_by("id").values_list(
+        "id", "discipline_id", "schedule", "special_dates", "discipline__code", "discipline__name")
+
+
 def get_class_by_params(classes: BaseManager[Class] = Class.objects, **kwargs) -> Class | None:
     """Filtra as turmas pelos argumentos: nome, código, departamento, ..."""
 
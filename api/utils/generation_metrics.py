@@ -0,0 +1,61 @@
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Iterator
+from .schedule_search import SearchStats
+
+"""Este módulo registra os contadores e os tempos de cada etapa de uma geração de grades horárias.
+
+Os tempos são medidos por etapa (carregamento das turmas, compilação dos horários, busca,
+explicação dos conflitos e serialização), para que uma geração lenta possa ser atribuída
+à etapa responsável. As medições são expostas no cabeçalho Server-Timing da resposta.
+"""
+
+LOAD_PHASE = "load"
+PARSE_PHASE = "parse"
+SEARCH_PHASE = "search"
+EXPLAIN_PHASE = "explain"
+SERIALIZE_PHASE = "serialize"
+
+
+class GenerationMetrics:
+    """Contadores e tempos de uma geração de grades horárias.
+    classes:int -> Turmas carregadas
+    schedule_codes:int -> Horários distintos compilados
+    conflict_checks:int -> Verificações de viabilidade feitas para explicar os conflitos
+    timings:dict -> Tempo de cada etapa, em segundos
+    """
+
+    def __init__(self) -> None:
+        self.classes = 0
+        self.schedule_codes = 0
+        self.conflict_checks = 0
+        self.timings = dict()
+
+    @contextmanager
+    def measure(self, phase: str) -> Iterator[None]:
+        """Soma ao tempo da etapa o tempo gasto dentro do bloco."""
+        start_time = perf_counter()
+
+        try:
+            yield
+        finally:
+            self.timings[phase] = self.timings.get(phase, 0) + perf_counter() - start_time
+
+    def to_dict(self, stats: SearchStats) -> dict:
+        """Retorna os contadores da geração e da busca, com os tempos em milissegundos."""
+        return {
+            'classes': self.classes,
+            'schedule_codes': self.schedule_codes,
+            'nodes': stats.nodes,
+            'candidates': stats.candidates,
+            'pruned': stats.pruned,
+            'schedules': stats.schedules,
+            'conflict_checks': self.conflict_checks,
+            'timed_out': stats.timed_out,
+            'timings': {phase: round(duration * 1000, 3) for phase, duration in self.timings.items()}
+        }
+
+
+def get_server_timing(timings: dict[str, float]) -> str:
+    """Formata os tempos (em milissegundos) de cada etapa no formato do cabeçalho Server-Timing."""
+    return ", ".join(f"{phase};dur={duration:.3f}" for phase, duration in timings.items())
@@ -0,0 +1,83 @@
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import chain
+from threading import Lock
+from .schedule_search import Option, SearchStats, split_domains, select_best_schedules, rank_schedules
+
+"""Este módulo executa a busca de grades horárias em paralelo, em um pool de processos.
+
+O espaço de busca é dividido pelas turmas da disciplina mais restrita e cada parte é explorada
+por um processo do pool. Os melhores resultados de cada parte são depois intercalados.
+O pool é criado uma única vez por processo e reaproveitado entre as requisições.
+"""
+
+_executor = None
+_executor_lock = Lock()
+
+
+def warm_worker() -> None:
+    """Executa uma busca mínima para que o processo já esteja pronto ao receber a primeira parte."""
+    select_best_schedules([[(0, 0, 0)]], 1)
+
+
+def select_partition_schedules(partition: list[list[Option]], limit: int | None, after: tuple | None,
+                               deadline: float | None) -> tuple[list[tuple[int, tuple[int, ...]]], SearchStats]:
+    """Seleciona as melhores grades de uma parte do espaço de busca, junto com os contadores da busca."""
+    stats = SearchStats()
+    schedules = select_best_schedules(partition, limit, after, stats, deadline)
+
+    return schedules, stats
+
+
+def get_executor(workers: int) -> ProcessPoolExecutor:
+    """Retorna o pool de processos compartilhado, criando-o na primeira chamada."""
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=workers, initializer=warm_worker)
+
+        return _executor
+
+
+def shutdown_executor() -> None:
+    """Encerra o pool de processos compartilhado."""
+    global _executor
+
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(cancel_futures=True)
+            _executor = None
+
+
+def select_best_schedules_in_parallel(domains: list[list[Option]], limit: int = None,
+                                      after: tuple[int, tuple[int, ...]] = None, workers: int = 2,
+                                      stats: SearchStats = None, deadline: float = None) -> list[tuple[int, tuple[int, ...]]]:
+    """
+    Seleciona as melhores grades horárias explorando cada parte do espaço de busca em um processo.
+    Caso o pool esteja indisponível, a busca é feita no próprio processo.
+    O prazo (time.monotonic) vale para todos os processos, já que o relógio é o mesmo no sistema.
+    """
+    stats = SearchStats() if stats is None else stats
+    partitions = split_domains(domains)
+
+    if len(partitions) == 1:
+        return select_best_schedules(domains, limit, after, stats, deadline)
+
+    try:
+        executor = get_executor(workers)
+        futures = [executor.submit(select_partition_schedules, partition, limit, after, deadline)
+                   for partition in partitions]
+        results = [future.result() for future in futures]
+    except BrokenProcessPool:  # pragma: no cover
+        shutdown_executor()
+        return select_best_schedules(domains, limit, after, stats, deadline)
+
+    for _, partition_stats in results:
+        stats.merge(partition_stats)
+
+    schedules = rank_schedules(chain.from_iterable(
+        schedules for schedules, _ in results))
+
+    return schedules if limit is None else schedules[:limit]
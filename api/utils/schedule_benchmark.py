@@ -0,0 +1,173 @@
+from random import Random
+from statistics import mean
+from time import perf_counter
+from typing import NamedTuple
+import tracemalloc
+from .schedule_generator import ScheduleGenerator, MAXIMUM_DISCIPLINES, MAXIMUM_CLASSES_FOR_DISCIPLINE
+from api.models import Department, Discipline, Class
+
+"""Este módulo mede o desempenho do gerador de grades horárias com turmas sintéticas.
+
+As turmas seguem o formato dos horários do SIGAA e não são salvas no banco de dados,
+então as medições dependem apenas do gerador.
+"""
+
+# Mesmo limite de grades retornadas pela rota de geração
+BENCHMARK_LIMIT = 5
+
+# Dias e horários mais comuns nas turmas do SIGAA
+DAY_PATTERNS = ["24", "35", "46", "246", "35", "24", "2", "3", "4", "5", "6", "7"]
+SLOT_PATTERNS = {
+    "M": ["12", "34", "1234", "12", "34"],
+    "T": ["12", "34", "56", "23", "45", "1234"],
+    "N": ["12", "34", "1234"]
+}
+
+# Aulas de cada turno no SIGAA, usadas como aulas reservadas: cada turma sem conflito recebe uma aula só sua
+TURN_SLOTS = {"M": "12345", "T": "1234567", "N": "1234"}
+RESERVED_CODES = [f"{day}{turn}{slot}" for day in "234567" for turn, slots in TURN_SLOTS.items() for slot in slots]
+
+
+class Workload(NamedTuple):
+    """Cenário de medição.
+    disciplines:int -> Quantidade de disciplinas escolhidas
+    classes_per_discipline:int -> Quantidade de turmas de cada disciplina
+    turns:str -> Turnos sorteados para os horários das turmas (a repetição aumenta a chance do turno)
+    ead_ratio:float -> Proporção de turmas EAD, que não têm horário
+    conflict_density:float -> Proporção de turmas com horário sorteado entre os mais comuns, que conflitam com frequência.
+        As demais recebem uma aula reservada, que nenhuma outra turma sem conflito ocupa
+    """
+    disciplines: int
+    classes_per_discipline: int
+    turns: str
+    ead_ratio: float
+    conflict_density: float = 1
+
+
+WORKLOADS = {
+    "small": Workload(3, 2, "MTN", 0),
+    "typical": Workload(6, 3, "MMTTN", 0),
+    "worst_case": Workload(MAXIMUM_DISCIPLINES, MAXIMUM_CLASSES_FOR_DISCIPLINE, "MTN", 0),
+    "heavy_morning": Workload(8, MAXIMUM_CLASSES_FOR_DISCIPLINE, "MMMMT", 0),
+    "ead": Workload(8, MAXIMUM_CLASSES_FOR_DISCIPLINE, "MTN", 0.5),
+    # Nenhuma turma conflita com as das outras disciplinas, então todas as combinações são grades válidas
+    "disjoint": Workload(MAXIMUM_DISCIPLINES, MAXIMUM_CLASSES_FOR_DISCIPLINE, "MTN", 0, 0),
+    "sparse": Workload(MAXIMUM_DISCIPLINES, MAXIMUM_CLASSES_FOR_DISCIPLINE, "MTN", 0, 0.2)
+}
+
+
+class BenchmarkResult(NamedTuple):
+    """Resultado da medição de um cenário.
+    workload:str -> Nome do cenário
+    classes:int -> Quantidade de turmas enviadas ao gerador
+    best_time:float -> Menor tempo de geração, em segundos
+    mean_time:float -> Tempo médio de geração, em segundos
+    peak_memory:int -> Pico de memória alocada durante uma geração, em bytes
+    nodes:int -> Grades parciais visitadas pela busca
+    candidates:int -> Turmas examinadas pela busca
+    schedules:int -> Grades válidas encontradas pela busca
+    returned:int -> Grades retornadas pelo gerador
+    """
+    workload: str
+    classes: int
+    best_time: float
+    mean_time: float
+    peak_memory: int
+    nodes: int
+    candidates: int
+    schedules: int
+    returned: int
+
+
+def make_schedule(random: Random, turns: str) -> str:
+    """Sorteia um horário no formato do SIGAA com um ou dois encontros semanais."""
+    codes = []
+
+    for _ in range(random.choice([1, 1, 2])):
+        turn = random.choice(turns)
+        codes.append(
+            f"{random.choice(DAY_PATTERNS)}{turn}{random.choice(SLOT_PATTERNS[turn])}")
+
+    return " ".join(codes)
+
+
+def make_classes(workload: Workload, seed: int = 0) -> list[Class]:
+    """Cria as turmas sintéticas (não salvas no banco de dados) de um cenário."""
+    if workload.conflict_density < 1 and workload.disciplines * workload.classes_per_discipline > len(RESERVED_CODES):
+        raise ValueError(f"at most {len(RESERVED_CODES)} classes can have a reserved slot.")
+
+    random = Random(seed)
+    department = Department(id=1, code="BENCH", year="2030", period="1")
+    classes = []
+
+    for discipline_index in range(workload.disciplines):
+        discipline = Discipline(id=discipline_index + 1, name=f"Disciplina {discipline_index + 1}",
+                                code=f"BENCH{discipline_index + 1:03}", department=department)
+
+        for class_index in range(workload.classes_per_discipline):
+            is_ead = random.random() < workload.ead_ratio
+            # Sem sortear a densidade quando ela é 1, os cenários antigos mantêm as mesmas turmas para cada semente
+            is_shared = workload.conflict_density >= 1 or random.random() < workload.conflict_density
+
+            if is_ead:
+                schedule = ""
+            elif is_shared:
+                schedule = make_schedule(random, workload.turns)
+            else:
+                schedule = RESERVED_CODES[len(classes)]
+
+            classes.append(Class(id=len(classes) + 1, teachers=["A definir"], classroom="EAD" if is_ead else "A definir",
+                                 schedule=schedule, days=[], _class=str(class_index + 1),
+                                 special_dates=[], discipline=discipline))
+
+    return classes
+
+
+def run_generator(classes: list[Class], preference: list[int], limit: int | None) -> ScheduleGenerator:
+    generator = ScheduleGenerator.from_classes(
+        classes, preference=preference, limit=limit, workers=0, time_limit=0)
+    generator.generate()
+
+    return generator
+
+
+def run_workload(name: str, seed: int = 0, repeat: int = 3, limit: int | None = BENCHMARK_LIMIT,
+                 preference: list[int] = [3, 2, 1], conflict_density: float = None) -> BenchmarkResult:
+    """
+    Mede um cenário: o tempo é medido em "repeat" execuções sem o tracemalloc,
+    e a memória e os contadores da busca em uma execução separada.
+
+    :param conflict_density: Caso informada, substitui a densidade de conflitos do cenário
+    """
+    workload = WORKLOADS[name]
+
+    if conflict_density is not None:
+        workload = workload._replace(conflict_density=conflict_density)
+
+    classes = make_classes(workload, seed)
+    times = []
+
+    for _ in range(repeat):
+        start_time = perf_counter()
+        run_generator(classes, preference, limit)
+        times.append(perf_counter() - start_time)
+
+    tracemalloc.start()
+
+    try:
+        generator = run_generator(classes, preference, limit)
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return BenchmarkResult(
+        workload=name,
+        classes=len(classes),
+        best_time=min(times),
+        mean_time=mean(times),
+        peak_memory=peak_memory,
+        nodes=generator.stats.nodes,
+        candidates=generator.stats.candidates,
+        schedules=generator.stats.schedules,
+        returned=len(generator.ranked_schedules)
+    )
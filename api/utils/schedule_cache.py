@@ -0,0 +1,113 @@
+from django.core.cache import cache
+from core.settings.base import HOUR_IN_SECS
+from typing import Callable, Any
+from time import time, sleep
+import hashlib
+import json
+
+"""Este módulo guarda no cache as grades horárias geradas, agrupando requisições idênticas.
+
+Quando várias requisições iguais chegam ao mesmo tempo, apenas uma delas gera as grades
+enquanto as outras aguardam o resultado ser salvo no cache.
+"""
+
+GENERATED_SCHEDULES_TIMEOUT = HOUR_IN_SECS
+# Resultados parciais (ex.: de uma busca interrompida pelo prazo) só agrupam as requisições simultâneas
+PARTIAL_GENERATION_TIMEOUT = 60
+GENERATION_LOCK_TIMEOUT = 30
+GENERATION_WAIT_INTERVAL = 0.05
+
+
+def make_generation_key(classes_id: list[int], preference: list[int] | None, catalog_version: int | None, **params) -> str:
+    """
+    Cria a chave do cache de uma geração a partir dos ids das turmas (ordenados), da preferência,
+    da versão do catálogo de turmas e de quaisquer outros parâmetros que alterem o resultado.
+    """
+    payload = json.dumps({
+        'classes': sorted(set(classes_id)),
+        'preference': preference,
+        **params
+    }, sort_keys=True)
+    digest = hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    return f"generate/{catalog_version}/{digest}"
+
+
+def get_generation_id(key: str) -> str:
+    """Retorna o identificador público de uma geração, sem a versão do catálogo."""
+    return key.rsplit("/", 1)[-1]
+
+
+def make_state_key(generation: str, catalog_version: int | None) -> str:
+    return f"generate/{catalog_version}/{generation}/state"
+
+
+def save_generation_state(generation: str, catalog_version: int | None, state: dict) -> None:
+    """Guarda o estado de uma geração para que as próximas gerações com uma turma a mais ou a menos o reaproveitem."""
+    try:
+        cache.set(make_state_key(generation, catalog_version),
+                  state, timeout=GENERATED_SCHEDULES_TIMEOUT)
+    except:  # pragma: no cover
+        pass
+
+
+def get_generation_state(generation: str, catalog_version: int | None) -> dict | None:
+    """Retorna o estado de uma geração anterior, caso ainda esteja no cache e o catálogo não tenha mudado."""
+    return get_cached_generation(make_state_key(generation, catalog_version))
+
+
+def get_cached_generation(key: str) -> Any | None:
+    try:
+        return cache.get(key)
+    except:  # pragma: no cover
+        return None
+
+
+def wait_for_generation(key: str, lock_key: str) -> Any | None:
+    """Aguarda outra requisição terminar a geração. Retorna None caso a trava seja liberada sem resultado."""
+    deadline = time() + GENERATION_LOCK_TIMEOUT
+
+    while time() < deadline:
+        sleep(GENERATION_WAIT_INTERVAL)
+        value = get_cached_generation(key)
+
+        if value is not None or cache.add(lock_key, True, timeout=GENERATION_LOCK_TIMEOUT):
+            return value
+
+    return None  # pragma: no cover
+
+
+def get_or_generate(key: str, generate: Callable[[], Any], is_partial: Callable[[Any], bool] = None) -> Any:
+    """
+    Retorna o valor guardado no cache para a chave. Caso não exista, apenas uma requisição
+    executa "generate" e salva o resultado, enquanto as requisições idênticas aguardam.
+    Erros levantados por "generate" não são guardados no cache.
+
+    :param is_partial: Caso informado, os valores para os quais retorna True ficam pouco tempo no cache
+    """
+    value = get_cached_generation(key)
+
+    if value is not None:
+        return value
+
+    lock_key = f"{key}/lock"
+
+    try:
+        locked = cache.add(lock_key, True, timeout=GENERATION_LOCK_TIMEOUT)
+    except:  # pragma: no cover
+        return generate()
+
+    if not locked:
+        value = wait_for_generation(key, lock_key)
+
+        if value is not None:
+            return value
+
+    try:
+        value = generate()
+        partial = is_partial is not None and is_partial(value)
+        cache.set(key, value, timeout=PARTIAL_GENERATION_TIMEOUT if partial else GENERATED_SCHEDULES_TIMEOUT)
+    finally:
+        cache.delete(lock_key)
+
+    return value
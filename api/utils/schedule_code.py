@@ -0,0 +1,111 @@
+from re import fullmatch
+from functools import lru_cache
+from typing import NamedTuple
+
+"""Este módulo compila os códigos de horário do SIGAA (ex.: "35T23") em máscaras de bits.
+
+Cada aula da semana ocupa um bit de um inteiro: 6 dias x 3 turnos x 7 horários.
+Assim, verificar o conflito entre duas turmas se resume a um único "&".
+"""
+
+AVAILABLE_DAYS = "234567"
+AVAILABLE_TURNS = "MTN"
+SLOTS_PER_TURN = 7
+SLOTS_PER_DAY = SLOTS_PER_TURN * len(AVAILABLE_TURNS)
+MASK_WIDTH = SLOTS_PER_DAY * len(AVAILABLE_DAYS)
+
+SCHEDULE_CODE_REGEX = f"([{AVAILABLE_DAYS}]+)([{AVAILABLE_TURNS}])([1-{SLOTS_PER_TURN}]+)"
+
+# Um período tem poucas centenas de horários distintos, então o registro cabe com folga
+COMPILED_SCHEDULES_MAXSIZE = 2048
+
+# No banco de dados, as máscaras são guardadas em duas colunas bigint positivas, com 63 bits cada
+MASK_COLUMN_BITS = 63
+MASK_COLUMN_LIMIT = (1 << MASK_COLUMN_BITS) - 1
+
+
+class CompiledSchedule(NamedTuple):
+    """Horário compilado.
+    mask:int -> Máscara de bits com as aulas ocupadas
+    components:tuple -> Componentes da prioridade para cada turno (manhã, tarde, noite)
+    """
+    mask: int
+    components: tuple[int, int, int]
+
+
+def split_schedule_code(schedule: str) -> list[tuple[str, str, str]]:
+    """Separa um horário do SIGAA em uma lista de (dias, turno, horários)."""
+    values = []
+
+    for code in schedule.split():
+        match = fullmatch(SCHEDULE_CODE_REGEX, code)
+
+        if match is None:
+            raise ValueError(f"invalid schedule code: {code}")
+
+        values.append(match.groups())
+
+    return values
+
+
+def get_slot_bit(day: str, turn: str, slot: str) -> int:
+    """Retorna a posição do bit que representa uma aula (dia, turno, horário)."""
+    day_index = AVAILABLE_DAYS.index(day)
+    turn_index = AVAILABLE_TURNS.index(turn)
+
+    return day_index * SLOTS_PER_DAY + turn_index * SLOTS_PER_TURN + int(slot) - 1
+
+
+def compile_schedule_code(schedule: str) -> int:
+    """Converte um horário do SIGAA em uma máscara de bits com todas as aulas ocupadas."""
+    mask = 0
+
+    for days, turn, slots in split_schedule_code(schedule):
+        for day in days:
+            for slot in slots:
+                mask |= 1 << get_slot_bit(day, turn, slot)
+
+    return mask
+
+
+def split_schedule_mask(mask: int) -> tuple[int, int]:
+    """Divide uma máscara nas colunas (bits menos significativos, bits mais significativos) do banco de dados."""
+    return mask & MASK_COLUMN_LIMIT, mask >> MASK_COLUMN_BITS
+
+
+def join_schedule_mask(low: int, high: int) -> int:
+    """Reconstrói a máscara a partir das colunas do banco de dados."""
+    return low | (high << MASK_COLUMN_BITS)
+
+
+def get_turn_priority(days: str, slots: str) -> int:
+    """
+    Calcula o componente de prioridade de um horário dentro do seu turno.
+    Quanto mais cedo for o horário, maior será a prioridade, independentemente do turno.
+    Quanto mais aulas na semana a disciplina tiver, maior será a prioridade.
+    """
+    return 5 * len(slots) - sum(map(int, slots)) + len(days)
+
+
+@lru_cache(maxsize=COMPILED_SCHEDULES_MAXSIZE)
+def get_compiled_schedule(schedule: str) -> CompiledSchedule:
+    """
+    Retorna o horário compilado a partir do registro compartilhado por todas as requisições
+    do processo. Os horários menos usados recentemente são descartados quando o registro enche.
+    """
+    components = [0] * len(AVAILABLE_TURNS)
+
+    for days, turn, slots in split_schedule_code(schedule):
+        components[AVAILABLE_TURNS.index(turn)] += get_turn_priority(days, slots)
+
+    return CompiledSchedule(compile_schedule_code(schedule), tuple(components))
+
+
+def get_schedule_priority(compiled_schedule: CompiledSchedule, preference: list[int]) -> int:
+    """Calcula a prioridade de um horário a partir do peso de cada turno."""
+    return sum(weight * component for weight, component in zip(preference, compiled_schedule.components))
+
+
+def clear_compiled_schedules() -> None:
+    """Limpa o registro de horários compilados."""
+    get_compiled_schedule.cache_clear()
@@ -0,0 +1,177 @@
+from heapq import heappush, heapreplace
+from time import monotonic
+from typing import Iterable, NamedTuple
+from .schedule_code import AVAILABLE_DAYS, SLOTS_PER_DAY
+from .schedule_search import Option, SearchStats, SearchTimeout, DEADLINE_CHECK_INTERVAL
+from .schedule_search import reduce_domains, get_search_order, is_ranked_after, rank_schedules
+
+"""Este módulo ordena as grades horárias pela compacidade, além da preferência de turnos.
+
+A pontuação de uma grade é a soma das prioridades das turmas (o peso de cada turno) menos as penalidades
+pelas janelas (aulas vagas entre a primeira e a última aula de um dia) e pelos dias com aula.
+Essas penalidades dependem da grade inteira, então são calculadas sobre as aulas ocupadas durante a busca.
+Um limite superior admissível da pontuação permite abandonar os ramos que não superam a K-ésima melhor grade.
+"""
+
+MAXIMUM_COMPACTNESS_WEIGHT = 10
+COMPACTNESS_WEIGHT_ERROR = f"compactness weights must be integers with range [0, {MAXIMUM_COMPACTNESS_WEIGHT}]"
+
+DAY_MASK = (1 << SLOTS_PER_DAY) - 1
+DAY_SHIFTS = tuple(day_index * SLOTS_PER_DAY for day_index in range(len(AVAILABLE_DAYS)))
+
+
+class CompactnessWeights(NamedTuple):
+    """Pesos das penalidades de compacidade.
+    gaps:int -> Penalidade por aula vaga entre duas aulas de um mesmo dia
+    days:int -> Penalidade por dia com aula
+    """
+    gaps: int = 1
+    days: int = 1
+
+
+def make_compactness_weights(gaps: int = 1, days: int = 1) -> CompactnessWeights:
+    """Cria os pesos de compacidade, verificando se são inteiros no intervalo permitido."""
+    for weight in (gaps, days):
+        if not isinstance(weight, int) or isinstance(weight, bool) or not 0 <= weight <= MAXIMUM_COMPACTNESS_WEIGHT:
+            raise ValueError(COMPACTNESS_WEIGHT_ERROR)
+
+    return CompactnessWeights(gaps, days)
+
+
+def get_day_layout(masks: Iterable[int]) -> int:
+    """
+    Retorna as aulas de um dia usadas por alguma das turmas, repetidas em todos os dias.
+    Horários que nenhuma turma usa (ex.: o intervalo entre os turnos) não contam como janela.
+    """
+    layout = 0
+
+    for mask in masks:
+        for shift in DAY_SHIFTS:
+            layout |= (mask >> shift) & DAY_MASK
+
+    return sum(layout << shift for shift in DAY_SHIFTS)
+
+
+def get_gaps_mask(occupied: int, layout: int) -> int:
+    """Retorna as aulas vagas do layout entre a primeira e a última aula ocupada de cada dia."""
+    gaps = 0
+
+    for shift in DAY_SHIFTS:
+        day = (occupied >> shift) & DAY_MASK
+
+        if day:
+            span = (1 << day.bit_length()) - (day & -day)
+            gaps |= (span & ~day) << shift
+
+    return gaps & layout
+
+
+def count_days(occupied: int) -> int:
+    return sum(1 for shift in DAY_SHIFTS if (occupied >> shift) & DAY_MASK)
+
+
+def get_compactness_penalty(occupied: int, weights: CompactnessWeights, layout: int) -> int:
+    """Calcula a penalidade de compacidade de uma grade a partir das aulas semanais ocupadas."""
+    return weights.gaps * get_gaps_mask(occupied, layout).bit_count() + weights.days * count_days(occupied)
+
+
+def search_compact_schedules(domains: list[list[Option]], weekly_masks: dict[int, int], weights: CompactnessWeights,
+                             limit: int = None, after: tuple[int, tuple[int, ...]] = None, stats: SearchStats = None,
+                             deadline: float = None) -> list[tuple[int, tuple[int, ...]]]:
+    """
+    Seleciona as melhores grades pela pontuação de compacidade, com a mesma ordem (pontuação decrescente
+    e ids crescentes) e o mesmo formato das demais buscas, de forma que os cursores continuem válidos.
+
+    O limite superior de um ramo soma à prioridade atual a maior prioridade das disciplinas restantes e
+    subtrai a menor penalidade ainda possível: os dias já ocupados e as janelas que nenhuma turma restante
+    pode preencher. Como os dias ocupados só aumentam e as janelas sem turma nunca são preenchidas,
+    o limite nunca subestima a pontuação de uma grade do ramo.
+
+    :param weekly_masks: Máscara semanal (sem a expansão das datas especiais) de cada turma
+    :param limit: Quantidade máxima de grades. Caso seja None, todas as grades são ordenadas, sem poda
+    """
+    # O layout considera todas as turmas escolhidas, para que a pontuação não dependa da poda dos domínios
+    layout = get_day_layout(weekly_masks[option[0]] for domain in domains for option in domain)
+    domains = reduce_domains(domains)
+    order = get_search_order(domains)
+    ordered_domains = [sorted(domains[index], key=lambda option: -option[2]) for index in order]
+    chosen = [None] * len(domains)
+    depth_limit = len(domains)
+    stats = SearchStats() if stats is None else stats
+    best = []
+    schedules = []
+
+    if limit is not None and limit <= 0:
+        return []
+
+    # Maior prioridade e aulas alcançáveis pelas disciplinas restantes a partir de cada profundidade
+    maximum_rest = [0] * (depth_limit + 1)
+    reachable = [0] * (depth_limit + 1)
+
+    for depth in reversed(range(depth_limit)):
+        maximum_rest[depth] = maximum_rest[depth + 1] + \
+            max((option[2] for option in ordered_domains[depth]), default=0)
+
+        for option in ordered_domains[depth]:
+            reachable[depth] |= weekly_masks[option[0]]
+
+        reachable[depth] |= reachable[depth + 1]
+
+    def get_upper_bound(depth: int, weekly: int, priority: int) -> int:
+        fixed_gaps = get_gaps_mask(weekly, layout) & ~reachable[depth]
+
+        return priority + maximum_rest[depth] - weights.gaps * fixed_gaps.bit_count() - weights.days * count_days(weekly)
+
+    def add_schedule(score: int, schedule: tuple[int, ...]) -> None:
+        stats.schedules += 1
+
+        if after is not None and not is_ranked_after(score, schedule, after):
+            return
+
+        if limit is None:
+            schedules.append((score, schedule))
+            return
+
+        # Ids negados fazem com que, no empate, a grade com maiores ids seja a pior
+        entry = (score, tuple(-class_id for class_id in schedule), schedule)
+
+        if len(best) < limit:
+            heappush(best, entry)
+        elif entry > best[0]:
+            heapreplace(best, entry)
+
+    def backtrack(depth: int, occupied: int, weekly: int, priority: int) -> None:
+        stats.nodes += 1
+
+        if deadline is not None and not stats.nodes % DEADLINE_CHECK_INTERVAL and monotonic() > deadline:
+            raise SearchTimeout()
+
+        if depth == depth_limit:
+            score = priority - get_compactness_penalty(weekly, weights, layout)
+            add_schedule(score, tuple(chosen))
+            return
+
+        if limit is not None and len(best) == limit and get_upper_bound(depth, weekly, priority) < best[0][0]:
+            stats.pruned += 1
+            return
+
+        position = order[depth]
+        stats.candidates += len(ordered_domains[depth])
+
+        for class_id, mask, class_priority in ordered_domains[depth]:
+            if occupied & mask:
+                continue
+
+            chosen[position] = class_id
+            backtrack(depth + 1, occupied | mask, weekly | weekly_masks[class_id], priority + class_priority)
+
+    if depth_limit:
+        try:
+            backtrack(0, 0, 0, 0)
+        except SearchTimeout:
+            stats.timed_out = True
+
+    if limit is None:
+        return rank_schedules(schedules)
+
+    return [(score, schedule) for score, _, schedule in sorted(best, reverse=True)]
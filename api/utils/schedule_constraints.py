@@ -0,0 +1,70 @@
+from typing import Callable, NamedTuple
+from .schedule_code import AVAILABLE_DAYS, SLOTS_PER_DAY, compile_schedule_code
+
+"""Este módulo contém as restrições que o aluno pode impor à geração de grades horárias.
+
+As restrições são aplicadas aos domínios antes da busca: turmas que ocupam aulas bloqueadas
+e turmas de disciplinas fixadas que não foram escolhidas nem chegam a ser exploradas.
+"""
+
+INVALID_FREE_DAY_ERROR = f"free days must be integers in [{AVAILABLE_DAYS[0]}, {AVAILABLE_DAYS[-1]}]"
+
+
+class ScheduleConstraints(NamedTuple):
+    """Restrições da geração de grades horárias.
+    blocked:int -> Máscara das aulas bloqueadas (janelas bloqueadas e dias livres)
+    pinned:frozenset -> Ids das turmas fixadas, que devem estar nas grades
+    """
+    blocked: int = 0
+    pinned: frozenset[int] = frozenset()
+
+    def get_allowed_classes(self, classes_id: list[int], get_mask: Callable[[int], int]) -> list[int]:
+        """
+        Retorna as turmas de uma disciplina que respeitam as restrições. Caso alguma turma
+        da disciplina esteja fixada, apenas as turmas fixadas são consideradas.
+        """
+        pinned = [class_id for class_id in classes_id if class_id in self.pinned]
+
+        return [class_id for class_id in pinned or classes_id if not get_mask(class_id) & self.blocked]
+
+
+def get_day_mask(day: int) -> int:
+    """Retorna a máscara com todas as aulas de um dia (2 = segunda-feira, ..., 7 = sábado)."""
+    day_index = AVAILABLE_DAYS.index(str(day))
+
+    return ((1 << SLOTS_PER_DAY) - 1) << (day_index * SLOTS_PER_DAY)
+
+
+def make_constraints(blocked: list[str] = None, free_days: list[int] = None,
+                     pinned: list[int] = None) -> ScheduleConstraints | None:
+    """
+    Cria as restrições a partir dos horários bloqueados (códigos do SIGAA, ex.: "6T2345"),
+    dos dias livres e dos ids das turmas fixadas. Retorna None caso não haja restrições.
+    """
+    if not blocked and not free_days and not pinned:
+        return None
+
+    blocked_mask = 0
+
+    for schedule in blocked or []:
+        blocked_mask |= compile_schedule_code(schedule)
+
+    for day in free_days or []:
+        if not isinstance(day, int) or str(day) not in set(AVAILABLE_DAYS):
+            raise ValueError(INVALID_FREE_DAY_ERROR)
+
+        blocked_mask |= get_day_mask(day)
+
+    return ScheduleConstraints(blocked_mask, frozenset(pinned or []))
+
+
+def get_constraint_params(blocked: list[str] = None, free_days: list[int] = None,
+                          pinned: list[int] = None) -> dict:
+    """Normaliza as restrições informadas para compor as chaves do cache e dos cursores."""
+    params = {
+        'blocked': sorted(set(blocked or [])),
+        'free_days': sorted(set(free_days or [])),
+        'pinned': sorted(set(pinned or []))
+    }
+
+    return {key: value for key, value in params.items() if len(value)}
@@ -0,0 +1,90 @@
+from collections import Counter
+from functools import lru_cache
+from math import prod
+from .schedule_search import Option, reduce_domains, get_search_order
+
+"""Este módulo conta as grades horárias válidas de uma seleção sem construí-las.
+
+As disciplinas que não compartilham nenhuma aula formam componentes independentes, e o total
+de grades é o produto das contagens de cada componente. Dentro de um componente, a contagem é
+uma programação dinâmica sobre as máscaras: o estado é a disciplina atual e as aulas já ocupadas
+que ainda podem conflitar com as disciplinas seguintes. Turmas com a mesma máscara são contadas juntas.
+"""
+
+
+def get_components(domains: list[list[Option]]) -> list[list[list[Option]]]:
+    """Separa os domínios em componentes de disciplinas ligadas por alguma aula em comum."""
+    parents = list(range(len(domains)))
+    unions = []
+
+    def find(index: int) -> int:
+        while parents[index] != index:
+            parents[index] = parents[parents[index]]
+            index = parents[index]
+
+        return index
+
+    for domain in domains:
+        union = 0
+
+        for _, mask, _ in domain:
+            union |= mask
+
+        unions.append(union)
+
+    for index in range(len(domains)):
+        for other_index in range(index + 1, len(domains)):
+            if unions[index] & unions[other_index]:
+                parents[find(index)] = find(other_index)
+
+    components = dict()
+
+    for index, domain in enumerate(domains):
+        components.setdefault(find(index), []).append(domain)
+
+    return list(components.values())
+
+
+def count_component_schedules(domains: list[list[Option]]) -> int:
+    """Conta as grades válidas de um componente com uma programação dinâmica sobre as aulas ocupadas."""
+    ordered_domains = [list(Counter(option[1] for option in domains[index]).items())
+                       for index in get_search_order(domains)]
+    depth_limit = len(ordered_domains)
+
+    # Aulas que as disciplinas a partir de cada profundidade podem ocupar
+    reachable = [0] * (depth_limit + 1)
+
+    for depth in reversed(range(depth_limit)):
+        reachable[depth] = reachable[depth + 1]
+
+        for mask, _ in ordered_domains[depth]:
+            reachable[depth] |= mask
+
+    @lru_cache(maxsize=None)
+    def count(depth: int, occupied: int) -> int:
+        if depth == depth_limit:
+            return 1
+
+        total = 0
+
+        for mask, multiplicity in ordered_domains[depth]:
+            if not occupied & mask:
+                total += multiplicity * \
+                    count(depth + 1, (occupied | mask) & reachable[depth + 1])
+
+        return total
+
+    return count(0, 0)
+
+
+def count_schedules(domains: list[list[Option]]) -> int:
+    """Retorna a quantidade exata de grades horárias válidas, sem enumerá-las."""
+    if not len(domains):
+        return 0
+
+    domains = reduce_domains(domains)
+
+    if any(not len(domain) for domain in domains):
+        return 0
+
+    return prod(count_component_schedules(component) for component in get_components(domains))
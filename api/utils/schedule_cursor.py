@@ -0,0 +1,45 @@
+from base64 import urlsafe_b64encode, urlsafe_b64decode
+import hashlib
+import json
+
+"""Este módulo cria e lê os cursores usados para paginar as grades horárias geradas.
+
+O cursor guarda a prioridade e os ids da última grade retornada, de forma que a próxima página
+continue a busca a partir dela sem recalcular nem serializar as páginas anteriores.
+"""
+
+INVALID_CURSOR_ERROR = "cursor is invalid for the selected classes and preference."
+
+
+def make_selection_digest(classes_id: list[int], preference: list[int] | None, **params) -> str:
+    """Cria um identificador curto para as turmas, a preferência e os demais parâmetros (ex.: restrições) de uma geração."""
+    payload = json.dumps({
+        'classes': sorted(set(classes_id)),
+        'preference': preference,
+        **params
+    }, sort_keys=True)
+
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def encode_cursor(selection: str, priority: int, schedule: tuple[int, ...]) -> str:
+    """Cria o cursor que aponta para depois da grade horária informada."""
+    payload = json.dumps([selection, priority, list(schedule)], separators=(',', ':'))
+
+    return urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor: str, selection: str) -> tuple[int, tuple[int, ...]]:
+    """Lê um cursor e retorna a (prioridade, ids) da última grade horária retornada."""
+    try:
+        cursor_selection, priority, schedule = json.loads(
+            urlsafe_b64decode(cursor.encode('ascii')))
+        valid = cursor_selection == selection and isinstance(priority, int) and isinstance(
+            schedule, list) and all(isinstance(class_id, int) for class_id in schedule)
+    except Exception:
+        valid = False
+
+    if not valid:
+        raise ValueError(INVALID_CURSOR_ERROR)
+
+    return priority, tuple(schedule)
@@ -1,20 +1,39 @@
-from itertools import product
-from collections import defaultdict, Counter
-from .db_handler import get_class_by_id
-from re import search
-from api.models import Class
+from collections import defaultdict
+from time import monotonic
+from django.conf import settings
+from .db_handler import get_classes_by_ids, get_classes_by_disciplines
+from .schedule_code import CompiledSchedule, get_compiled_schedule, get_schedule_priority
+from .catalog import sync_catalog
+from .special_dates import get_selection_masks
+from .schedule_constraints import ScheduleConstraints
+from .schedule_compactness import CompactnessWeights, search_compact_schedules
+from .schedule_counter import count_schedules
+from .schedule_search import SearchStats, select_best_schedules, estimate_search_space
+from .schedule_search import add_class_to_best_schedules, remove_class_from_best_schedules
+from .parallel_search import select_best_schedules_in_parallel
+from .conflict_explainer import ConflictExplainer
+from .generation_metrics import GenerationMetrics, LOAD_PHASE, PARSE_PHASE, SEARCH_PHASE, EXPLAIN_PHASE
+from .shared_catalog import SharedCatalog
+from api.models import Class, Discipline
 
 MAXIMUM_CLASSES_FOR_DISCIPLINE = 4
 MINIMUM_PREFERENCE_RANGE = 1
 MAXIMUM_PREFERENCE_RANGE = 3
 MAXIMUM_DISCIPLINES = 11
 MAXIMUM_DISPLAYED_CONFLICTS = 4
+# Abaixo deste tamanho de espaço de busca, o custo de enviar as partes aos processos não compensa
+PARALLEL_SEARCH_THRESHOLD = 50_000
+# Abaixo deste tamanho de espaço de busca, a busca sempre termina bem antes de qualquer prazo
+DEADLINE_SEARCH_SPACE_THRESHOLD = 10_000
 
 LIMIT_ERROR_MESSAGE = f"you can only send {MAXIMUM_DISCIPLINES} disciplines and {MAXIMUM_CLASSES_FOR_DISCIPLINE} classes for each discipline."
 PREFERENCE_RANGE_ERROR = f"preference must be a list of integers with range [{MINIMUM_PREFERENCE_RANGE}, {MAXIMUM_PREFERENCE_RANGE}]"
 NO_SCHEDULES_ERROR = "Não há horários disponíveis para a combinação de disciplinas selecionadas."
 SUCCESS_MESSAGE = "Horários gerados com sucesso."
+NO_MORE_SCHEDULES_MESSAGE = "Não há mais horários disponíveis para a combinação de disciplinas selecionadas."
 FIX_PROBLEM_MESSAGE = "\n\nPara resolver o problema, você pode remover uma das seguintes disciplinas: \n\n"
+PARTIAL_MESSAGE = "A busca excedeu o tempo limite. Estas são as melhores grades encontradas até o momento."
+TIMEOUT_ERROR = "A busca excedeu o tempo limite antes de encontrar uma grade horária. Tente remover algumas turmas."
 
 def check(function):
     """
@@ -31,17 +50,78 @@ def check(function):
 
 class ScheduleGenerator:
     """Classe que representa um gerador de horários."""
-    available_letters = "MTN"
 
-    def __init__(self, classes_id: list[int], preference: list = None):
-        self.schedule_info = defaultdict(lambda: None)
-        self.conflicting_classes = Counter()
+    def __init__(self, classes_id: list[int], preference: list = None, limit: int = None, after: tuple = None,
+                 workers: int = None, previous: dict = None, loaded_classes: list[Class] = None,
+                 time_limit: float = None, constraints: ScheduleConstraints = None,
+                 compactness: CompactnessWeights = None, maximum_classes: int | None = MAXIMUM_CLASSES_FOR_DISCIPLINE,
+                 metrics: GenerationMetrics = None, catalog: SharedCatalog = None):
+        """
+        :param classes_id: Os ids das turmas escolhidas
+        :param preference: O peso de cada turno (manhã, tarde, noite)
+        :param limit: Quantidade máxima de grades horárias retornadas. Caso seja None, todas são retornadas
+        :param after: (prioridade, ids) da última grade de uma página anterior, para continuar a partir dela
+        :param workers: Quantidade de processos da busca paralela. Caso seja None, usa SCHEDULE_SEARCH_WORKERS
+        :param previous: Estado (get_state) de uma geração anterior que difere desta em apenas uma turma
+        :param loaded_classes: Turmas já carregadas. Caso sejam informadas, o banco de dados não é consultado
+        :param time_limit: Tempo máximo da busca, em segundos (0 não limita). Caso seja None, usa SCHEDULE_GENERATION_TIME_LIMIT
+        :param constraints: Aulas bloqueadas e turmas fixadas, aplicadas aos domínios antes da busca
+        :param compactness: Caso informado, as grades também são penalizadas pelas janelas e pelos dias com aula
+        :param maximum_classes: Quantidade máxima de turmas de cada disciplina. Caso seja None, não há limite
+        :param metrics: Medições já iniciadas (ex.: com o carregamento das turmas). Caso seja None, novas são criadas
+        :param catalog: Catálogo compartilhado com as turmas. Caso seja informado, apenas as turmas das grades
+            retornadas são carregadas do banco de dados
+        """
+        self.conflicting_disciplines = []
+        self.ranked_schedules = []
         self.preference = preference
+        self.limit = limit
+        self.after = after
+        self.workers = settings.SCHEDULE_SEARCH_WORKERS if workers is None else workers
+        self.previous = previous
+        self.stats = SearchStats()
+        self.metrics = GenerationMetrics() if metrics is None else metrics
+        self.time_limit = settings.SCHEDULE_GENERATION_TIME_LIMIT if time_limit is None else time_limit
+        self.search_space = None
+        self.partial = False
+        self.constraints = constraints
+        self.compactness = compactness
+        self.maximum_classes = maximum_classes
+        self.catalog = catalog
         self.generated = False
+        self.catalog_version = sync_catalog()
         self._validate_preference()
-        self._get_and_validate_classes(classes_id=set(classes_id))
+        self._get_and_validate_classes(
+            classes_id=set(classes_id), loaded_classes=loaded_classes)
         self._make_disciplines_list()
         self._validate_parameters_length()
+        self._validate_constraints()
+
+    @classmethod
+    def from_classes(cls, classes: list[Class], **kwargs) -> 'ScheduleGenerator':
+        """Cria um gerador a partir de turmas já carregadas, sem consultar o banco de dados."""
+        return cls([_class.id for _class in classes], loaded_classes=classes, **kwargs)
+
+    @classmethod
+    def from_disciplines(cls, disciplines_id: list[int], year: str, period: str, **kwargs) -> 'ScheduleGenerator':
+        """
+        Cria um gerador com todas as turmas das disciplinas em um período, carregadas em uma única consulta.
+        Como o servidor escolhe entre todas as turmas, não há limite de turmas por disciplina.
+        """
+        disciplines_id = set(disciplines_id)
+
+        if len(disciplines_id) > MAXIMUM_DISCIPLINES:
+            raise ValueError(LIMIT_ERROR_MESSAGE)
+
+        metrics = GenerationMetrics()
+
+        with metrics.measure(LOAD_PHASE):
+            classes, missing_ids = get_classes_by_disciplines(disciplines_id, year, period)
+
+        if len(missing_ids):
+            raise ValueError(f"discipline with id {missing_ids[0]} has no classes in {year}/{period}.")
+
+        return cls.from_classes(classes, maximum_classes=None, metrics=metrics, **kwargs)
 
     def _validate_preference(self) -> None:
         self.valid = self.preference is None or all(isinstance(
@@ -51,25 +131,37 @@ class ScheduleGenerator:
             raise ValueError(PREFERENCE_RANGE_ERROR)
 
     @check
-    def _get_and_validate_classes(self, classes_id: set[int]) -> None:
+    def _get_and_validate_classes(self, classes_id: set[int], loaded_classes: list[Class] = None) -> None:
         self.disciplines = defaultdict(list)
         self.classes = dict()
+        self.classes_info = dict()
         self.schedules = []
 
         if not len(classes_id):
             self.valid = False
             return
 
-        for class_id in classes_id:
-            try:
-                _class = get_class_by_id(id=class_id)
+        if loaded_classes is not None:
+            classes, missing_ids = loaded_classes, []
+        elif self.catalog is not None:
+            with self.metrics.measure(LOAD_PHASE):
+                classes, missing_ids = self.catalog.get_classes(classes_id)
+        else:
+            with self.metrics.measure(LOAD_PHASE):
+                classes, missing_ids = get_classes_by_ids(ids=classes_id)
 
-                self.classes[class_id] = _class
-                self.disciplines[_class.discipline].append(class_id)
-                self._add_schedule_code(_class.schedule)
-            except Class.DoesNotExist:
-                self.valid = False
-                raise ValueError(f"class with id {class_id} does not exist.")
+        if len(missing_ids):
+            self.valid = False
+            raise ValueError(f"class with id {missing_ids[0]} does not exist.")
+
+        self.metrics.classes = len(classes)
+        self.metrics.schedule_codes = len({_class.schedule for _class in classes})
+
+        with self.metrics.measure(PARSE_PHASE):
+            for _class in classes:
+                self.classes[_class.id] = _class
+                self.disciplines[_class.discipline].append(_class.id)
+                self._add_class_info(_class)
 
     @check
     def _validate_parameters_length(self) -> None:
@@ -77,133 +169,202 @@ class ScheduleGenerator:
             self.valid = False
 
         for classes in self.disciplines.values():
-            if len(classes) > MAXIMUM_CLASSES_FOR_DISCIPLINE:
+            if self.maximum_classes is not None and len(classes) > self.maximum_classes:
                 self.valid = False
                 break
 
         if not self.valid:
             raise ValueError(LIMIT_ERROR_MESSAGE)
 
+    @check
+    def _validate_constraints(self) -> None:
+        if self.constraints is None:
+            return
+
+        missing_ids = sorted(self.constraints.pinned - set(self.classes))
+
+        if len(missing_ids):
+            self.valid = False
+            raise ValueError(f"pinned class with id {missing_ids[0]} was not selected.")
+
     def is_valid(self) -> bool:
         return self.valid
 
-    def _get_priority(self, days: list, turn: list[str], letter: str):
+    def _get_priority(self, compiled_schedule: CompiledSchedule) -> int:
         """
-        Calcula a prioridade de uma disciplina ser escolhida para a grade de horários.
-        Quanto mais cedo for o horário, maior será a prioridade, independentemente do turno.
-        Quanto mais aulas na semana a disciplina tiver, maior será a prioridade.
+        Calcula a prioridade de uma disciplina ser escolhida para a grade de horários,
+        ponderando os componentes de cada turno pela preferência do usuário.
         """
-        turn_priority = 5 * (len(turn)) - sum(map(int, turn))
-        days_quantity = len(days)
+        if self.preference is None:
+            return 0
 
-        priority = self.preference[self.available_letters.find(
-            letter)] * (turn_priority + days_quantity)
+        return get_schedule_priority(compiled_schedule, self.preference)
 
-        return priority
+    def _add_class_info(self, _class: Class) -> None:
+        """
+        Guarda a máscara de bits e a prioridade de uma turma a partir do registro de horários compilados,
+        ou do catálogo compartilhado, que já guarda os horários compilados.
+        """
+        if self.catalog is None:
+            compiled_schedule = get_compiled_schedule(_class.schedule)
+        else:
+            compiled_schedule = self.catalog.get_compiled_schedule(_class.id)
 
-    def _add_schedule_code(self, schedules: str) -> None:
-        if self.schedule_info[schedules] is not None:
-            return
+        self.classes_info[_class.id] = (
+            compiled_schedule.mask, self._get_priority(compiled_schedule))
 
-        regex = f"[{self.available_letters}]"
-        schedules_list = schedules.split()
+    @check
+    def _make_disciplines_list(self) -> None:
+        """
+        Ordena as disciplinas e as turmas pelos ids, para que a ordem das turmas
+        em cada grade horária (e o desempate entre grades) não dependa da requisição.
+        """
+        self.disciplines_list = []
+        self.sorted_disciplines = sorted(
+            self.disciplines, key=lambda discipline: discipline.id)
 
-        """Cria um dicionário com a prioridade e os horários
-        em produto cartesiano de uma disciplina"""
-        schedules_dict = {
-            "priority": 0,
-            "times": set()
-        }
+        for discipline in self.sorted_disciplines:
+            self.disciplines_list.append(sorted(self.disciplines[discipline]))
 
-        for schedule in schedules_list:
-            match = search(regex, schedule)
-            schedule = list(schedule)
+    def _make_domains(self) -> list[list[tuple[int, int, int]]]:
+        """
+        Cria, para cada disciplina, a lista de opções (id da turma, máscara, prioridade) usada na busca.
+        A prioridade de cada turma é calculada uma única vez aqui. Caso alguma turma tenha
+        datas especiais, as máscaras são expandidas pelos trechos de datas da seleção.
+        """
+        domains = []
+        special_masks = get_selection_masks(self.classes.values())
 
-            days = schedule[:match.start()]
-            turn = schedule[match.start() + 1:]
-            letter = match.group()
+        for classes in self.disciplines_list:
+            domain = []
 
-            values = [days, [letter], turn]
-            code_product = product(*values)
+            if self.constraints is not None:
+                classes = self.constraints.get_allowed_classes(
+                    classes, lambda class_id: self.classes_info[class_id][0])
 
-            if self.preference is not None:
-                schedules_dict["priority"] += self._get_priority(
-                    days, turn, letter)
+            for class_id in classes:
+                mask, priority = self.classes_info[class_id]
 
-            schedules_dict["times"] = schedules_dict["times"].union(
-                set(code_product))
+                if special_masks is not None:
+                    mask = special_masks[class_id]
 
-        self.schedule_info[schedules] = schedules_dict
+                domain.append((class_id, mask, priority))
 
-    @check
-    def _make_disciplines_list(self) -> None:
-        self.disciplines_list = []
+            domains.append(domain)
 
-        for classes in self.disciplines.values():
-            self.disciplines_list.append(classes)
+        return domains
 
-    def _handle_conflict(self, conflicting_class: Class, schedule: tuple) -> None:
-        # Depois, verificamos se há uma grade horária válida sem a disciplina atual
-        schedule_valid = self._valid_schedule(schedule, conflicting_class)
+    def _find_conflicting_disciplines(self, domains: list[list[tuple[int, int, int]]], deadline: float | None) -> None:
+        """
+        Encontra os menores conjuntos de disciplinas que, ao serem removidos, permitem
+        uma grade horária válida. Só é executado quando nenhuma grade foi encontrada.
+        Caso o prazo da geração termine antes, nenhuma disciplina é sugerida.
+        """
+        explainer = ConflictExplainer(
+            dict(zip(self.sorted_disciplines, domains)), deadline)
 
-        # Caso haja, adicionaremos a matéria removida na lista "conflicting_classes"
-        if schedule_valid:
-            self.conflicting_classes[conflicting_class.discipline] += 1
+        self.conflicting_disciplines = explainer.get_minimal_removals(
+            MAXIMUM_DISPLAYED_CONFLICTS)
+        self.metrics.conflict_checks += explainer.checks
 
-    def _valid_schedule(self, schedule: tuple, except_class: Class = None) -> bool:
-        """
-        Verifica se uma grade horária é válida. Caso não seja, verificamos se há a
-        existência de uma grade horária após remoção de uma das disciplinas conflitantes.
+    def _format_disciplines(self, disciplines: tuple[Discipline, ...]) -> str:
+        return " + ".join(f"{discipline.code}: {discipline.name}" for discipline in disciplines)
 
-        Caso haja, adicionaremos a matéria removida na lista "conflicting_classes" e,
-        se não houver nenhuma grade horária válida, mostraremos para o usuário que
-        ele pode escolher entre remover alguma das disciplinas conflitantes.
+    def _load_ranked_classes(self) -> None:
+        """Carrega do banco de dados, em uma única consulta, apenas as turmas das grades retornadas."""
+        classes_id = {class_id for _, schedule in self.ranked_schedules for class_id in schedule}
 
-        :param schedule: Uma grade horária
-        :param except_class: Uma disciplina em que não queremos verificar a existência de conflitos
-        :return: True se a grade horária for válida, False caso contrário
-        """
+        if not len(classes_id):
+            return
+
+        with self.metrics.measure(LOAD_PHASE):
+            classes, missing_ids = get_classes_by_ids(ids=classes_id)
+
+        if len(missing_ids):
+            raise ValueError(f"class with id {missing_ids[0]} does not exist.")
 
-        time_from = dict()
+        for _class in classes:
+            self.classes[_class.id] = _class
+
+    def _add_schedule(self, schedule: tuple) -> None:
+        parsed_schedule = []
 
         for class_id in schedule:
             _class = self.classes[class_id]
-            schedule_code = self.schedule_info[_class.schedule]["times"]
+            parsed_schedule.append(_class)
 
-            # Verificamos se a disciplina atual é a disciplina que queremos remover
-            if _class == except_class:
-                continue
+        self.schedules.append(parsed_schedule)
 
-            for code in schedule_code:
-                if code not in time_from:
-                    time_from[code] = _class
-                    continue
+    def get_state(self) -> dict:
+        """Retorna o estado da geração, que pode ser reaproveitado por uma geração que difere em uma turma."""
+        return {
+            'classes': sorted(self.classes),
+            'disciplines': [discipline.id for discipline in self.sorted_disciplines],
+            'preference': self.preference,
+            'limit': self.limit,
+            'constraints': self.constraints,
+            'compactness': self.compactness,
+            'ranking': self.ranked_schedules,
+            'partial': self.partial
+        }
 
-                # Caso haja uma "except_class", significa que estamos na etapa de remoção de uma disciplina
-                # conflitante. Portanto, não faremos nada.
-                if except_class is not None:
-                    return False
+    def _update_previous_ranking(self, domains: list) -> list | None:
+        """
+        Atualiza as grades da geração anterior quando apenas uma turma foi adicionada ou removida
+        de uma disciplina que continua selecionada. Retorna None caso não seja possível.
+        Grades de uma busca interrompida pelo prazo não são necessariamente as melhores, então não são reaproveitadas.
+        """
+        previous = self.previous
+        current = self.get_state()
 
-                conflicting_class = time_from[code]
+        if self.after is not None or previous.get('partial', True) or any(previous.get(key) != current[key] for key in ['disciplines', 'preference', 'limit', 'constraints', 'compactness']):
+            return None
 
-                # Verificamos a ausência de conflito removendo a disciplina atual
-                self._handle_conflict(_class, schedule)
+        added = set(current['classes']) - set(previous['classes'])
+        removed = set(previous['classes']) - set(current['classes'])
 
-                # Verificamos a ausência de conflito removendo a disciplina conflitante
-                self._handle_conflict(conflicting_class, schedule)
+        if len(added) + len(removed) != 1:
+            return None
 
-                return False
+        if len(added):
+            return add_class_to_best_schedules(domains, previous['ranking'], added.pop(), self.limit, self.stats)
 
-        return True
+        return remove_class_from_best_schedules(domains, previous['ranking'], removed.pop(), self.limit, self.stats)
 
-    def _add_schedule(self, schedule: tuple) -> None:
-        parsed_schedule = []
+    def _get_deadline(self, start_time: float) -> float | None:
+        """Retorna o prazo da busca, ou None caso ela não precise ser limitada."""
+        if not self.time_limit or self.search_space < DEADLINE_SEARCH_SPACE_THRESHOLD:
+            return None
 
-        for class_id in schedule:
-            _class = self.classes[class_id]
-            parsed_schedule.append(_class)
+        return start_time + self.time_limit
 
-        self.schedules.append(parsed_schedule)
+    def _select_compact_schedules(self, domains: list, deadline: float | None) -> list:
+        """Ordena as grades pela compacidade, considerando as máscaras semanais das turmas."""
+        weekly_masks = {class_id: self.classes_info[class_id][0] for class_id in self.classes}
+
+        return search_compact_schedules(domains, weekly_masks, self.compactness, self.limit, self.after, self.stats, deadline)
+
+    def _select_best_schedules(self, domains: list, start_time: float) -> list:
+        """
+        Executa a busca em paralelo apenas quando o espaço de busca é grande o suficiente.
+        A pontuação de compacidade depende da grade inteira, então usa uma busca própria.
+        """
+        if self.previous is not None and self.compactness is None:
+            ranking = self._update_previous_ranking(domains)
+
+            if ranking is not None:
+                return ranking
+
+        self.search_space = estimate_search_space(domains)
+        deadline = self._get_deadline(start_time)
+
+        if self.compactness is not None:
+            return self._select_compact_schedules(domains, deadline)
+
+        if self.workers > 1 and self.search_space >= PARALLEL_SEARCH_THRESHOLD:
+            return select_best_schedules_in_parallel(domains, self.limit, self.after, self.workers, self.stats, deadline)
+
+        return select_best_schedules(domains, self.limit, self.after, self.stats, deadline)
 
     @check
     def generate(self) -> list | None:
@@ -211,31 +372,60 @@ class ScheduleGenerator:
             return self.schedules
 
         self.generated = True
-        possible_schedules = product(*self.disciplines_list)
+        start_time = monotonic()
+
+        with self.metrics.measure(SEARCH_PHASE):
+            domains = self._make_domains()
+            self.ranked_schedules = self._select_best_schedules(domains, start_time)
+
+        self.partial = self.stats.timed_out
+
+        if self.catalog is not None:
+            self._load_ranked_classes()
 
-        for schedule in possible_schedules:
-            if self._valid_schedule(schedule):
-                self._add_schedule(schedule)
+        for _, schedule in self.ranked_schedules:
+            self._add_schedule(schedule)
 
         extra_message = SUCCESS_MESSAGE
 
-        if not len(self.schedules):
+        # A busca interrompida pelo prazo retorna as melhores grades encontradas até então
+        if self.partial and len(self.schedules):
+            extra_message = PARTIAL_MESSAGE
+        elif self.partial:
+            extra_message = TIMEOUT_ERROR
+        elif not len(self.schedules) and self.after is not None:
+            extra_message = NO_MORE_SCHEDULES_MESSAGE
+        elif not len(self.schedules):
             extra_message = NO_SCHEDULES_ERROR
 
+            # A explicação divide o mesmo prazo da busca
+            deadline = start_time + self.time_limit if self.time_limit else None
+
+            with self.metrics.measure(EXPLAIN_PHASE):
+                self._find_conflicting_disciplines(domains, deadline)
+
         # Caso não haja nenhuma grade horária válida, mostraremos para o usuário que
         # ele pode escolher entre remover alguma das disciplinas conflitantes.
-        if len(self.conflicting_classes):
+        if len(self.conflicting_disciplines):
             extra_message += FIX_PROBLEM_MESSAGE
             extra_message += "\n".join(map(
-                lambda discipline: f"- {discipline[0].code}: {discipline[0].name}", self.conflicting_classes.most_common(MAXIMUM_DISPLAYED_CONFLICTS)))
+                lambda disciplines: f"- {self._format_disciplines(disciplines)}", self.conflicting_disciplines))
 
         return {
             'message': extra_message,
-            'schedules': self.sort_by_priority()
+            'schedules': self.schedules,
+            'partial': self.partial
         }
 
+    @check
+    def count(self) -> int | None:
+        """Retorna a quantidade de grades horárias válidas, sem construí-las."""
+        with self.metrics.measure(SEARCH_PHASE):
+            return count_schedules(self._make_domains())
+
     def sort_by_priority(self):
-        self.schedules.sort(key=lambda priority: sum(map(
-            lambda _class: self.schedule_info[_class.schedule]["priority"], priority)), reverse=True)
+        """As grades já são geradas em ordem de prioridade; a ordenação aqui é estável."""
+        self.schedules.sort(key=lambda schedule: sum(map(
+            lambda _class: self.classes_info[_class.id][1], schedule)), reverse=True)
 
         return self.schedules
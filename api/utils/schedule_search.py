@@ -0,0 +1,413 @@
+from typing import Callable, Iterator
+from heapq import heappush, heappop, heapreplace, merge
+from itertools import chain, islice, product
+from math import prod
+from time import monotonic
+
+"""Este módulo contém a busca de grades horárias sobre as máscaras de bits das turmas.
+
+Cada disciplina é representada por um domínio: uma lista de opções (id da turma, máscara, prioridade).
+Uma grade horária válida escolhe uma opção de cada domínio sem que as máscaras se sobreponham.
+As grades são ordenadas pela maior prioridade e, em caso de empate, pelos ids das turmas.
+"""
+
+Option = tuple[int, int, int]
+
+
+# Quantidade de grades parciais visitadas entre duas verificações do prazo da busca
+DEADLINE_CHECK_INTERVAL = 1024
+
+
+class SearchStats:
+    """Contadores de uma busca de grades horárias.
+    nodes:int -> Grades parciais visitadas
+    candidates:int -> Turmas examinadas para estender uma grade parcial
+    pruned:int -> Ramos abandonados pelos limites de prioridade
+    schedules:int -> Grades válidas encontradas
+    timed_out:bool -> Se a busca foi interrompida pelo prazo antes de terminar
+    """
+
+    def __init__(self) -> None:
+        self.nodes = 0
+        self.candidates = 0
+        self.pruned = 0
+        self.schedules = 0
+        self.timed_out = False
+
+    def merge(self, other: 'SearchStats') -> None:
+        """Soma os contadores de outra busca, como a de uma parte do espaço de busca."""
+        self.nodes += other.nodes
+        self.candidates += other.candidates
+        self.pruned += other.pruned
+        self.schedules += other.schedules
+        self.timed_out = self.timed_out or other.timed_out
+
+
+class SearchTimeout(Exception):
+    """Levantada dentro da busca quando o prazo termina."""
+
+
+def is_compatible_with_domain(mask: int, domain: list[Option]) -> bool:
+    """Verifica se existe alguma opção do domínio que não conflita com a máscara."""
+    return any(not mask & other[1] for other in domain)
+
+
+def reduce_domains(domains: list[list[Option]]) -> list[list[Option]]:
+    """
+    Remove de cada domínio as turmas que conflitam com todas as turmas de alguma outra disciplina,
+    já que elas nunca farão parte de uma grade horária válida. Repete até não haver mais remoções.
+    """
+    domains = list(domains)
+    changed = True
+
+    while changed:
+        changed = False
+
+        for index, domain in enumerate(domains):
+            kept = [option for option in domain if all(
+                is_compatible_with_domain(option[1], other) for other_index, other in enumerate(domains) if other_index != index)]
+
+            if len(kept) != len(domain):
+                domains[index] = kept
+                changed = True
+
+    return domains
+
+
+def get_search_order(domains: list[list[Option]]) -> list[int]:
+    """Ordena as disciplinas da mais restrita (menos turmas compatíveis) para a menos restrita."""
+    return sorted(range(len(domains)), key=lambda index: len(domains[index]))
+
+
+def estimate_search_space(domains: list[list[Option]]) -> int:
+    """Estima a quantidade de combinações da busca após a remoção das turmas incompatíveis."""
+    size = 1
+
+    for domain in reduce_domains(domains):
+        size *= len(domain)
+
+    return size
+
+
+def split_domains(domains: list[list[Option]]) -> list[list[list[Option]]]:
+    """
+    Divide o espaço de busca em partes independentes, uma para cada turma da disciplina
+    mais restrita que ainda tenha mais de uma turma compatível.
+    """
+    domains = reduce_domains(domains)
+    candidates = [index for index, domain in enumerate(domains) if len(domain) > 1]
+
+    if not len(candidates):
+        return [domains]
+
+    split_index = min(candidates, key=lambda index: len(domains[index]))
+
+    return [domains[:split_index] + [[option]] + domains[split_index + 1:] for option in domains[split_index]]
+
+
+def search_schedules(domains: list[list[Option]], maximum_priority: int = None, stats: SearchStats = None,
+                     deadline: float = None, minimum_priority: Callable[[], int | None] = None) -> Iterator[tuple[int, tuple[int, ...]]]:
+    """
+    Busca em profundidade as grades horárias válidas, estendendo uma grade parcial uma disciplina
+    por vez e abandonando o ramo assim que houver conflito.
+
+    :param domains: Uma lista de domínios, um para cada disciplina
+    :param maximum_priority: Caso informado, abandona os ramos em que toda grade teria prioridade maior
+    :param stats: Caso informado, acumula os contadores da busca
+    :param deadline: Instante (time.monotonic) em que a busca é interrompida, marcando stats.timed_out
+    :param minimum_priority: Caso informado, é consultado a cada grade parcial e os ramos em que toda grade
+        teria prioridade menor que o valor retornado (ex.: a K-ésima melhor grade até então) são abandonados.
+        As turmas são então exploradas da maior para a menor prioridade, para que o valor cresça logo
+    :return: Um iterador de tuplas (prioridade, ids das turmas), com os ids na mesma ordem dos domínios
+    """
+    domains = reduce_domains(domains)
+    order = get_search_order(domains)
+    ordered_domains = [domains[index] for index in order]
+    chosen = [None] * len(domains)
+    depth_limit = len(domains)
+    stats = SearchStats() if stats is None else stats
+
+    if minimum_priority is not None:
+        ordered_domains = [sorted(domain, key=lambda option: -option[2]) for domain in ordered_domains]
+
+    # Menor prioridade que as disciplinas restantes ainda podem somar a partir de cada profundidade
+    minimum_rest = [0] * (depth_limit + 1)
+
+    for depth in reversed(range(depth_limit)):
+        minimum_rest[depth] = minimum_rest[depth + 1] + \
+            min((option[2] for option in ordered_domains[depth]), default=0)
+
+    def get_maximum_rest(depth: int, occupied: int) -> int | None:
+        """
+        Maior prioridade que as disciplinas após "depth" ainda podem somar: a primeira turma (a de maior
+        prioridade) de cada uma que não conflita com as aulas ocupadas. Retorna None caso alguma não tenha opção.
+        """
+        total = 0
+
+        for domain in ordered_domains[depth + 1:]:
+            best = next((option[2] for option in domain if not occupied & option[1]), None)
+
+            if best is None:
+                return None
+
+            total += best
+
+        return total
+
+    def backtrack(depth: int, occupied: int, priority: int) -> Iterator[tuple[int, tuple[int, ...]]]:
+        stats.nodes += 1
+
+        if deadline is not None and not stats.nodes % DEADLINE_CHECK_INTERVAL and monotonic() > deadline:
+            raise SearchTimeout()
+
+        if depth == depth_limit:
+            stats.schedules += 1
+            yield priority, tuple(chosen)
+            return
+
+        position = order[depth]
+        minimum = None if minimum_priority is None else minimum_priority()
+        maximum_rest = None
+
+        if minimum is not None:
+            maximum_rest = get_maximum_rest(depth, occupied)
+
+            if maximum_rest is None:
+                stats.pruned += 1
+                return
+
+        stats.candidates += len(ordered_domains[depth])
+
+        for class_id, mask, class_priority in ordered_domains[depth]:
+            # As turmas estão em ordem decrescente de prioridade, então as seguintes também ficariam abaixo
+            if maximum_rest is not None and priority + class_priority + maximum_rest < minimum:
+                stats.pruned += 1
+                break
+
+            if occupied & mask:
+                continue
+
+            if maximum_priority is not None and priority + class_priority + minimum_rest[depth + 1] > maximum_priority:
+                stats.pruned += 1
+                continue
+
+            chosen[position] = class_id
+            yield from backtrack(depth + 1, occupied | mask, priority + class_priority)
+
+    if depth_limit:
+        try:
+            yield from backtrack(0, 0, 0)
+        except SearchTimeout:
+            stats.timed_out = True
+
+
+def is_ranked_after(priority: int, schedule: tuple[int, ...], after: tuple[int, tuple[int, ...]]) -> bool:
+    """Verifica se uma grade horária aparece depois de "after" na ordem de prioridade."""
+    after_priority, after_schedule = after
+
+    return priority < after_priority or (priority == after_priority and schedule > tuple(after_schedule))
+
+
+def rank_schedules(schedules: list[tuple[int, tuple[int, ...]]]) -> list[tuple[int, tuple[int, ...]]]:
+    """Ordena as grades horárias da maior para a menor prioridade."""
+    return sorted(schedules, key=lambda schedule: (-schedule[0], schedule[1]))
+
+
+def group_equivalent_classes(domains: list[list[Option]]) -> tuple[list[list[Option]], dict[int, tuple[int, ...]]]:
+    """
+    Agrupa as turmas de cada disciplina com a mesma máscara e a mesma prioridade (ex.: mesmo horário
+    com professores diferentes). Cada grupo vira uma única opção, representada pelo menor id.
+
+    :return: Os domínios agrupados e, para cada representante, os ids (ordenados) do seu grupo
+    """
+    grouped_domains = []
+    groups = dict()
+
+    for domain in domains:
+        equivalents = dict()
+
+        for class_id, mask, priority in domain:
+            equivalents.setdefault((mask, priority), []).append(class_id)
+
+        grouped_domain = []
+
+        for (mask, priority), classes_id in equivalents.items():
+            classes_id.sort()
+            groups[classes_id[0]] = tuple(classes_id)
+            grouped_domain.append((classes_id[0], mask, priority))
+
+        grouped_domains.append(grouped_domain)
+
+    return grouped_domains, groups
+
+
+def retain_best_groups(search: Callable[[Callable[[], int | None]], Iterator[tuple[int, tuple[int, ...]]]],
+                       groups: dict[int, tuple[int, ...]], limit: int,
+                       after: tuple[int, tuple[int, ...]] = None) -> list[tuple[int, tuple[int, ...]]]:
+    """
+    Mantém as grades de grupos das maiores prioridades até que elas somem pelo menos "limit" grades concretas.
+    Todas as grades de grupos da menor prioridade mantida são guardadas, pois o desempate entre elas
+    depende dos ids das turmas concretas. As grades na prioridade de "after" não são contadas,
+    já que parte delas pode vir antes de "after".
+
+    :param search: Cria a busca a partir da função que informa a menor prioridade que ainda pode ser mantida
+    """
+    buckets = dict()
+    counts = dict()
+    priorities = []
+    total = 0
+
+    def get_minimum_priority() -> int | None:
+        return priorities[0] if total >= limit else None
+
+    for priority, schedule in search(get_minimum_priority):
+        if len(priorities) and priority < priorities[0] and total >= limit:
+            continue
+
+        if priority not in buckets:
+            buckets[priority] = []
+            counts[priority] = 0
+            heappush(priorities, priority)
+
+        buckets[priority].append(schedule)
+
+        if after is None or priority != after[0]:
+            count = prod(len(groups[class_id]) for class_id in schedule)
+            counts[priority] += count
+            total += count
+
+        while total - counts[priorities[0]] >= limit:
+            lowest = heappop(priorities)
+            total -= counts.pop(lowest)
+            del buckets[lowest]
+
+    return [(priority, schedule) for priority, bucket in buckets.items() for schedule in bucket]
+
+
+def expand_groups(schedules: list[tuple[int, tuple[int, ...]]], groups: dict[int, tuple[int, ...]],
+                  after: tuple[int, tuple[int, ...]] = None) -> Iterator[tuple[int, tuple[int, ...]]]:
+    """
+    Expande sob demanda as grades de grupos em grades concretas, já na ordem de prioridade.
+    O produto dos ids (ordenados) de cada grupo gera as grades em ordem lexicográfica, e as
+    grades de grupos com a mesma prioridade são intercaladas com heapq.merge.
+    """
+    buckets = dict()
+
+    for priority, schedule in schedules:
+        buckets.setdefault(priority, []).append(schedule)
+
+    for priority in sorted(buckets, reverse=True):
+        expanded = merge(*(product(*(groups[class_id] for class_id in schedule))
+                           for schedule in buckets[priority]))
+
+        for schedule in expanded:
+            if after is None or is_ranked_after(priority, schedule, after):
+                yield priority, schedule
+
+
+def select_best_schedules(domains: list[list[Option]], limit: int = None, after: tuple[int, tuple[int, ...]] = None,
+                          stats: SearchStats = None, deadline: float = None) -> list[tuple[int, tuple[int, ...]]]:
+    """
+    Seleciona as melhores grades horárias. Turmas equivalentes de uma disciplina são exploradas
+    uma única vez e expandidas apenas para as grades retornadas.
+
+    :param limit: Quantidade máxima de grades. Caso seja None, todas as grades são ordenadas
+    :param after: (prioridade, ids) da última grade já retornada; só as grades seguintes são consideradas
+    :param stats: Caso informado, acumula os contadores da busca
+    :param deadline: Caso informado, as melhores grades encontradas até o prazo são retornadas
+    """
+    grouped_domains, groups = group_equivalent_classes(domains)
+
+    if all(len(group) == 1 for group in groups.values()):
+        return select_best_ungrouped_schedules(domains, limit, after, stats, deadline)
+
+    if limit is not None and limit <= 0:
+        return []
+
+    maximum_priority = None if after is None else after[0]
+
+    if limit is None:
+        schedules = search_schedules(grouped_domains, maximum_priority, stats, deadline)
+    else:
+        schedules = retain_best_groups(lambda minimum_priority: search_schedules(
+            grouped_domains, maximum_priority, stats, deadline, minimum_priority), groups, limit, after)
+
+    return list(islice(expand_groups(schedules, groups, after), limit))
+
+
+def select_best_ungrouped_schedules(domains: list[list[Option]], limit: int = None,
+                                    after: tuple[int, tuple[int, ...]] = None, stats: SearchStats = None,
+                                    deadline: float = None) -> list[tuple[int, tuple[int, ...]]]:
+    """
+    Mantém apenas as "limit" melhores grades horárias durante a busca, usando um heap de mínimo
+    em que o topo é a pior grade guardada. A memória usada é O(limit), e não O(grades válidas).
+    """
+    maximum_priority = None if after is None else after[0]
+    best = []
+
+    if limit is not None and limit <= 0:
+        return best
+
+    def get_minimum_priority() -> int | None:
+        return best[0][0] if len(best) == limit else None
+
+    schedules = search_schedules(domains, maximum_priority, stats, deadline,
+                                 None if limit is None else get_minimum_priority)
+
+    if after is not None:
+        schedules = (schedule for schedule in schedules if is_ranked_after(*schedule, after))
+
+    if limit is None:
+        return rank_schedules(schedules)
+
+    for priority, schedule in schedules:
+        if len(best) == limit and priority < best[0][0]:
+            continue
+
+        # Ids negados fazem com que, no empate, a grade com maiores ids seja a pior
+        entry = (priority, tuple(-class_id for class_id in schedule), schedule)
+
+        if len(best) < limit:
+            heappush(best, entry)
+        elif entry > best[0]:
+            heapreplace(best, entry)
+
+    return [(priority, schedule) for priority, _, schedule in sorted(best, reverse=True)]
+
+
+def add_class_to_best_schedules(domains: list[list[Option]], previous: list[tuple[int, tuple[int, ...]]],
+                                class_id: int, limit: int = None, stats: SearchStats = None) -> list[tuple[int, tuple[int, ...]]]:
+    """
+    Atualiza as melhores grades horárias de uma seleção após a adição de uma turma a uma disciplina
+    já selecionada. Apenas as combinações que usam a nova turma são exploradas.
+    Caso a turma tenha sido descartada pelas restrições, as grades anteriores continuam as melhores.
+    """
+    position = next(((index, option) for index, domain in enumerate(domains)
+                     for option in domain if option[0] == class_id), None)
+
+    if position is None:
+        return previous if limit is None else previous[:limit]
+
+    index, option = position
+    fixed_domains = domains[:index] + [[option]] + domains[index + 1:]
+
+    schedules = rank_schedules(
+        chain(previous, select_best_schedules(fixed_domains, limit, stats=stats)))
+
+    return schedules if limit is None else schedules[:limit]
+
+
+def remove_class_from_best_schedules(domains: list[list[Option]], previous: list[tuple[int, tuple[int, ...]]],
+                                     class_id: int, limit: int = None, stats: SearchStats = None) -> list[tuple[int, tuple[int, ...]]]:
+    """
+    Atualiza as melhores grades horárias de uma seleção após a remoção de uma turma de uma disciplina
+    que continua selecionada. As grades anteriores sem a turma continuam válidas e, caso falte alguma,
+    a busca continua a partir da última grade anterior.
+    """
+    schedules = [schedule for schedule in previous if class_id not in schedule[1]]
+
+    if limit is not None and len(previous) == limit and len(schedules) < limit:
+        schedules += select_best_schedules(
+            domains, limit - len(schedules), previous[-1], stats)
+
+    return schedules
@@ -0,0 +1,89 @@
+from typing import NamedTuple
+from .db_handler import get_classes_by_ids
+from .schedule_code import get_compiled_schedule
+from .special_dates import get_selection_masks
+from .schedule_generator import MAXIMUM_DISCIPLINES, LIMIT_ERROR_MESSAGE
+from api.models import Class
+
+"""Este módulo verifica se um conjunto fixo de turmas pode formar uma grade horária.
+
+Diferente do gerador de grades, não há busca: as turmas são carregadas em uma única consulta
+e as máscaras são percorridas uma única vez, acumulando as aulas já ocupadas.
+"""
+
+INCOMPATIBLE_CLASSES_ERROR = "the classes are not compatible"
+
+
+class IncompatibleClassesError(ValueError):
+    """Erro levantado quando as turmas não formam uma grade horária. Guarda os pares de turmas em conflito."""
+
+    def __init__(self, collisions: list[tuple[Class, Class]]):
+        super().__init__(INCOMPATIBLE_CLASSES_ERROR)
+        self.collisions = collisions
+
+
+class Compatibility(NamedTuple):
+    """Resultado da verificação de compatibilidade.
+    classes:list -> Turmas ordenadas pela disciplina, na mesma ordem das grades geradas
+    collisions:list -> Pares de turmas com aulas em comum ou da mesma disciplina
+    """
+    classes: list[Class]
+    collisions: list[tuple[Class, Class]]
+
+    def is_compatible(self) -> bool:
+        return not len(self.collisions)
+
+
+def get_collisions(classes: list[Class]) -> list[tuple[Class, Class]]:
+    """
+    Percorre as turmas acumulando as aulas ocupadas. Apenas quando uma turma conflita com as
+    anteriores é que ela é comparada com cada uma delas, para descobrir os pares em conflito.
+    """
+    masks = get_selection_masks(classes)
+
+    if masks is None:
+        masks = {_class.id: get_compiled_schedule(_class.schedule).mask for _class in classes}
+
+    occupied = 0
+    disciplines = set()
+    collisions = []
+
+    for index, _class in enumerate(classes):
+        mask = masks[_class.id]
+
+        if mask & occupied or _class.discipline_id in disciplines:
+            collisions.extend((other, _class) for other in classes[:index]
+                              if masks[other.id] & mask or other.discipline_id == _class.discipline_id)
+
+        occupied |= mask
+        disciplines.add(_class.discipline_id)
+
+    return collisions
+
+
+def check_compatibility(classes_id: list[int]) -> Compatibility:
+    """Carrega as turmas em uma única consulta e verifica se elas formam uma grade horária."""
+    classes, missing_ids = get_classes_by_ids(ids=set(classes_id))
+
+    if len(missing_ids):
+        raise ValueError(f"class with id {missing_ids[0]} does not exist.")
+
+    if len({_class.discipline_id for _class in classes}) > MAXIMUM_DISCIPLINES:
+        raise ValueError(LIMIT_ERROR_MESSAGE)
+
+    classes.sort(key=lambda _class: (_class.discipline_id, _class.id))
+
+    return Compatibility(classes, get_collisions(classes))
+
+
+def validate_classes(classes_id: list[int]) -> list[Class]:
+    """Retorna as turmas ordenadas caso sejam compatíveis. Caso contrário, levanta IncompatibleClassesError."""
+    if not len(classes_id):
+        raise ValueError(INCOMPATIBLE_CLASSES_ERROR)
+
+    compatibility = check_compatibility(classes_id)
+
+    if not compatibility.is_compatible():
+        raise IncompatibleClassesError(compatibility.collisions)
+
+    return compatibility.classes
@@ -0,0 +1,311 @@
+from array import array
+from bisect import bisect_left
+from mmap import mmap, ACCESS_READ
+from pathlib import Path
+from typing import Iterable, NamedTuple
+from django.conf import settings
+from .db_handler import get_catalog_classes_by_year_and_period
+from .schedule_code import CompiledSchedule, get_compiled_schedule, split_schedule_mask, join_schedule_mask
+from .sessions import get_current_year_and_period, get_next_period
+from django.core.cache import cache
+import json
+import os
+import struct
+import tempfile
+
+"""Este módulo mantém um catálogo compacto das turmas de um período, compartilhado entre os processos.
+
+O catálogo é um arquivo binário construído pelo comando updatedb, com arrays de tamanho fixo (ids das turmas,
+ids das disciplinas, máscaras e componentes de prioridade) e uma tabela de textos (horários, datas especiais,
+códigos e nomes das disciplinas). Os processos abrem o arquivo com mmap e leem os arrays por memoryview, sem
+cópias: as páginas do arquivo são as mesmas para todos os workers do gunicorn, e o gerador de grades horárias
+não precisa carregar as turmas pelo ORM.
+
+Cada período tem a sua própria versão, guardada no cache e gravada no arquivo. Assim, atualizar ou apagar um
+período não invalida os arquivos dos outros.
+"""
+
+CATALOG_MAGIC = b"SGUBCAT1"
+# Identificador do formato, versão do catálogo, quantidade de turmas e tamanho da tabela de textos
+CATALOG_HEADER = struct.Struct("=8sqqq")
+CATALOG_FILE_NAME = "catalog-{year}.{period}.bin"
+CATALOG_FILE_MODE = 0o644
+CATALOG_VERSION_KEY = "shared-catalog-version/{year}.{period}"
+CATALOG_ALIGNMENT = 8
+
+# Textos de cada turma, na ordem em que aparecem na tabela de textos
+STRINGS_PER_CLASS = 4
+TURNS_COMPONENTS = 3
+
+# Catálogos já abertos neste processo: (ano, período) -> (versão do período, catálogo ou None caso o arquivo tenha sido rejeitado)
+_loaded_catalogs = dict()
+
+
+class CatalogDiscipline(NamedTuple):
+    """Disciplina de uma turma do catálogo.
+    id:int -> Id da disciplina
+    code:str -> Código da disciplina
+    name:str -> Nome da disciplina
+    """
+    id: int
+    code: str
+    name: str
+
+
+class CatalogClass(NamedTuple):
+    """Turma do catálogo, com os campos usados pelo gerador de grades horárias.
+    id:int -> Id da turma
+    schedule:str -> Horário da turma
+    special_dates:list -> Datas especiais da turma
+    discipline:CatalogDiscipline -> Disciplina da turma
+    """
+    id: int
+    schedule: str
+    special_dates: list
+    discipline: CatalogDiscipline
+
+
+def get_catalog_path(year: str, period: str) -> Path:
+    return Path(settings.SHARED_CATALOG_DIR) / CATALOG_FILE_NAME.format(year=year, period=period)
+
+
+def get_period_version_key(year: str, period: str) -> str:
+    return CATALOG_VERSION_KEY.format(year=year, period=period)
+
+
+def get_period_version(year: str, period: str) -> int:
+    """Retorna a versão atual do catálogo compartilhado de um período."""
+    return cache.get_or_set(get_period_version_key(year, period), 0, timeout=None)
+
+
+def bump_period_version(year: str, period: str) -> int:
+    """Incrementa a versão do catálogo compartilhado de um período, invalidando o arquivo atual em todos os processos."""
+    get_period_version(year, period)
+
+    return cache.incr(get_period_version_key(year, period))
+
+
+def get_padding(size: int) -> bytes:
+    return bytes(-size % CATALOG_ALIGNMENT)
+
+
+def write_catalog(path: Path, version: int, classes: Iterable[tuple]) -> int:
+    """
+    Escreve o arquivo do catálogo. O arquivo é escrito ao lado do destino e renomeado no final, então os
+    processos que já abriram a versão anterior continuam lendo-a. Turmas com horário inválido ficam de fora.
+
+    :param classes: Tuplas (id, id da disciplina, horário, datas especiais, código e nome da disciplina), ordenadas pelo id
+    :return: A quantidade de turmas do catálogo
+    """
+    ids = array("q")
+    disciplines = array("q")
+    masks = array("Q")
+    components = array("i")
+    offsets = array("q", [0])
+    strings = bytearray()
+
+    for class_id, discipline_id, schedule, special_dates, code, name in classes:
+        try:
+            compiled_schedule = get_compiled_schedule(schedule)
+        except ValueError:
+            continue
+
+        ids.append(class_id)
+        disciplines.append(discipline_id)
+        masks.extend(split_schedule_mask(compiled_schedule.mask))
+        components.extend(compiled_schedule.components)
+
+        for value in (schedule, json.dumps(special_dates), code, name):
+            strings += value.encode()
+            offsets.append(len(strings))
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    descriptor, temporary_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+
+    try:
+        # O mkstemp cria o arquivo legível apenas pelo dono, mas os workers podem rodar com outro usuário
+        os.fchmod(descriptor, CATALOG_FILE_MODE)
+
+        with os.fdopen(descriptor, "wb") as file:
+            file.write(CATALOG_HEADER.pack(CATALOG_MAGIC, version, len(ids), len(strings)))
+
+            for section in (ids, disciplines, masks, components, offsets):
+                data = section.tobytes()
+                file.write(data + get_padding(len(data)))
+
+            file.write(strings)
+
+        os.replace(temporary_path, path)
+    except BaseException:
+        os.unlink(temporary_path)
+        raise
+
+    return len(ids)
+
+
+def read_catalog_version(path: Path) -> int | None:
+    """Lê apenas o cabeçalho do arquivo. Retorna a versão do catálogo, ou None caso o arquivo não exista ou seja inválido."""
+    try:
+        with open(path, "rb") as file:
+            magic, version, _, _ = CATALOG_HEADER.unpack(file.read(CATALOG_HEADER.size))
+    except (OSError, struct.error):
+        return None
+
+    return version if magic == CATALOG_MAGIC else None
+
+
+class SharedCatalog:
+    """Catálogo de turmas lido de um arquivo mapeado em memória."""
+
+    def __init__(self, path: Path):
+        with open(path, "rb") as file:
+            self.buffer = mmap(file.fileno(), 0, access=ACCESS_READ)
+
+        magic, self.version, count, strings_size = CATALOG_HEADER.unpack_from(self.buffer)
+
+        if magic != CATALOG_MAGIC:
+            raise ValueError(f"invalid catalog file: {path}")
+
+        view = memoryview(self.buffer)
+        offset = CATALOG_HEADER.size
+        sections = []
+
+        for typecode, length in (("q", count), ("q", count), ("Q", 2 * count), ("i", TURNS_COMPONENTS * count),
+                                 ("q", STRINGS_PER_CLASS * count + 1)):
+            size = length * array(typecode).itemsize
+            sections.append(view[offset:offset + size].cast(typecode))
+            offset += size + len(get_padding(size))
+
+        self.ids, self.disciplines, self.masks, self.components, self.offsets = sections
+        self.strings = view[offset:offset + strings_size]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, class_id: int) -> bool:
+        return self._get_position(class_id) is not None
+
+    def _get_position(self, class_id: int) -> int | None:
+        position = bisect_left(self.ids, class_id)
+
+        if position < len(self.ids) and self.ids[position] == class_id:
+            return position
+
+        return None
+
+    def _get_string(self, position: int, field: int) -> str:
+        index = position * STRINGS_PER_CLASS + field
+
+        return bytes(self.strings[self.offsets[index]:self.offsets[index + 1]]).decode()
+
+    def get_compiled_schedule(self, class_id: int) -> CompiledSchedule:
+        """Retorna o horário compilado da turma, sem interpretar o código do horário."""
+        position = self._get_position(class_id)
+        mask = join_schedule_mask(self.masks[2 * position], self.masks[2 * position + 1])
+        start = position * TURNS_COMPONENTS
+
+        return CompiledSchedule(mask, tuple(self.components[start:start + TURNS_COMPONENTS]))
+
+    def get_class(self, class_id: int) -> CatalogClass:
+        position = self._get_position(class_id)
+        discipline = CatalogDiscipline(
+            self.disciplines[position], self._get_string(position, 2), self._get_string(position, 3))
+
+        return CatalogClass(class_id, self._get_string(position, 0), json.loads(self._get_string(position, 1)), discipline)
+
+    def get_classes(self, classes_id: Iterable[int]) -> tuple[list[CatalogClass], list[int]]:
+        """Retorna as turmas encontradas no catálogo e os ids (ordenados) que não estão nele."""
+        classes = []
+        missing_ids = []
+
+        for class_id in sorted(set(classes_id)):
+            if class_id in self:
+                classes.append(self.get_class(class_id))
+            else:
+                missing_ids.append(class_id)
+
+        return classes, missing_ids
+
+
+def build_shared_catalog(year: str, period: str, version: int = None) -> int:
+    """
+    Constrói o catálogo de um período em uma única consulta. Retorna a quantidade de turmas do catálogo.
+
+    :param version: A versão gravada no arquivo. Caso seja None, usa a versão atual do período
+    """
+    classes = get_catalog_classes_by_year_and_period(year=year, period=period)
+    version = get_period_version(year, period) if version is None else version
+
+    return write_catalog(get_catalog_path(year, period), version, classes)
+
+
+def publish_shared_catalog(year: str, period: str, changed: bool) -> int:
+    """
+    Constrói o catálogo de um período e publica a sua nova versão. O arquivo é escrito já com a próxima
+    versão, então está pronto quando os processos a observam. Caso as turmas não tenham mudado e o arquivo
+    já seja da versão atual, nada é reescrito.
+
+    :param changed: Se as turmas do período mudaram
+    :return: A versão atual do catálogo do período
+    """
+    version = get_period_version(year, period)
+
+    if not changed and read_catalog_version(get_catalog_path(year, period)) == version:
+        return version
+
+    build_shared_catalog(year, period, version + 1)
+    bumped_version = bump_period_version(year, period)
+
+    # Outro processo mudou a versão enquanto o arquivo era escrito
+    if bumped_version != version + 1:
+        build_shared_catalog(year, period, bumped_version)
+
+    return bumped_version
+
+
+def delete_shared_catalog(year: str, period: str) -> None:
+    get_catalog_path(year, period).unlink(missing_ok=True)
+    bump_period_version(year, period)
+    _loaded_catalogs.pop((year, period), None)
+
+
+def get_shared_catalog(year: str, period: str) -> SharedCatalog | None:
+    """
+    Retorna o catálogo de um período, abrindo o arquivo apenas quando a versão do período muda.
+    Retorna None caso o arquivo não exista ou tenha sido construído para outra versão. Nesse caso,
+    o arquivo só é aberto novamente quando a versão do período mudar.
+    """
+    try:
+        version = get_period_version(year, period)
+    except:  # pragma: no cover
+        return None
+
+    loaded = _loaded_catalogs.get((year, period))
+
+    if loaded is not None and loaded[0] == version:
+        return loaded[1]
+
+    try:
+        catalog = SharedCatalog(get_catalog_path(year, period))
+    except (OSError, ValueError):
+        catalog = None
+
+    if catalog is not None and catalog.version != version:
+        catalog = None
+
+    _loaded_catalogs[(year, period)] = (version, catalog)
+
+    return catalog
+
+
+def find_shared_catalog(classes_id: Iterable[int]) -> SharedCatalog | None:
+    """Retorna o catálogo do período atual ou do seguinte que contém todas as turmas, caso exista."""
+    classes_id = set(classes_id)
+
+    for year, period in (get_current_year_and_period(None), get_next_period()):
+        catalog = get_shared_catalog(year, period)
+
+        if catalog is not None and all(class_id in catalog for class_id in classes_id):
+            return catalog
+
+    return None
@@ -0,0 +1,134 @@
+from bisect import bisect_right
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Iterable, NamedTuple
+from .schedule_code import compile_schedule_code, MASK_WIDTH, COMPILED_SCHEDULES_MAXSIZE
+from api.models import Class
+
+"""Este módulo considera as datas especiais das turmas na detecção de conflitos.
+
+Uma data especial indica que alguns horários da turma só acontecem em um intervalo de datas
+(ex.: ["01/03/2024 - 15/04/2024", "1", "2"] para os dois primeiros códigos do horário).
+Os limites de todos os intervalos de uma seleção dividem o semestre em trechos elementares,
+e cada máscara de aulas é repetida em cada trecho em que a aula acontece. Assim, duas turmas
+conflitam apenas se ocuparem a mesma aula em um mesmo trecho, e a busca continua usando um único "&".
+"""
+
+DATE_FORMAT = "%d/%m/%Y"
+
+
+class DateRange(NamedTuple):
+    """Intervalo de datas, com as duas datas incluídas."""
+    start: date
+    end: date
+
+
+def parse_date_range(value: str) -> DateRange | None:
+    """Converte um intervalo do SIGAA (ex.: "01/03/2024 - 15/04/2024"). Retorna None caso seja inválido."""
+    try:
+        start, end = (datetime.strptime(part.strip(), DATE_FORMAT).date()
+                      for part in value.split(" - "))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+    return DateRange(start, end) if start <= end else None
+
+
+@lru_cache(maxsize=COMPILED_SCHEDULES_MAXSIZE)
+def get_class_occupations(schedule: str, special_dates: tuple[tuple[str, ...], ...]) -> tuple[tuple[int, DateRange | None], ...]:
+    """
+    Separa as aulas de uma turma em pares (máscara, intervalo de datas). O intervalo é None para
+    as aulas que acontecem durante todo o semestre. Datas especiais inválidas são ignoradas,
+    então as aulas correspondentes passam a ocupar todo o semestre.
+    """
+    codes = schedule.split()
+    ranges = [[] for _ in codes]
+
+    for special_date in special_dates:
+        try:
+            value, start, end = special_date
+            start, end = int(start), int(end)
+        except (TypeError, ValueError):
+            continue
+
+        date_range = parse_date_range(value)
+
+        if date_range is None:
+            continue
+
+        for index in range(max(start, 1), min(end, len(codes)) + 1):
+            ranges[index - 1].append(date_range)
+
+    occupations = dict()
+
+    for code, code_ranges in zip(codes, ranges):
+        mask = compile_schedule_code(code)
+
+        for date_range in code_ranges or [None]:
+            occupations[date_range] = occupations.get(date_range, 0) | mask
+
+    return tuple((mask, date_range) for date_range, mask in occupations.items())
+
+
+def freeze_special_dates(special_dates: list[list[str]]) -> tuple[tuple[str, ...], ...]:
+    """Converte as datas especiais em tuplas, para que sirvam de chave do cache. Entradas que não são listas ficam vazias."""
+    return tuple(tuple(special_date) if isinstance(special_date, (list, tuple)) else ()
+                 for special_date in special_dates or [])
+
+
+class DateSegments:
+    """Trechos elementares do semestre, delimitados pelos limites ordenados de um conjunto de intervalos."""
+
+    def __init__(self, ranges: Iterable[DateRange]):
+        boundaries = set()
+
+        for date_range in ranges:
+            boundaries.add(date_range.start)
+            boundaries.add(date_range.end + timedelta(days=1))
+
+        self.boundaries = sorted(boundaries)
+        self.count = len(self.boundaries) + 1
+        # Multiplicar uma máscara por este valor a repete em todos os trechos, já que não há "vai um"
+        self.repeat = sum(1 << (segment * MASK_WIDTH)
+                          for segment in range(self.count))
+
+    def get_segments(self, date_range: DateRange) -> range:
+        """Retorna os trechos cobertos por um intervalo."""
+        first = bisect_right(self.boundaries, date_range.start)
+        last = bisect_right(self.boundaries, date_range.end)
+
+        return range(first, last + 1)
+
+    def expand_mask(self, mask: int, date_range: DateRange | None) -> int:
+        """Repete a máscara nos trechos do intervalo (ou em todos, caso o intervalo seja None)."""
+        if date_range is None:
+            return mask * self.repeat
+
+        return sum(mask << (segment * MASK_WIDTH) for segment in self.get_segments(date_range))
+
+
+def get_selection_masks(classes: Iterable[Class]) -> dict[int, int] | None:
+    """
+    Retorna as máscaras das turmas expandidas pelos trechos de datas da seleção.
+    Retorna None quando nenhuma turma tem datas especiais, caso em que as máscaras semanais bastam.
+    """
+    occupations = {
+        _class.id: get_class_occupations(_class.schedule, freeze_special_dates(_class.special_dates))
+        for _class in classes
+    }
+    ranges = [date_range for class_occupations in occupations.values()
+              for _, date_range in class_occupations if date_range is not None]
+
+    if not len(ranges):
+        return None
+
+    segments = DateSegments(ranges)
+    masks = dict()
+
+    for class_id, class_occupations in occupations.items():
+        masks[class_id] = 0
+
+        for mask, date_range in class_occupations:
+            masks[class_id] |= segments.expand_mask(mask, date_range)
+
+    return masks
@@ -0,0 +1,26 @@
+from django.test import TestCase
+from django.core.cache import cache
+from utils import catalog
+from utils.schedule_code import get_compiled_schedule
+
+
+class CatalogTest(TestCase):
+    def setUp(self):
+        cache.delete(catalog.CATALOG_VERSION_KEY)
+
+    def test_bump_catalog_version(self):
+        version = catalog.get_catalog_version()
+
+        self.assertEqual(catalog.bump_catalog_version(), version + 1)
+        self.assertEqual(catalog.get_catalog_version(), version + 1)
+
+    def test_sync_catalog_clears_compiled_schedules(self):
+        catalog.sync_catalog()
+        get_compiled_schedule("35T23")
+
+        catalog.sync_catalog()
+        self.assertEqual(get_compiled_schedule.cache_info().currsize, 1)
+
+        cache.incr(catalog.CATALOG_VERSION_KEY)
+        catalog.sync_catalog()
+        self.assertEqual(get_compiled_schedule.cache_info().currsize, 0)
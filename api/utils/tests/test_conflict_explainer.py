@@ -0,0 +1,72 @@
+from django.test import TestCase
+from utils.schedule_code import compile_schedule_code
+from utils.conflict_explainer import ConflictExplainer
+
+
+class ConflictExplainerTest(TestCase):
+    def make_domain(self, *schedules: str) -> list[tuple[int, int, int]]:
+        return [(index, compile_schedule_code(schedule), 0) for index, schedule in enumerate(schedules)]
+
+    def test_conflict_graph_and_components(self):
+        explainer = ConflictExplainer({
+            'A': self.make_domain("24M12"),
+            'B': self.make_domain("2M2", "35T12"),
+            'C': self.make_domain("35T1"),
+            'D': self.make_domain("6N12")
+        })
+
+        self.assertEqual(explainer.graph, [{1}, {0, 2}, {1}, set()])
+        self.assertEqual(explainer.components, [[0, 1, 2], [3]])
+
+    def test_feasible_disciplines(self):
+        explainer = ConflictExplainer({
+            'A': self.make_domain("24M12"),
+            'B': self.make_domain("2M2", "35T12")
+        })
+
+        self.assertTrue(explainer.is_feasible([0, 1]))
+        self.assertEqual(explainer.get_minimal_removals(), [])
+
+    def test_single_discipline_removal(self):
+        explainer = ConflictExplainer({
+            'A': self.make_domain("24M12"),
+            'B': self.make_domain("2M2", "35T12"),
+            'C': self.make_domain("35T1")
+        })
+
+        self.assertFalse(explainer.is_feasible([0, 1, 2]))
+        self.assertEqual(explainer.get_minimal_removals(), [('A',), ('B',), ('C',)])
+        self.assertEqual(explainer.checks, 5)
+
+    def test_removals_from_many_components(self):
+        explainer = ConflictExplainer({
+            'A': self.make_domain("24M12"),
+            'B': self.make_domain("2M2"),
+            'C': self.make_domain("35T1"),
+            'D': self.make_domain("35T12"),
+            'E': self.make_domain("5T2")
+        })
+
+        self.assertEqual(explainer.components, [[0, 1], [2, 3, 4]])
+        self.assertEqual(explainer.get_minimal_removals(), [('A', 'D'), ('B', 'D')])
+        self.assertEqual(explainer.get_minimal_removals(limit=1), [('A', 'D')])
+
+    def test_discipline_without_classes_removal(self):
+        explainer = ConflictExplainer({
+            'A': self.make_domain("24M12"),
+            'B': []
+        })
+
+        self.assertEqual(explainer.components, [[0], [1]])
+        self.assertFalse(explainer.is_feasible([1]))
+        self.assertEqual(explainer.get_minimal_removals(), [('B',)])
+
+    def test_removals_after_deadline(self):
+        explainer = ConflictExplainer({
+            'A': self.make_domain("24M12"),
+            'B': self.make_domain("2M2")
+        }, deadline=0)
+
+        self.assertEqual(explainer.get_minimal_removals(), [])
+        self.assertTrue(explainer.timed_out)
+        self.assertEqual(explainer.checks, 0)
@@ -0,0 +1,55 @@
+from django.test import TestCase
+from django.core.cache import cache
+from utils import db_handler as dbh
+from utils.conflict_index import ConflictIndex, build_conflict_index, get_conflict_index, delete_conflict_index
+from utils.catalog import bump_catalog_version
+from utils.schedule_code import compile_schedule_code
+
+
+class ConflictIndexTest(TestCase):
+    def setUp(self):
+        self.index = ConflictIndex([
+            (1, "24M12"), (2, "35M12"), (3, "2M2"), (4, ""), (5, "4M1 6T23"), (6, "invalid")
+        ])
+
+    def test_index_classes(self):
+        self.assertEqual(len(self.index), 5)
+        self.assertIn(4, self.index)
+        self.assertNotIn(6, self.index)
+
+    def test_masks(self):
+        self.assertEqual(self.index.get_mask(1), compile_schedule_code("24M12"))
+        self.assertEqual(self.index.get_mask(4), 0)
+        self.assertTrue(self.index.get_mask(1) & self.index.get_mask(3))
+        self.assertFalse(self.index.get_mask(1) & self.index.get_mask(2))
+
+
+class ConflictIndexCacheTest(TestCase):
+    def setUp(self):
+        for key in cache.keys("*"):
+            cache.delete(key)
+
+        department = dbh.get_or_create_department(code='CIC', year='2030', period='2')
+        discipline = dbh.get_or_create_discipline(
+            name='Estrutura de Dados', code='CIC1000', department=department)
+        self.class_1 = dbh.create_class(teachers=['Fabiana'], classroom='MOCAP', schedule='35T12', days=[],
+                                        _class="1", special_dates=[], discipline=discipline)
+        self.class_2 = dbh.create_class(teachers=['Fabiana'], classroom='MOCAP', schedule='35T23', days=[],
+                                        _class="2", special_dates=[], discipline=discipline)
+
+    def test_build_conflict_index(self):
+        self.assertIsNone(get_conflict_index('2030', '2'))
+
+        with self.assertNumQueries(1):
+            build_conflict_index('2030', '2')
+
+        bump_catalog_version()
+        index = get_conflict_index('2030', '2')
+
+        self.assertEqual(index.get_mask(self.class_1.id), compile_schedule_code('35T12'))
+        self.assertIs(get_conflict_index('2030', '2'), index)
+
+        delete_conflict_index('2030', '2')
+        bump_catalog_version()
+
+        self.assertIsNone(get_conflict_index('2030', '2'))
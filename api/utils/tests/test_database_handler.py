@@ -210,3 +210,137 @@ class DatabaseHandlerTest(APITestCase):
         )
 
         self.assertTrue(class_from_db == _class)
+
+
+    def test_get_classes_by_ids(self):
+        department = dbh.get_or_create_department(
+            code='MAT',
+            year='2027',
+            period='1'
+        )
+
+        discipline = dbh.get_or_create_discipline(
+            name='Cálculo 2',
+            code='MAT0027',
+            department=department
+        )
+
+        class_1 = dbh.create_class(
+            teachers=['Luiza Yoko'],
+            classroom='S9',
+            schedule='46M34',
+            days=['Quarta-Feira 10:00 às 11:50', 'Sexta-Feira 10:00 às 11:50'],
+            _class="1",
+            special_dates=[],
+            discipline=discipline
+        )
+
+        class_2 = dbh.create_class(
+            teachers=['Ricardo Fragelli'],
+            classroom='S10',
+            schedule='35T23',
+            days=['Terça-Feira 14:00 às 15:50', 'Quinta-Feira 14:00 às 15:50'],
+            _class="2",
+            special_dates=[],
+            discipline=discipline
+        )
+
+        missing_id = class_1.id + class_2.id
+
+        with self.assertNumQueries(1):
+            classes, missing_ids = dbh.get_classes_by_ids(
+                ids=[class_1.id, class_2.id, missing_id])
+            departments = [_class.discipline.department for _class in classes]
+
+        self.assertEqual(set(classes), {class_1, class_2})
+        self.assertEqual(departments, [department, department])
+        self.assertEqual(missing_ids, [missing_id])
+
+    def test_get_classes_by_disciplines(self):
+        department = dbh.get_or_create_department(
+            code='MAT',
+            year='2027',
+            period='1'
+        )
+        other_department = dbh.get_or_create_department(
+            code='MAT',
+            year='2027',
+            period='2'
+        )
+
+        discipline = dbh.get_or_create_discipline(
+            name='Cálculo 2',
+            code='MAT0027',
+            department=department
+        )
+        other_discipline = dbh.get_or_create_discipline(
+            name='Cálculo 3',
+            code='MAT0028',
+            department=other_department
+        )
+
+        classes = [dbh.create_class(
+            teachers=['Luiza Yoko'],
+            classroom='S9',
+            schedule=schedule,
+            days=[],
+            _class=str(index + 1),
+            special_dates=[],
+            discipline=discipline
+        ) for index, schedule in enumerate(['46M34', '35T23', '24M12', '6N12', '7M1234'])]
+
+        dbh.create_class(
+            teachers=['Luiza Yoko'],
+            classroom='S9',
+            schedule='46M34',
+            days=[],
+            _class="1",
+            special_dates=[],
+            discipline=other_discipline
+        )
+
+        with self.assertNumQueries(1):
+            found_classes, missing_ids = dbh.get_classes_by_disciplines(
+                disciplines_id=[discipline.id, other_discipline.id], year='2027', period='1')
+            departments = {_class.discipline.department for _class in found_classes}
+
+        self.assertEqual(set(found_classes), set(classes))
+        self.assertEqual(departments, {department})
+        self.assertEqual(missing_ids, [other_discipline.id])
+
+
+    def test_get_selection_and_discipline_classes(self):
+        department = dbh.get_or_create_department(
+            code='MAT',
+            year='2027',
+            period='1'
+        )
+
+        discipline = dbh.get_or_create_discipline(
+            name='Cálculo 2',
+            code='MAT0027',
+            department=department
+        )
+        other_discipline = dbh.get_or_create_discipline(
+            name='Cálculo 3',
+            code='MAT0028',
+            department=department
+        )
+
+        classes = [dbh.create_class(
+            teachers=['Luiza Yoko'],
+            classroom='S9',
+            schedule=schedule,
+            days=[],
+            _class=str(index + 1),
+            special_dates=[],
+            discipline=other_discipline if index < 2 else discipline
+        ) for index, schedule in enumerate(['46M34', '35T23', '24M12', '6N12'])]
+
+        with self.assertNumQueries(1):
+            found_classes = dbh.get_selection_and_discipline_classes(
+                classes_id=[classes[0].id], discipline_id=discipline.id)
+            departments = {_class.discipline.department for _class in found_classes}
+
+        self.assertEqual(set(found_classes), {classes[0], classes[2], classes[3]})
+        self.assertEqual(departments, {department})
@@ -0,0 +1,30 @@
+from django.test import TestCase
+from utils.schedule_code import compile_schedule_code
+from utils.schedule_search import select_best_schedules
+from utils.parallel_search import select_best_schedules_in_parallel, shutdown_executor
+
+
+class ParallelSearchTest(TestCase):
+    def setUp(self):
+        self.domains = [
+            [(1, compile_schedule_code("2M12"), 1), (2, compile_schedule_code("3M12"), 3),
+             (3, compile_schedule_code("2T12"), 2)],
+            [(4, compile_schedule_code("4M12"), 2), (5, compile_schedule_code("5M12"), 2),
+             (6, compile_schedule_code("2M23"), 4)],
+            [(7, compile_schedule_code("6M12"), 1), (8, compile_schedule_code("7M12"), 1)]
+        ]
+
+    def tearDown(self):
+        shutdown_executor()
+
+    def test_parallel_search_matches_sequential_search(self):
+        for limit in [None, 1, 3, 20]:
+            self.assertEqual(select_best_schedules_in_parallel(self.domains, limit, workers=2),
+                             select_best_schedules(self.domains, limit))
+
+    def test_parallel_search_after_cursor(self):
+        ranked = select_best_schedules(self.domains)
+
+        for index, after in enumerate(ranked):
+            self.assertEqual(select_best_schedules_in_parallel(self.domains, 2, after, workers=2),
+                             ranked[index + 1:index + 3])
@@ -0,0 +1,44 @@
+from django.test import TestCase
+from utils.schedule_benchmark import WORKLOADS, make_classes, run_workload
+from utils.schedule_code import compile_schedule_code
+
+
+class ScheduleBenchmarkTest(TestCase):
+    def test_make_classes(self):
+        workload = WORKLOADS["worst_case"]
+        classes = make_classes(workload)
+
+        self.assertEqual(len(classes), workload.disciplines * workload.classes_per_discipline)
+        self.assertEqual(len({_class.discipline.id for _class in classes}), workload.disciplines)
+        self.assertEqual(make_classes(workload)[0].schedule, classes[0].schedule)
+
+    def test_make_ead_classes(self):
+        classes = make_classes(WORKLOADS["ead"])
+
+        self.assertTrue(any(_class.schedule == "" for _class in classes))
+
+    def test_make_disjoint_classes(self):
+        classes = make_classes(WORKLOADS["disjoint"])
+        masks = [compile_schedule_code(_class.schedule) for _class in classes]
+
+        # Todas as turmas ocupam aulas diferentes, então nenhuma combinação conflita
+        self.assertEqual(len(set(masks)), len(classes))
+        self.assertEqual(sum(bin(mask).count("1") for mask in masks), bin(sum(masks)).count("1"))
+
+        with self.assertRaises(ValueError):
+            make_classes(WORKLOADS["disjoint"]._replace(classes_per_discipline=100))
+
+    def test_run_workload_with_conflict_density(self):
+        result = run_workload("small", repeat=1, limit=None, conflict_density=0)
+
+        self.assertEqual(result.schedules, 2 ** 3)
+        self.assertEqual(run_workload("small", repeat=1).classes, result.classes)
+
+    def test_run_workload(self):
+        result = run_workload("small", repeat=1)
+
+        self.assertEqual(result.classes, 6)
+        self.assertTrue(result.best_time <= result.mean_time)
+        self.assertTrue(result.peak_memory > 0)
+        self.assertTrue(result.candidates >= result.nodes - 1)
+        self.assertTrue(result.returned <= result.schedules)
@@ -0,0 +1,60 @@
+from django.test import TestCase
+from django.core.cache import cache
+from utils.schedule_cache import make_generation_key, get_or_generate, PARTIAL_GENERATION_TIMEOUT
+from unittest.mock import patch
+from threading import Timer
+
+
+class ScheduleCacheTest(TestCase):
+    def setUp(self):
+        self.key = make_generation_key([3, 1, 2], [3, 2, 1], 1)
+        cache.delete(self.key)
+        cache.delete(f"{self.key}/lock")
+        self.calls = 0
+
+    def generate(self) -> dict:
+        self.calls += 1
+        return {'message': 'generated', 'schedules': []}
+
+    def test_generation_key(self):
+        self.assertEqual(self.key, make_generation_key([1, 2, 3, 3], [3, 2, 1], 1))
+        self.assertNotEqual(self.key, make_generation_key([1, 2, 3], [1, 2, 3], 1))
+        self.assertNotEqual(self.key, make_generation_key([1, 2, 3], [3, 2, 1], 2))
+        self.assertNotEqual(self.key, make_generation_key([1, 2, 3], [3, 2, 1], 1, limit=5))
+
+    def test_get_or_generate(self):
+        first = get_or_generate(self.key, self.generate)
+        second = get_or_generate(self.key, self.generate)
+
+        self.assertEqual(first, second)
+        self.assertEqual(self.calls, 1)
+        self.assertIsNone(cache.get(f"{self.key}/lock"))
+
+    def test_partial_generation_timeout(self):
+        with patch("utils.schedule_cache.cache.set") as cache_set:
+            get_or_generate(self.key, self.generate, is_partial=lambda value: True)
+
+        cache_set.assert_called_once_with(
+            self.key, {'message': 'generated', 'schedules': []}, timeout=PARTIAL_GENERATION_TIMEOUT)
+
+    def test_wait_for_concurrent_generation(self):
+        cache.add(f"{self.key}/lock", True)
+        timer = Timer(0.1, cache.set, args=(
+            self.key, {'message': 'concurrent', 'schedules': []}))
+        timer.start()
+
+        value = get_or_generate(self.key, self.generate)
+        timer.join()
+
+        self.assertEqual(value['message'], 'concurrent')
+        self.assertEqual(self.calls, 0)
+
+    def test_errors_are_not_cached(self):
+        def generate_with_error():
+            raise ValueError("error")
+
+        with self.assertRaises(ValueError):
+            get_or_generate(self.key, generate_with_error)
+
+        self.assertIsNone(cache.get(self.key))
+        self.assertIsNone(cache.get(f"{self.key}/lock"))
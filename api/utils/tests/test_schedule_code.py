@@ -0,0 +1,65 @@
+from django.test import TestCase
+from utils.schedule_code import compile_schedule_code, get_slot_bit, split_schedule_code, MASK_WIDTH
+from utils.schedule_code import split_schedule_mask, join_schedule_mask, MASK_COLUMN_LIMIT
+from utils.schedule_code import get_compiled_schedule, get_schedule_priority, clear_compiled_schedules
+
+
+class ScheduleCodeTest(TestCase):
+    def test_split_schedule_code(self):
+        values = split_schedule_code("35T23 6M12")
+
+        self.assertEqual(values, [("35", "T", "23"), ("6", "M", "12")])
+
+    def test_split_invalid_schedule_code(self):
+        with self.assertRaises(ValueError):
+            split_schedule_code("35X23")
+
+    def test_compile_schedule_code(self):
+        mask = compile_schedule_code("35T23")
+        expected_bits = [
+            get_slot_bit("3", "T", "2"), get_slot_bit("3", "T", "3"),
+            get_slot_bit("5", "T", "2"), get_slot_bit("5", "T", "3")
+        ]
+
+        self.assertEqual(mask, sum(1 << bit for bit in expected_bits))
+
+    def test_compile_empty_schedule_code(self):
+        self.assertEqual(compile_schedule_code(""), 0)
+
+    def test_conflicting_schedule_codes(self):
+        self.assertTrue(compile_schedule_code("35T23") & compile_schedule_code("5T34"))
+        self.assertFalse(compile_schedule_code("35T23") & compile_schedule_code("35M23"))
+        self.assertFalse(compile_schedule_code("35T23") & compile_schedule_code("24T23"))
+
+    def test_mask_width(self):
+        mask = compile_schedule_code("234567M1234567 234567T1234567 234567N1234567")
+
+        self.assertEqual(mask, (1 << MASK_WIDTH) - 1)
+
+    def test_schedule_mask_columns(self):
+        mask = compile_schedule_code("234567M1234567 234567T1234567 234567N1234567")
+        low, high = split_schedule_mask(mask)
+
+        self.assertEqual((low, high), (MASK_COLUMN_LIMIT, MASK_COLUMN_LIMIT))
+        self.assertEqual(join_schedule_mask(low, high), mask)
+        self.assertEqual(split_schedule_mask(compile_schedule_code("2M1")), (1, 0))
+
+    def test_compiled_schedule(self):
+        compiled_schedule = get_compiled_schedule("24M12 35T23")
+
+        self.assertEqual(compiled_schedule.mask, compile_schedule_code("24M12 35T23"))
+        self.assertEqual(compiled_schedule.components, (9, 7, 0))
+        self.assertEqual(get_schedule_priority(compiled_schedule, [3, 2, 1]), 41)
+
+    def test_compiled_schedules_registry(self):
+        clear_compiled_schedules()
+
+        first = get_compiled_schedule("46M34")
+        second = get_compiled_schedule("46M34")
+
+        self.assertIs(first, second)
+        self.assertEqual(get_compiled_schedule.cache_info().currsize, 1)
+
+        clear_compiled_schedules()
+
+        self.assertEqual(get_compiled_schedule.cache_info().currsize, 0)
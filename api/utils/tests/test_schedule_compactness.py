@@ -0,0 +1,79 @@
+from django.test import TestCase
+from itertools import product
+from utils.schedule_code import compile_schedule_code
+from utils.schedule_search import SearchStats, rank_schedules
+from utils.schedule_compactness import CompactnessWeights, COMPACTNESS_WEIGHT_ERROR
+from utils.schedule_compactness import make_compactness_weights, get_day_layout, get_gaps_mask, count_days
+from utils.schedule_compactness import get_compactness_penalty, search_compact_schedules
+
+
+class ScheduleCompactnessTest(TestCase):
+    def setUp(self):
+        self.domains = [
+            [(1, compile_schedule_code("2M12"), 4), (2, compile_schedule_code("3M12"), 4)],
+            [(3, compile_schedule_code("2M45"), 2), (4, compile_schedule_code("4M34"), 3)],
+            [(5, compile_schedule_code("2M3"), 1), (6, compile_schedule_code("5T12"), 2),
+             (7, compile_schedule_code("3M3"), 1)]
+        ]
+        self.weekly_masks = {option[0]: option[1] for domain in self.domains for option in domain}
+
+    def get_all_schedules(self, weights: CompactnessWeights) -> list:
+        layout = get_day_layout(self.weekly_masks.values())
+        schedules = []
+
+        for options in product(*self.domains):
+            occupied = 0
+
+            for _, mask, _ in options:
+                occupied = None if occupied is None or occupied & mask else occupied | mask
+
+            if occupied is not None:
+                score = sum(option[2] for option in options) - get_compactness_penalty(occupied, weights, layout)
+                schedules.append((score, tuple(option[0] for option in options)))
+
+        return rank_schedules(schedules)
+
+    def test_make_compactness_weights(self):
+        self.assertEqual(make_compactness_weights(2, 0), CompactnessWeights(2, 0))
+
+        for weights in [(-1, 1), (1, 11), ("1", 1), (True, 1)]:
+            with self.assertRaisesMessage(ValueError, COMPACTNESS_WEIGHT_ERROR):
+                make_compactness_weights(*weights)
+
+    def test_gaps_and_days(self):
+        layout = get_day_layout([compile_schedule_code("2M12345 2T1")])
+        occupied = compile_schedule_code("2M1 2M5 3M2 3T1")
+
+        self.assertEqual(get_gaps_mask(occupied, layout), compile_schedule_code("2M234 3M345"))
+        self.assertEqual(count_days(occupied), 2)
+        self.assertEqual(get_compactness_penalty(occupied, CompactnessWeights(2, 3), layout), 2 * 6 + 3 * 2)
+
+    def test_search_compact_schedules(self):
+        for weights in [CompactnessWeights(0, 0), CompactnessWeights(), CompactnessWeights(5, 2)]:
+            expected = self.get_all_schedules(weights)
+
+            self.assertEqual(search_compact_schedules(self.domains, self.weekly_masks, weights), expected)
+
+            for limit in range(1, len(expected) + 1):
+                self.assertEqual(search_compact_schedules(
+                    self.domains, self.weekly_masks, weights, limit), expected[:limit])
+
+            self.assertEqual(search_compact_schedules(
+                self.domains, self.weekly_masks, weights, 2, expected[1]), expected[2:4])
+
+    def test_compactness_changes_ranking(self):
+        ranked = search_compact_schedules(self.domains, self.weekly_masks, CompactnessWeights(0, 0), 1)
+        compact = search_compact_schedules(self.domains, self.weekly_masks, CompactnessWeights(5, 5), 1)
+
+        self.assertEqual(ranked, [(9, (1, 4, 6))])
+        self.assertEqual(compact, [(2, (1, 3, 5))])
+
+    def test_branch_and_bound(self):
+        full_stats = SearchStats()
+        bounded_stats = SearchStats()
+        weights = CompactnessWeights(5, 5)
+
+        search_compact_schedules(self.domains, self.weekly_masks, weights, stats=full_stats)
+        search_compact_schedules(self.domains, self.weekly_masks, weights, 1, stats=bounded_stats)
+
+        self.assertLess(bounded_stats.nodes, full_stats.nodes)
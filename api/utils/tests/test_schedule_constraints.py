@@ -0,0 +1,55 @@
+from django.test import TestCase
+from utils.schedule_code import compile_schedule_code
+from utils.schedule_constraints import ScheduleConstraints, INVALID_FREE_DAY_ERROR
+from utils.schedule_constraints import get_day_mask, make_constraints, get_constraint_params
+
+
+class ScheduleConstraintsTest(TestCase):
+    def test_day_mask(self):
+        self.assertEqual(get_day_mask(2), compile_schedule_code(
+            "2M1234567 2T1234567 2N1234567"))
+        self.assertEqual(get_day_mask(7), compile_schedule_code(
+            "7M1234567 7T1234567 7N1234567"))
+
+    def test_make_constraints(self):
+        constraints = make_constraints(
+            blocked=["6T2345"], free_days=[7], pinned=[1, 2])
+
+        self.assertEqual(constraints.blocked, compile_schedule_code(
+            "6T2345") | get_day_mask(7))
+        self.assertEqual(constraints.pinned, frozenset([1, 2]))
+        self.assertIsNone(make_constraints())
+        self.assertIsNone(make_constraints(blocked=[], free_days=[], pinned=[]))
+
+    def test_make_constraints_with_invalid_values(self):
+        with self.assertRaises(ValueError):
+            make_constraints(blocked=["8T2345"])
+
+        for free_days in [[1], [8], [23], ["2"]]:
+            with self.assertRaisesMessage(ValueError, INVALID_FREE_DAY_ERROR):
+                make_constraints(free_days=free_days)
+
+    def test_allowed_classes(self):
+        masks = {
+            1: compile_schedule_code("24M12"),
+            2: compile_schedule_code("35T34"),
+            3: compile_schedule_code("6N12")
+        }
+
+        constraints = ScheduleConstraints(blocked=compile_schedule_code("3T3"))
+        self.assertEqual(constraints.get_allowed_classes([1, 2, 3], masks.get), [1, 3])
+
+        constraints = ScheduleConstraints(pinned=frozenset([3]))
+        self.assertEqual(constraints.get_allowed_classes([1, 2, 3], masks.get), [3])
+        self.assertEqual(constraints.get_allowed_classes([1, 2], masks.get), [1, 2])
+
+        constraints = ScheduleConstraints(blocked=get_day_mask(6), pinned=frozenset([3]))
+        self.assertEqual(constraints.get_allowed_classes([1, 2, 3], masks.get), [])
+
+    def test_constraint_params(self):
+        self.assertEqual(get_constraint_params(
+            blocked=["6T2345", "2M12", "6T2345"], pinned=[3, 1]), {
+            'blocked': ["2M12", "6T2345"],
+            'pinned': [1, 3]
+        })
+        self.assertEqual(get_constraint_params(), {})
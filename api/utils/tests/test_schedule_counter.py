@@ -0,0 +1,36 @@
+from django.test import TestCase
+from utils.schedule_code import compile_schedule_code
+from utils.schedule_search import search_schedules
+from utils.schedule_counter import get_components, count_schedules
+
+
+class ScheduleCounterTest(TestCase):
+    def setUp(self):
+        self.domains = [
+            [(1, compile_schedule_code("24M12"), 5), (2, compile_schedule_code("35M12"), 5)],
+            [(3, compile_schedule_code("24M12"), 5), (4, compile_schedule_code("6T12"), 1)],
+            [(5, compile_schedule_code("35M12"), 5), (6, compile_schedule_code("6T23"), 3),
+             (7, compile_schedule_code("24M1"), 4)],
+            [(8, 0, 0), (9, 0, 0)],
+            [(10, compile_schedule_code("7N12"), 0), (11, compile_schedule_code("7N34"), 0)]
+        ]
+
+    def test_components(self):
+        components = get_components(self.domains)
+
+        self.assertEqual(sorted(len(component) for component in components), [1, 1, 3])
+
+    def test_count_schedules(self):
+        self.assertEqual(count_schedules(self.domains), len(list(search_schedules(self.domains))))
+        self.assertEqual(count_schedules(self.domains[:1]), 2)
+
+    def test_count_schedules_without_solution(self):
+        domains = self.domains + [[(12, compile_schedule_code("7N1234"), 0)]]
+
+        self.assertEqual(count_schedules(domains), 0)
+        self.assertEqual(count_schedules([]), 0)
+
+    def test_count_many_schedules(self):
+        domains = [[(discipline * 4 + index, 0, 0) for index in range(4)] for discipline in range(11)]
+
+        self.assertEqual(count_schedules(domains), 4 ** 11)
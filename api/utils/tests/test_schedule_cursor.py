@@ -0,0 +1,27 @@
+from django.test import TestCase
+from utils.schedule_cursor import make_selection_digest, encode_cursor, decode_cursor, INVALID_CURSOR_ERROR
+
+
+class ScheduleCursorTest(TestCase):
+    def setUp(self):
+        self.selection = make_selection_digest([3, 1, 2], [3, 2, 1])
+
+    def test_selection_digest(self):
+        self.assertEqual(self.selection, make_selection_digest([1, 2, 3], [3, 2, 1]))
+        self.assertNotEqual(self.selection, make_selection_digest([1, 2, 3], None))
+
+    def test_encode_and_decode_cursor(self):
+        cursor = encode_cursor(self.selection, 42, (1, 3))
+
+        self.assertEqual(decode_cursor(cursor, self.selection), (42, (1, 3)))
+
+    def test_cursor_from_another_selection(self):
+        cursor = encode_cursor(make_selection_digest([1, 2], None), 42, (1, 3))
+
+        with self.assertRaisesMessage(ValueError, INVALID_CURSOR_ERROR):
+            decode_cursor(cursor, self.selection)
+
+    def test_malformed_cursor(self):
+        for cursor in ["", "not a cursor", encode_cursor(self.selection, "42", (1, 3))]:
+            with self.assertRaisesMessage(ValueError, INVALID_CURSOR_ERROR):
+                decode_cursor(cursor, self.selection)
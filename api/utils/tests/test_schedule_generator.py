@@ -1,6 +1,11 @@
 from rest_framework.test import APITestCase
 from utils import db_handler as dbh
-from utils.schedule_generator import ScheduleGenerator, LIMIT_ERROR_MESSAGE, PREFERENCE_RANGE_ERROR
+from utils.schedule_generator import ScheduleGenerator, LIMIT_ERROR_MESSAGE, PREFERENCE_RANGE_ERROR, FIX_PROBLEM_MESSAGE
+from utils.schedule_generator import TIMEOUT_ERROR, NO_SCHEDULES_ERROR
+from utils.schedule_constraints import make_constraints
+from utils.schedule_compactness import CompactnessWeights
+from utils.parallel_search import shutdown_executor
+from unittest.mock import patch
 from random import randint
 
 
@@ -125,6 +130,76 @@ class TestSchedule(APITestCase):
 
         self.assertFalse(len(generated_data["schedules"]))
 
+    def test_with_special_dates(self):
+        """
+        Testa a geração de horários com turmas que ocupam os mesmos horários em períodos diferentes do semestre
+        """
+        first_half = dbh.create_class(teachers=['Edson Alves'], classroom='I6', schedule='7M1234',
+                                      days=['Sábado 08:00 às 11:50'], _class="6", discipline=self.discipline_1,
+                                      special_dates=[['04/03/2024 - 20/04/2024', '1', '1']])
+        second_half = dbh.create_class(teachers=['Fabiana'], classroom='MOCAP', schedule='7M1234',
+                                       days=['Sábado 08:00 às 11:50'], _class="2", discipline=self.discipline_2,
+                                       special_dates=[['22/04/2024 - 06/07/2024', '1', '1']])
+
+        generated_data = ScheduleGenerator(
+            classes_id=[first_half.id, second_half.id]).generate()
+
+        self.assertEqual(len(generated_data["schedules"]), 1)
+
+        generated_data = ScheduleGenerator(
+            classes_id=[self.class_5.id, second_half.id]).generate()
+
+        self.assertFalse(len(generated_data["schedules"]))
+
+    def test_conflicting_disciplines_message(self):
+        """
+        Testa a sugestão de disciplinas a serem removidas quando não há grades horárias
+        """
+
+        schedule_generator = ScheduleGenerator(
+            classes_id=[self.class_4.id, self.class_6.id, self.class_7.id])
+        generated_data = schedule_generator.generate()
+
+        self.assertEqual(schedule_generator.conflicting_disciplines, [
+            (self.discipline_1, self.discipline_2),
+            (self.discipline_1, self.discipline_3),
+            (self.discipline_2, self.discipline_3)
+        ])
+        self.assertIn(FIX_PROBLEM_MESSAGE, generated_data["message"])
+        self.assertIn(f"- {self.discipline_1.code}: {self.discipline_1.name} + {self.discipline_2.code}: {self.discipline_2.name}",
+                      generated_data["message"])
+
+    def test_conflicting_disciplines_after_deadline(self):
+        """
+        Testa que a explicação dos conflitos é abandonada quando o prazo da geração termina
+        """
+
+        with patch("utils.schedule_generator.monotonic", return_value=-60):
+            schedule_generator = ScheduleGenerator(
+                classes_id=[self.class_4.id, self.class_6.id, self.class_7.id], time_limit=1)
+            generated_data = schedule_generator.generate()
+
+        self.assertEqual(schedule_generator.conflicting_disciplines, [])
+        self.assertEqual(generated_data["message"], NO_SCHEDULES_ERROR)
+        self.assertFalse(generated_data["partial"])
+
+    def test_generation_metrics(self):
+        """
+        Testa os contadores e os tempos de cada etapa da geração
+        """
+
+        schedule_generator = ScheduleGenerator(
+            classes_id=[self.class_4.id, self.class_6.id, self.class_7.id])
+        schedule_generator.generate()
+        metrics = schedule_generator.metrics
+
+        self.assertEqual(metrics.classes, 3)
+        self.assertEqual(metrics.schedule_codes, len(
+            {self.class_4.schedule, self.class_6.schedule, self.class_7.schedule}))
+        self.assertTrue(metrics.conflict_checks > 0)
+        self.assertEqual(set(metrics.timings), {"load", "parse", "search", "explain"})
+        self.assertEqual(metrics.to_dict(schedule_generator.stats)["schedules"], 0)
+
     def test_with_empty_classes(self):
         """
         Testa a geração de horários com uma lista de classes vazia
@@ -179,3 +254,210 @@ class TestSchedule(APITestCase):
                 classes_id=[self.class_1.id], preference=[1, 2, '3'])
         except Exception as error:
             self.assertEqual(str(error), PREFERENCE_RANGE_ERROR)
+
+    def test_with_limit(self):
+        """
+        Testa a geração de horários retornando apenas as melhores grades horárias
+        """
+
+        classes_id = [self.class_1.id, self.class_2.id,
+                      self.class_3.id, self.class_4.id]
+
+        all_schedules = ScheduleGenerator(
+            classes_id=classes_id, preference=[3, 2, 1]).generate()["schedules"]
+        best_schedules = ScheduleGenerator(
+            classes_id=classes_id, preference=[3, 2, 1], limit=2).generate()["schedules"]
+
+        self.assertEqual(len(best_schedules), 2)
+        self.assertEqual(best_schedules, all_schedules[:2])
+
+    def test_with_previous_generation(self):
+        """
+        Testa a geração de horários reaproveitando o estado de uma geração com uma turma a menos
+        """
+
+        classes_id = [self.class_1.id, self.class_2.id,
+                      self.class_3.id, self.class_4.id]
+
+        previous = ScheduleGenerator(
+            classes_id=classes_id[:3], preference=[3, 2, 1], limit=2)
+        previous.generate()
+
+        expected = ScheduleGenerator(
+            classes_id=classes_id, preference=[3, 2, 1], limit=2).generate()
+        schedules = ScheduleGenerator(
+            classes_id=classes_id, preference=[3, 2, 1], limit=2, previous=previous.get_state()).generate()
+
+        self.assertEqual(schedules, expected)
+
+    def test_with_partial_previous_generation(self):
+        """
+        Testa que o estado de uma geração interrompida pelo prazo não é reaproveitado
+        """
+
+        classes_id = [self.class_1.id, self.class_2.id,
+                      self.class_3.id, self.class_4.id]
+
+        previous = ScheduleGenerator(
+            classes_id=classes_id[:3], preference=[3, 2, 1], limit=2)
+        previous.generate()
+        state = {**previous.get_state(), 'ranking': [], 'partial': True}
+
+        expected = ScheduleGenerator(
+            classes_id=classes_id, preference=[3, 2, 1], limit=2).generate()
+        schedules = ScheduleGenerator(
+            classes_id=classes_id, preference=[3, 2, 1], limit=2, previous=state).generate()
+
+        self.assertFalse(previous.get_state()['partial'])
+        self.assertEqual(schedules, expected)
+
+    def test_from_loaded_classes(self):
+        """
+        Testa a geração de horários a partir de turmas já carregadas
+        """
+
+        classes = [self.class_1, self.class_2, self.class_6]
+
+        expected = ScheduleGenerator(
+            classes_id=[_class.id for _class in classes], preference=[3, 2, 1]).generate()
+
+        with self.assertNumQueries(0):
+            schedules = ScheduleGenerator.from_classes(
+                classes, preference=[3, 2, 1]).generate()
+
+        self.assertEqual(schedules, expected)
+
+    def test_with_time_limit(self):
+        """
+        Testa a geração de horários interrompida pelo tempo limite
+        """
+
+        classes_id = [self.class_1.id, self.class_2.id, self.class_6.id]
+
+        generated_data = ScheduleGenerator(
+            classes_id=classes_id, preference=[3, 2, 1]).generate()
+
+        self.assertFalse(generated_data["partial"])
+
+        with patch("utils.schedule_generator.DEADLINE_SEARCH_SPACE_THRESHOLD", 0), \
+                patch("utils.schedule_search.DEADLINE_CHECK_INTERVAL", 1), \
+                patch("utils.schedule_generator.monotonic", return_value=-60):
+            generated_data = ScheduleGenerator(
+                classes_id=classes_id, preference=[3, 2, 1], time_limit=1).generate()
+
+        self.assertTrue(generated_data["partial"])
+        self.assertFalse(len(generated_data["schedules"]))
+        self.assertEqual(generated_data["message"], TIMEOUT_ERROR)
+
+    def test_with_parallel_search(self):
+        """
+        Testa a geração de horários com a busca paralela
+        """
+
+        classes_id = [self.class_1.id, self.class_2.id,
+                      self.class_3.id, self.class_4.id]
+
+        sequential = ScheduleGenerator(
+            classes_id=classes_id, preference=[3, 2, 1], workers=0).generate()["schedules"]
+
+        with patch("utils.schedule_generator.PARALLEL_SEARCH_THRESHOLD", 0):
+            parallel = ScheduleGenerator(
+                classes_id=classes_id, preference=[3, 2, 1], workers=2).generate()["schedules"]
+
+        shutdown_executor()
+
+        self.assertEqual(parallel, sequential)
+
+    def test_with_constraints(self):
+        """
+        Testa a geração de horários com horários bloqueados, dias livres e turmas fixadas
+        """
+
+        classes_id = [self.class_1.id, self.class_2.id,
+                      self.class_3.id, self.class_4.id, self.class_7.id]
+
+        schedules = ScheduleGenerator(classes_id=classes_id, preference=[3, 2, 1],
+                                      constraints=make_constraints(blocked=["6T3"])).generate()["schedules"]
+        self.assertTrue(len(schedules))
+        self.assertTrue(all(self.class_1 not in schedule for schedule in schedules))
+
+        schedules = ScheduleGenerator(classes_id=classes_id, preference=[3, 2, 1],
+                                      constraints=make_constraints(free_days=[5])).generate()["schedules"]
+        self.assertTrue(len(schedules))
+        self.assertTrue(all(self.class_2 not in schedule for schedule in schedules))
+
+        schedules = ScheduleGenerator(classes_id=classes_id, preference=[3, 2, 1],
+                                      constraints=make_constraints(pinned=[self.class_3.id])).generate()["schedules"]
+        self.assertTrue(len(schedules))
+        self.assertTrue(all(self.class_3 in schedule for schedule in schedules))
+
+        generated_data = ScheduleGenerator(classes_id=classes_id, preference=[3, 2, 1],
+                                           constraints=make_constraints(free_days=[3])).generate()
+        self.assertFalse(len(generated_data["schedules"]))
+        self.assertTrue(generated_data["message"].startswith(NO_SCHEDULES_ERROR))
+
+    def test_with_pinned_class_not_selected(self):
+        """
+        Testa a geração de horários com uma turma fixada que não foi escolhida
+        """
+
+        with self.assertRaises(ValueError):
+            ScheduleGenerator(classes_id=[self.class_1.id], constraints=make_constraints(
+                pinned=[self.class_2.id]))
+
+    def test_with_compactness(self):
+        """
+        Testa a geração de horários ordenada pela compacidade
+        """
+
+        classes_id = [self.class_1.id, self.class_2.id, self.class_3.id, self.class_6.id]
+
+        generated_data = ScheduleGenerator(
+            classes_id=classes_id, preference=[3, 2, 1], compactness=CompactnessWeights(0, 0)).generate()
+        expected = ScheduleGenerator(
+            classes_id=classes_id, preference=[3, 2, 1]).generate()
+
+        self.assertEqual(generated_data["schedules"], expected["schedules"])
+
+        schedule_generator = ScheduleGenerator(
+            classes_id=classes_id, preference=[3, 2, 1], limit=1, compactness=CompactnessWeights(10, 10))
+        generated_data = schedule_generator.generate()
+
+        self.assertEqual(generated_data["schedules"], [[self.class_1, self.class_6]])
+
+    def test_count(self):
+        """
+        Testa a contagem de grades horárias sem gerá-las
+        """
+
+        classes_id = [self.class_1.id, self.class_2.id, self.class_3.id,
+                      self.class_4.id, self.class_6.id, self.class_7.id]
+
+        schedules = ScheduleGenerator(classes_id=classes_id).generate()["schedules"]
+
+        self.assertEqual(ScheduleGenerator(classes_id=classes_id).count(), len(schedules))
+        self.assertEqual(ScheduleGenerator(classes_id=classes_id, constraints=make_constraints(
+            free_days=[4])).count(), 0)
+
+    def test_from_disciplines(self):
+        """
+        Testa a geração de horários com todas as turmas das disciplinas, sem o limite de turmas por disciplina
+        """
+
+        classes_id = [self.class_1.id, self.class_2.id, self.class_3.id,
+                      self.class_4.id, self.class_5.id, self.class_6.id]
+
+        with self.assertRaisesMessage(ValueError, LIMIT_ERROR_MESSAGE):
+            ScheduleGenerator(classes_id=classes_id)
+
+        expected = ScheduleGenerator(classes_id=classes_id, maximum_classes=None, preference=[3, 2, 1]).generate()
+
+        with self.assertNumQueries(1):
+            schedule_generator = ScheduleGenerator.from_disciplines(
+                [self.discipline_1.id, self.discipline_2.id], '2030', '2', preference=[3, 2, 1])
+
+        self.assertEqual(schedule_generator.generate(), expected)
+        self.assertEqual(len(expected["schedules"]), 3)
+
+        with self.assertRaises(ValueError):
+            ScheduleGenerator.from_disciplines([self.discipline_1.id], '2030', '1')
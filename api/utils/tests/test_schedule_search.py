@@ -0,0 +1,182 @@
+from django.test import TestCase
+from unittest.mock import patch
+from time import monotonic
+from utils.schedule_code import compile_schedule_code
+from utils.schedule_search import reduce_domains, get_search_order, search_schedules, rank_schedules, select_best_schedules
+from utils.schedule_search import estimate_search_space, split_domains, SearchStats
+from utils.schedule_search import add_class_to_best_schedules, remove_class_from_best_schedules
+from utils.schedule_search import group_equivalent_classes, select_best_ungrouped_schedules
+
+
+class ScheduleSearchTest(TestCase):
+    def setUp(self):
+        self.domains = [
+            [(1, compile_schedule_code("24M12"), 5), (2, compile_schedule_code("35M12"), 5)],
+            [(3, compile_schedule_code("24M12"), 5)],
+            [(4, compile_schedule_code("35M12"), 5), (5, compile_schedule_code("6T23"), 3),
+             (6, compile_schedule_code("24M1"), 4)]
+        ]
+        self.free_domains = [
+            [(1, compile_schedule_code("2M12"), 1), (2, compile_schedule_code("3M12"), 3)],
+            [(3, compile_schedule_code("4M12"), 2), (4, compile_schedule_code("5M12"), 2)],
+            [(5, compile_schedule_code("6M12"), 1), (6, compile_schedule_code("7M12"), 1)]
+        ]
+
+    def test_reduce_domains(self):
+        domains = reduce_domains(self.domains)
+
+        self.assertEqual([class_id for class_id, _, _ in domains[0]], [2])
+        self.assertEqual([class_id for class_id, _, _ in domains[1]], [3])
+        self.assertEqual([class_id for class_id, _, _ in domains[2]], [5])
+
+    def test_search_order(self):
+        self.assertEqual(get_search_order(self.domains), [1, 0, 2])
+
+    def test_search_schedules(self):
+        schedules = list(search_schedules(self.domains))
+
+        self.assertEqual(schedules, [(13, (2, 3, 5))])
+
+    def test_search_stats(self):
+        stats = SearchStats()
+        schedules = list(search_schedules(self.free_domains, stats=stats))
+
+        self.assertEqual(stats.schedules, len(schedules))
+        self.assertEqual(stats.nodes, 1 + 2 + 4 + 8)
+        self.assertEqual(stats.candidates, 2 + 4 + 8)
+
+    def test_search_schedules_without_solution(self):
+        domains = self.domains + [[(7, compile_schedule_code("35M2"), 1)]]
+
+        self.assertEqual(list(search_schedules(domains)), [])
+
+    def test_search_schedules_without_domains(self):
+        self.assertEqual(list(search_schedules([])), [])
+
+    def test_rank_schedules(self):
+        ranked = rank_schedules(search_schedules(self.free_domains))
+
+        self.assertEqual(len(ranked), 8)
+        self.assertEqual(ranked[0], (6, (2, 3, 5)))
+        self.assertEqual(ranked[1], (6, (2, 3, 6)))
+        self.assertEqual(ranked[-1], (4, (1, 4, 6)))
+
+    def test_select_best_schedules(self):
+        ranked = rank_schedules(search_schedules(self.free_domains))
+
+        for limit in range(10):
+            best = select_best_schedules(self.free_domains, limit)
+            self.assertEqual(best, ranked[:limit])
+
+    def test_select_schedules_after_cursor(self):
+        ranked = rank_schedules(search_schedules(self.free_domains))
+
+        for index, after in enumerate(ranked):
+            self.assertEqual(select_best_schedules(
+                self.free_domains, 3, after), ranked[index + 1:index + 4])
+            self.assertEqual(select_best_schedules(
+                self.free_domains, after=after), ranked[index + 1:])
+
+    def test_search_schedules_with_maximum_priority(self):
+        schedules = list(search_schedules(self.free_domains, maximum_priority=4))
+
+        self.assertEqual(schedules, [(4, (1, 3, 5)), (4, (1, 3, 6)), (4, (1, 4, 5)), (4, (1, 4, 6))])
+
+    def test_estimate_search_space(self):
+        self.assertEqual(estimate_search_space(self.free_domains), 8)
+        self.assertEqual(estimate_search_space(self.domains), 1)
+
+    def test_split_domains(self):
+        partitions = split_domains(self.free_domains)
+        schedules = rank_schedules(schedule for partition in partitions
+                                   for schedule in search_schedules(partition))
+
+        self.assertEqual(len(partitions), 2)
+        self.assertEqual(schedules, rank_schedules(search_schedules(self.free_domains)))
+
+    def test_split_domains_without_choices(self):
+        self.assertEqual(len(split_domains(self.domains)), 1)
+
+    def test_add_class_to_best_schedules(self):
+        domains = [domain[:] for domain in self.free_domains]
+        domains[1].append((7, compile_schedule_code("4T12"), 4))
+
+        for limit in [3, None]:
+            previous = select_best_schedules(self.free_domains, limit)
+            self.assertEqual(add_class_to_best_schedules(domains, previous, 7, limit),
+                             select_best_schedules(domains, limit))
+
+    def test_add_discarded_class_to_best_schedules(self):
+        for limit in [3, None]:
+            previous = select_best_schedules(self.free_domains, limit)
+            self.assertEqual(add_class_to_best_schedules(self.free_domains, previous, 7, limit), previous)
+
+    def test_remove_class_from_best_schedules(self):
+        domains = [domain[:] for domain in self.free_domains]
+        domains[0] = domains[0][:1]
+
+        for limit in [1, 3, None]:
+            previous = select_best_schedules(self.free_domains, limit)
+            self.assertEqual(remove_class_from_best_schedules(domains, previous, 2, limit),
+                             select_best_schedules(domains, limit))
+
+    def test_search_with_expired_deadline(self):
+        stats = SearchStats()
+
+        with patch("utils.schedule_search.DEADLINE_CHECK_INTERVAL", 4):
+            best = select_best_schedules(self.free_domains, 3, stats=stats, deadline=monotonic() - 1)
+
+        self.assertTrue(stats.timed_out)
+        self.assertTrue(len(best) < 3)
+        self.assertEqual(best, rank_schedules(best))
+
+    def test_search_before_deadline(self):
+        stats = SearchStats()
+        best = select_best_schedules(self.free_domains, 3, stats=stats, deadline=monotonic() + 60)
+
+        self.assertFalse(stats.timed_out)
+        self.assertEqual(best, select_best_schedules(self.free_domains, 3))
+
+    def test_group_equivalent_classes(self):
+        domains = [
+            [(3, compile_schedule_code("2M12"), 1), (1, compile_schedule_code("2M12"), 1),
+             (2, compile_schedule_code("3M12"), 1)],
+            [(4, 0, 0), (5, 0, 0)]
+        ]
+        grouped_domains, groups = group_equivalent_classes(domains)
+
+        self.assertEqual([[class_id for class_id, _, _ in domain] for domain in grouped_domains], [[1, 2], [4]])
+        self.assertEqual(groups, {1: (1, 3), 2: (2,), 4: (4, 5)})
+
+    def test_select_best_schedules_with_equivalent_classes(self):
+        domains = [domain + [(class_id + 10, mask, priority) for class_id, mask, priority in domain]
+                   for domain in self.free_domains]
+        ranked = select_best_ungrouped_schedules(domains)
+
+        self.assertEqual(len(ranked), 64)
+        self.assertEqual(select_best_schedules(domains), ranked)
+
+        for limit in [1, 5, 9]:
+            self.assertEqual(select_best_schedules(domains, limit), ranked[:limit])
+
+        for index in [0, 7, 30]:
+            self.assertEqual(select_best_schedules(domains, 5, ranked[index]), ranked[index + 1:index + 6])
+
+    def test_search_schedules_with_minimum_priority(self):
+        schedules = list(search_schedules(self.free_domains, minimum_priority=lambda: 6))
+
+        self.assertEqual(sorted(schedules), [(6, (2, 3, 5)), (6, (2, 3, 6)), (6, (2, 4, 5)), (6, (2, 4, 6))])
+
+    def test_select_best_schedules_prunes_branches(self):
+        domains = [[(discipline * 10 + index, 1 << (discipline * 10 + index), index) for index in range(6)]
+                   for discipline in range(5)]
+        full_stats = SearchStats()
+        bounded_stats = SearchStats()
+
+        ranked = select_best_schedules(domains, stats=full_stats)
+        best = select_best_schedules(domains, 3, stats=bounded_stats)
+
+        self.assertEqual(best, ranked[:3])
+        self.assertLess(bounded_stats.nodes, full_stats.nodes / 100)
+        self.assertEqual(full_stats.pruned, 0)
+        self.assertTrue(bounded_stats.pruned > 0)
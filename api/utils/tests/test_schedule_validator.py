@@ -0,0 +1,51 @@
+from rest_framework.test import APITestCase
+from utils import db_handler as dbh
+from utils.schedule_validator import check_compatibility, validate_classes, IncompatibleClassesError
+
+
+class TestScheduleValidator(APITestCase):
+    def setUp(self):
+        self.department = dbh.get_or_create_department(
+            code='CIC', year='2030', period='2')
+        self.discipline_1 = dbh.get_or_create_discipline(
+            name='Programação Competitiva', code='CIC0169', department=self.department)
+        self.discipline_2 = dbh.get_or_create_discipline(
+            name='Estrutura de Dados', code='CIC1000', department=self.department)
+        self.discipline_3 = dbh.get_or_create_discipline(
+            name='Cálculo 1', code='MAT518', department=self.department)
+        self.class_1 = dbh.create_class(teachers=['Edson Alves'], classroom='I6', schedule='46T34',
+                                        days=['Quarta-Feira 16:00 às 17:50', 'Sexta-Feira 16:00 às 17:50'],
+                                        _class="1", special_dates=[], discipline=self.discipline_1)
+        self.class_2 = dbh.create_class(teachers=['Edson Alves'], classroom='MOCAP', schedule='35T12',
+                                        days=['Terça-Feira 14:00 às 15:50', 'Quinta-Feira 14:00 às 15:50'],
+                                        _class="2", special_dates=[], discipline=self.discipline_1)
+        self.class_3 = dbh.create_class(teachers=['Fabiana'], classroom='MOCAP', schedule='35T23',
+                                        days=['Terça-Feira 15:00 às 16:50', 'Quinta-Feira 15:00 às 16:50'],
+                                        _class="1", special_dates=[], discipline=self.discipline_2)
+        self.class_4 = dbh.create_class(teachers=['Luiza Yoko'], classroom='S9', schedule='6T4',
+                                        days=['Sexta-Feira 16:00 às 16:50'],
+                                        _class="1", special_dates=[], discipline=self.discipline_3)
+
+    def test_compatible_classes(self):
+        with self.assertNumQueries(1):
+            classes = validate_classes([self.class_3.id, self.class_1.id])
+
+        self.assertEqual(classes, [self.class_1, self.class_3])
+
+    def test_colliding_classes(self):
+        compatibility = check_compatibility(
+            [self.class_1.id, self.class_3.id, self.class_4.id, self.class_2.id])
+
+        self.assertFalse(compatibility.is_compatible())
+        self.assertEqual(compatibility.collisions, [
+            (self.class_1, self.class_2), (self.class_2, self.class_3), (self.class_1, self.class_4)])
+
+    def test_validate_colliding_classes(self):
+        with self.assertRaises(IncompatibleClassesError) as context:
+            validate_classes([self.class_2.id, self.class_3.id])
+
+        self.assertEqual(context.exception.collisions, [(self.class_2, self.class_3)])
+
+    def test_validate_nonexistent_class(self):
+        with self.assertRaises(ValueError):
+            validate_classes([self.class_1.id, -1])
@@ -0,0 +1,162 @@
+from django.test import TestCase, override_settings
+from django.core.cache import cache
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from utils import db_handler as dbh
+from utils.schedule_code import get_compiled_schedule
+from utils.schedule_generator import ScheduleGenerator
+from utils.shared_catalog import SharedCatalog, write_catalog, read_catalog_version, build_shared_catalog, publish_shared_catalog
+from utils.shared_catalog import get_catalog_path, get_shared_catalog, delete_shared_catalog, get_period_version, bump_period_version
+from utils.shared_catalog import CATALOG_FILE_MODE
+from utils.catalog import bump_catalog_version
+from unittest.mock import patch
+import os
+
+
+class SharedCatalogTest(TestCase):
+    def setUp(self):
+        self.directory = TemporaryDirectory()
+        self.path = Path(self.directory.name) / "catalog.bin"
+        self.count = write_catalog(self.path, 3, [
+            (1, 10, "24M12", [], "MAT0025", "Cálculo 1"),
+            (2, 10, "35T23", [["04/03/2024 - 20/04/2024", "1", "1"]], "MAT0025", "Cálculo 1"),
+            (4, 11, "invalid", [], "MAT0026", "Cálculo 2"),
+            (5, 11, "", [], "MAT0026", "Cálculo 2")
+        ])
+        self.catalog = SharedCatalog(self.path)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_catalog_classes(self):
+        self.assertEqual(self.count, 3)
+        self.assertEqual(len(self.catalog), 3)
+        self.assertEqual(self.catalog.version, 3)
+        self.assertIn(5, self.catalog)
+        self.assertNotIn(3, self.catalog)
+        self.assertNotIn(4, self.catalog)
+
+        _class = self.catalog.get_class(2)
+
+        self.assertEqual(_class.schedule, "35T23")
+        self.assertEqual(_class.special_dates, [["04/03/2024 - 20/04/2024", "1", "1"]])
+        self.assertEqual((_class.discipline.id, _class.discipline.code, _class.discipline.name),
+                         (10, "MAT0025", "Cálculo 1"))
+
+    def test_catalog_file_mode(self):
+        self.assertEqual(os.stat(self.path).st_mode & 0o777, CATALOG_FILE_MODE)
+
+    def test_catalog_compiled_schedules(self):
+        for class_id, schedule in [(1, "24M12"), (2, "35T23"), (5, "")]:
+            self.assertEqual(self.catalog.get_compiled_schedule(class_id), get_compiled_schedule(schedule))
+
+    def test_catalog_get_classes(self):
+        classes, missing_ids = self.catalog.get_classes([5, 4, 1, 1])
+
+        self.assertEqual([_class.id for _class in classes], [1, 5])
+        self.assertEqual(missing_ids, [4])
+
+    def test_invalid_catalog_file(self):
+        self.assertEqual(read_catalog_version(self.path), 3)
+
+        self.path.write_bytes(b"\0" * 64)
+
+        with self.assertRaises(ValueError):
+            SharedCatalog(self.path)
+
+        self.assertIsNone(read_catalog_version(self.path))
+        self.assertIsNone(read_catalog_version(self.path.with_name("missing.bin")))
+
+
+class SharedCatalogBuildTest(TestCase):
+    def setUp(self):
+        for key in cache.keys("*"):
+            cache.delete(key)
+
+        self.directory = TemporaryDirectory()
+        self.settings = override_settings(SHARED_CATALOG_DIR=self.directory.name)
+        self.settings.enable()
+
+        department = dbh.get_or_create_department(code='CIC', year='2030', period='2')
+        self.discipline = dbh.get_or_create_discipline(
+            name='Estrutura de Dados', code='CIC1000', department=department)
+        self.other_discipline = dbh.get_or_create_discipline(
+            name='Algoritmos', code='CIC1001', department=department)
+        self.classes = [dbh.create_class(teachers=['Fabiana'], classroom='MOCAP', schedule=schedule, days=[],
+                                         _class=str(index + 1), special_dates=[], discipline=discipline)
+                        for index, (schedule, discipline) in enumerate([
+                            ('35T12', self.discipline), ('24M12', self.discipline),
+                            ('35T23', self.other_discipline), ('6M12', self.other_discipline)])]
+
+    def tearDown(self):
+        delete_shared_catalog('2030', '2')
+        self.settings.disable()
+        self.directory.cleanup()
+
+    def test_build_shared_catalog(self):
+        self.assertIsNone(get_shared_catalog('2030', '2'))
+
+        with self.assertNumQueries(1):
+            build_shared_catalog('2030', '2')
+
+        # A ausência do arquivo fica guardada até a versão do período mudar
+        self.assertIsNone(get_shared_catalog('2030', '2'))
+
+        bump_period_version('2030', '2')
+        build_shared_catalog('2030', '2')
+        catalog = get_shared_catalog('2030', '2')
+
+        self.assertEqual(len(catalog), 4)
+        self.assertIs(get_shared_catalog('2030', '2'), catalog)
+
+        # Um catálogo construído para outra versão não é usado, e o arquivo não é reaberto a cada chamada
+        bump_period_version('2030', '2')
+
+        with patch("utils.shared_catalog.SharedCatalog", wraps=SharedCatalog) as shared_catalog:
+            self.assertIsNone(get_shared_catalog('2030', '2'))
+            self.assertIsNone(get_shared_catalog('2030', '2'))
+
+        shared_catalog.assert_called_once()
+
+    def test_publish_shared_catalog(self):
+        version = get_period_version('2030', '2')
+
+        # O arquivo ainda não existe, então é construído com a próxima versão, publicada ao final
+        self.assertEqual(publish_shared_catalog('2030', '2', False), version + 1)
+        self.assertEqual(read_catalog_version(get_catalog_path('2030', '2')), version + 1)
+        self.assertEqual(get_shared_catalog('2030', '2').version, version + 1)
+
+        # Nada mudou e o arquivo é da versão atual
+        self.assertEqual(publish_shared_catalog('2030', '2', False), version + 1)
+
+        self.assertEqual(publish_shared_catalog('2030', '2', True), version + 2)
+        self.assertEqual(get_shared_catalog('2030', '2').version, version + 2)
+
+    def test_other_periods_keep_shared_catalog(self):
+        publish_shared_catalog('2030', '2', True)
+        catalog = get_shared_catalog('2030', '2')
+
+        # Atualizar ou apagar outro período, ou mudar a versão do catálogo de turmas, não invalida o arquivo
+        publish_shared_catalog('2031', '1', True)
+        delete_shared_catalog('2031', '1')
+        bump_catalog_version()
+
+        self.assertIs(get_shared_catalog('2030', '2'), catalog)
+
+        delete_shared_catalog('2030', '2')
+
+        self.assertIsNone(get_shared_catalog('2030', '2'))
+
+    def test_generation_with_shared_catalog(self):
+        publish_shared_catalog('2030', '2', True)
+        catalog = get_shared_catalog('2030', '2')
+        classes_id = [_class.id for _class in self.classes]
+
+        expected = ScheduleGenerator(classes_id, [3, 2, 1]).generate()
+
+        with self.assertNumQueries(1):
+            schedule_generator = ScheduleGenerator(classes_id, [3, 2, 1], limit=1, catalog=catalog)
+            generated_data = schedule_generator.generate()
+
+        self.assertEqual(generated_data["schedules"], expected["schedules"][:1])
+        self.assertEqual(ScheduleGenerator(classes_id, catalog=catalog).count(), len(expected["schedules"]))
@@ -0,0 +1,62 @@
+from django.test import TestCase
+from datetime import date
+from api.models import Class
+from utils.schedule_code import compile_schedule_code
+from utils.special_dates import DateRange, DateSegments, parse_date_range, get_class_occupations, get_selection_masks, freeze_special_dates
+
+FIRST_HALF = "04/03/2024 - 20/04/2024"
+SECOND_HALF = "22/04/2024 - 06/07/2024"
+
+
+class SpecialDatesTest(TestCase):
+    def test_parse_date_range(self):
+        self.assertEqual(parse_date_range(FIRST_HALF),
+                         DateRange(date(2024, 3, 4), date(2024, 4, 20)))
+        self.assertIsNone(parse_date_range("2024-03-04 - 2024-04-20"))
+        self.assertIsNone(parse_date_range("20/04/2024 - 04/03/2024"))
+
+    def test_class_occupations(self):
+        occupations = get_class_occupations(
+            "24M12 6T23", ((FIRST_HALF, "1", "1"),))
+
+        self.assertEqual(occupations, (
+            (compile_schedule_code("24M12"), parse_date_range(FIRST_HALF)),
+            (compile_schedule_code("6T23"), None)
+        ))
+
+    def test_class_occupations_with_invalid_special_dates(self):
+        occupations = get_class_occupations(
+            "24M12", (("invalid", "1", "1"), (FIRST_HALF, "a", "1")))
+
+        self.assertEqual(occupations, ((compile_schedule_code("24M12"), None),))
+
+    def test_class_occupations_with_malformed_special_dates(self):
+        special_dates = freeze_special_dates([None, [None, "1", "1"], [FIRST_HALF, None, "1"], [FIRST_HALF]])
+        occupations = get_class_occupations("24M12", special_dates)
+
+        self.assertIsNone(parse_date_range(None))
+        self.assertEqual(occupations, ((compile_schedule_code("24M12"), None),))
+
+    def test_date_segments(self):
+        segments = DateSegments([parse_date_range(FIRST_HALF), parse_date_range(SECOND_HALF)])
+
+        self.assertEqual(segments.count, 5)
+        self.assertEqual(segments.get_segments(parse_date_range(FIRST_HALF)), range(1, 2))
+        self.assertEqual(segments.get_segments(parse_date_range(SECOND_HALF)), range(3, 4))
+
+    def test_selection_masks(self):
+        first = Class(id=1, schedule="24M12", special_dates=[[FIRST_HALF, "1", "1"]])
+        second = Class(id=2, schedule="24M12", special_dates=[[SECOND_HALF, "1", "1"]])
+        third = Class(id=3, schedule="2M1", special_dates=[])
+
+        masks = get_selection_masks([first, second, third])
+
+        self.assertFalse(masks[1] & masks[2])
+        self.assertTrue(masks[1] & masks[3])
+        self.assertTrue(masks[2] & masks[3])
+
+    def test_selection_masks_without_special_dates(self):
+        classes = [Class(id=1, schedule="24M12", special_dates=[]),
+                   Class(id=2, schedule="35M12", special_dates=[])]
+
+        self.assertIsNone(get_selection_masks(classes))